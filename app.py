@@ -1,13 +1,463 @@
 import os
 import json
-from flask import Flask, render_template, request, redirect, url_for, jsonify, session, make_response, send_file
-from models.game import valider_vote
+import math
+import hashlib
+import secrets
+import threading
+import time
+from datetime import datetime, timezone
+from functools import lru_cache, wraps
+from flask import Flask, render_template, request, redirect, url_for, jsonify, session, make_response, send_file, abort, Response, g, request_finished, current_app, has_app_context
+from werkzeug.http import is_resource_modified
+from werkzeug.local import LocalProxy
+from models.game import LISTE_TYPE_VOTE
+from models.session_store import creer_session_interface
+from models.room import GameRoom, creer_registre, ISSUE_SUIVANT, ISSUE_VALIDE, ISSUE_PAUSE, ISSUE_INTERRO, ISSUE_TERMINE, ISSUE_DEBAT
+from models.events import EventBus, flux_sse
+from models.timer import RoundScheduler
+from models.backlog_import import importer_backlog
+from models.features import FeatureCollection
+from models.journal import (JournalStore, EVENEMENT_VOTE, EVENEMENT_INTERRO,
+                            EVENEMENT_FEATURE_AJOUTEE, EVENEMENT_FEATURE_SUPPRIMEE, EVENEMENT_TOUR_VALIDE)
+from models.metrics import MetricsRegistry
+from models.profiling import creer_profileur
+from models.compression import compresser_reponse
+from models.ingestion import VoteIngestion, FileSaturee
+from models.cartes import encoder_carte
+from models.sauvegarde import encoder_sauvegarde, decoder_sauvegarde, lire_apercu, EXTENSIONS, MIMETYPES, FORMAT_JSON
+from models.export import exporter, lignes_export, FORMAT_JSON as FORMAT_EXPORT_JSON, MIMETYPES as MIMETYPES_EXPORT
 from io import BytesIO
 
-app = Flask(__name__)
-app.secret_key = 'azerty'  # Nécessaire pour utiliser les sessions
+# Délai de tolérance (en secondes) pour un vote envoyé juste avant l'échéance
+DELAI_GRACE = 2
+# Avance tolérée (en secondes) du chronomètre d'une partie sur son échéance enregistrée
+TOLERANCE_ECHEANCE = 0.5
 
-@app.route('/')
+# Clé de l'échéancier réservée à la purge des parties inactives (un room_id ne contient pas de '#')
+CLE_PURGE = '#purge'
+
+# Durée de mise en cache (en secondes) d'un fichier statique demandé avec son empreinte
+DUREE_CACHE_STATIQUE = 365 * 24 * 3600
+
+# Vues de l'application (règle, fonction, options), enregistrées sur chaque instance par create_app()
+_vues = []
+
+
+def route(regle, **options):
+    """
+    @brief Déclare une route de l'application, comme Flask.route, pour toutes les instances.
+
+    @param regle La règle d'URL.
+    @param options Les options de Flask.add_url_rule() (methods...).
+    """
+    def enregistrer(vue):
+        _vues.append((regle, vue, options))
+        return vue
+    return enregistrer
+
+
+def create_app(config=None):
+    """
+    @brief Crée une instance de l'application.
+
+    @param config Un dictionnaire de configuration, appliqué après les variables
+        d'environnement préfixées par CAPI_ (ex. : CAPI_SESSION_BACKEND=sqlite).
+    @return L'application Flask.
+
+    @details
+    La création se limite à la configuration, aux sessions et à l'enregistrement
+    des routes : les sous-systèmes (registre des parties, journal, historique,
+    métriques...) ne sont construits qu'à leur première utilisation (voir
+    SousSystemes). Chaque instance a sa propre configuration et ses propres
+    sous-systèmes. La clé secrète (nécessaire aux sessions) est fournie par
+    CAPI_SECRET_KEY ou par config ; en test ou en mode debug seulement, une
+    clé aléatoire est générée si elle manque.
+
+    @exception RuntimeError Si la clé secrète n'est pas fournie hors test et hors mode debug.
+    """
+    instance = Flask(__name__)
+    instance.config.from_prefixed_env('CAPI')
+    instance.config.update(config or {})
+    if not instance.secret_key:
+        if not (instance.testing or instance.debug):
+            raise RuntimeError("Clé secrète absente : définir CAPI_SECRET_KEY (ou SECRET_KEY dans la configuration).")
+        # Clé propre au processus : les sessions ne survivent pas à un redémarrage
+        instance.secret_key = secrets.token_hex(32)
+
+    # Sessions conservées côté serveur : le cookie ne transporte qu'un identifiant
+    instance.session_interface = creer_session_interface(instance.config, instance.instance_path)
+
+    for regle, vue, options in _vues:
+        instance.add_url_rule(regle, vue.__name__, vue, **options)
+    instance.before_request(demarrer_chronometre)
+    # Les fonctions after_request s'exécutent dans l'ordre inverse : la compression en dernier
+    instance.after_request(compresser)
+    instance.after_request(mettre_en_cache_statique)
+    instance.url_defaults(versionner_statique)
+    request_finished.connect(mesurer_requete, instance)
+    sous_systemes = instance.extensions['capi'] = SousSystemes(instance)
+
+    # Profilage d'une partie des requêtes (CAPI_PROFILAGE_TAUX) : rien n'est ajouté s'il est désactivé
+    sous_systemes.profileur = creer_profileur(instance.config, instance.instance_path)
+    if sous_systemes.profileur is not None:
+        instance.wsgi_app = sous_systemes.profileur.envelopper(instance.wsgi_app, instance.url_map)
+    return instance
+
+
+def _a_la_demande(creer):
+    # Propriété construite au premier accès, une seule fois même si plusieurs threads y accèdent
+    nom = '_' + creer.__name__
+
+    @property
+    @wraps(creer)
+    def lire(self):
+        valeur = self.__dict__.get(nom)
+        if valeur is None:
+            with self._lock:
+                valeur = self.__dict__.get(nom)
+                if valeur is None:
+                    valeur = self.__dict__[nom] = creer(self)
+        return valeur
+    return lire
+
+
+class SousSystemes:
+    """
+    @brief Sous-systèmes d'une instance de l'application, construits à leur première utilisation.
+
+    @details
+    Un processus de service qui ne traite que des parties en session n'ouvre
+    jamais l'historique ni le registre des parties ; l'index de suggestions
+    n'est chargé qu'à la première proposition de fonctionnalité. Les threads
+    de fond (ingestion des votes, échéancier) s'exécutent dans le contexte de
+    leur instance.
+    """
+
+    def __init__(self, app):
+        """
+        @param app L'application Flask dont la configuration décrit les sous-systèmes.
+        """
+        self.app = app
+        self.profileur = None  # Voir models.profiling ; créé avec l'application s'il est activé
+        self._lock = threading.RLock()
+
+    def dans_contexte(self, fonction):
+        """
+        @brief Enveloppe une fonction appelée hors requête (thread de fond) dans le contexte de l'instance.
+        """
+        @wraps(fonction)
+        def appeler(*arguments):
+            with self.app.app_context():
+                return fonction(*arguments)
+        return appeler
+
+    @_a_la_demande
+    def journaux(self):
+        # Journal des parties en mode local : un répertoire par partie (instantané + événements)
+        config = self.app.config
+        return JournalStore(config.get('JOURNAL_DIR', os.path.join(self.app.instance_path, 'parties')),
+                            seuil_compactage=int(config.get('JOURNAL_COMPACTAGE', 500)))
+
+    @_a_la_demande
+    def analytique(self):
+        # Historique des parties terminées, interrogé par les routes /analytics/*
+        from models.analytics import AnalyticsStore
+        return AnalyticsStore(self.app.config.get('ANALYTICS_PATH',
+                                                  os.path.join(self.app.instance_path, 'analytics.sqlite3')))
+
+    @_a_la_demande
+    def suggestions(self):
+        # Index des fonctionnalités déjà chiffrées : l'historique est chargé dans un thread
+        # de fond, les recherches restent possibles (avec des suggestions partielles)
+        from models.suggestions import IndexSimilarite
+        index = IndexSimilarite()
+        analytique = self.analytique
+        if os.path.exists(analytique.path):
+            threading.Thread(target=index.charger, args=(analytique.estimations_passees(),),
+                             name="chargement-suggestions", daemon=True).start()
+        return index
+
+    @_a_la_demande
+    def rooms(self):
+        # Parties adressées par /rooms/<room_id>, hébergées par le processus
+        # ou partagées entre processus (CAPI_ROOM_BACKEND=sqlite, voir serve.py)
+        return creer_registre(self.app.config, self.app.instance_path)
+
+    @_a_la_demande
+    def bus(self):
+        # Événements poussés aux joueurs d'une partie (Server-Sent Events)
+        return EventBus()
+
+    @_a_la_demande
+    def metriques(self):
+        return MetriquesApplication(self)
+
+    @_a_la_demande
+    def ingestion(self):
+        # Votes simultanés en attente de traitement, une file bornée par partie
+        config = self.app.config
+        return VoteIngestion(self.dans_contexte(appliquer_votes),
+                             taille_file=int(config.get('VOTE_FILE_TAILLE', 256)),
+                             taille_lot=int(config.get('VOTE_LOT', 64)),
+                             max_en_attente=int(config.get('VOTE_EN_ATTENTE_MAX', 10000)))
+
+    @_a_la_demande
+    def scheduler(self):
+        # Chronomètres côté serveur de toutes les parties du registre, et purge des parties inactives
+        return RoundScheduler(self.dans_contexte(traiter_echeance))
+
+    @_a_la_demande
+    def version_site(self):
+        # Empreinte des templates et fichiers statiques déployés, intégrée aux ETag des pages :
+        # une mise à jour du site invalide les pages gardées en cache par les navigateurs
+        empreinte = hashlib.blake2b(digest_size=8)
+        for dossier in (os.path.join(self.app.root_path, self.app.template_folder), self.app.static_folder):
+            for racine, _, fichiers in sorted(os.walk(dossier)):
+                for nom in sorted(fichiers):
+                    infos = os.stat(os.path.join(racine, nom))
+                    empreinte.update(f"{racine}/{nom}:{infos.st_size}:{infos.st_mtime_ns};".encode())
+        return empreinte.hexdigest()
+
+
+class MetriquesApplication(MetricsRegistry):
+    """
+    @brief Métriques d'une instance de l'application, exposées au format Prometheus sur /metrics.
+    """
+
+    def __init__(self, sous_systemes):
+        """
+        @param sous_systemes Les sous-systèmes de l'instance, lus par les jauges.
+        """
+        # Plusieurs processus (CAPI_METRICS_PID, voir serve.py) : chacun expose ses propres séries
+        super().__init__(etiquette_processus='pid' if sous_systemes.app.config.get('METRICS_PID') else None)
+        self.requetes_total = self.compteur('capi_requetes_total', "Requêtes HTTP traitées.",
+                                            ('endpoint', 'methode', 'statut'))
+        self.duree_requete = self.histogramme('capi_requete_duree_secondes', "Durée de traitement des requêtes HTTP.",
+                                              ('endpoint',))
+        self.taille_cookie = self.histogramme('capi_session_cookie_octets', "Taille du cookie de session envoyé.",
+                                              bornes=(64, 128, 256, 512, 1024, 2048, 4096))
+        self.duree_vote = self.histogramme('capi_vote_duree_secondes',
+                                           "Durée de traitement d'un vote (validation comprise).",
+                                           bornes=(1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 5e-3))
+        self.tours_total = self.compteur('capi_tours_total',
+                                         "Tours de vote clos, par issue (valide, debat, interro, pause).", ('issue',))
+        self.tours_par_feature = self.histogramme('capi_tours_par_feature',
+                                                  "Nombre de tours nécessaires pour chiffrer une fonctionnalité.",
+                                                  bornes=(1, 2, 3, 4, 5, 8, 13))
+        self.parties_creees = self.compteur('capi_parties_creees_total', "Parties créées, par mode (local ou room).",
+                                            ('mode',))
+        self.jauge('capi_rooms_actives', "Parties non terminées du registre.",
+                   lambda: sous_systemes.rooms.nb_actives())
+        self.votes_refuses = self.compteur('capi_votes_refuses_total',
+                                           "Votes refusés par le pipeline d'ingestion, par motif.", ('motif',))
+        self.jauge('capi_votes_en_attente', "Votes en attente dans le pipeline d'ingestion.",
+                   lambda: sous_systemes.ingestion.en_attente())
+
+
+def sous_systemes():
+    """
+    @brief Sous-systèmes de l'instance courante (hors contexte : ceux de l'application par défaut).
+    """
+    return (current_app if has_app_context() else application_par_defaut()).extensions['capi']
+
+
+# Accès aux sous-systèmes de l'instance courante
+journaux = LocalProxy(lambda: sous_systemes().journaux)
+analytique = LocalProxy(lambda: sous_systemes().analytique)
+suggestions = LocalProxy(lambda: sous_systemes().suggestions)
+rooms = LocalProxy(lambda: sous_systemes().rooms)
+bus = LocalProxy(lambda: sous_systemes().bus)
+metriques = LocalProxy(lambda: sous_systemes().metriques)
+ingestion = LocalProxy(lambda: sous_systemes().ingestion)
+scheduler = LocalProxy(lambda: sous_systemes().scheduler)
+
+
+def demarrer_chronometre():
+    """
+    @brief Note l'heure de début de la requête, pour les métriques de latence.
+    """
+    g.debut_requete = time.perf_counter()
+
+
+def compresser(reponse):
+    """
+    @brief Compresse les réponses textuelles au-delà de CAPI_COMPRESSION_SEUIL octets (voir models.compression).
+
+    @details
+    Désactivée par CAPI_COMPRESSION=false (ex. derrière un proxy qui compresse déjà).
+    """
+    config = current_app.config
+    if not config.get('COMPRESSION', True):
+        return reponse
+    return compresser_reponse(reponse, request.accept_encodings,
+                              seuil=int(config.get('COMPRESSION_SEUIL', 1024)),
+                              niveau=int(config.get('COMPRESSION_NIVEAU', 6)))
+
+
+def versionner_statique(endpoint, values):
+    """
+    @brief Ajoute l'empreinte du fichier (paramètre v) aux URL des fichiers statiques.
+
+    @details
+    url_for('static', filename='css/style.css') donne /static/css/style.css?v=<empreinte> :
+    l'URL change avec le contenu du fichier, qui peut donc être gardé en cache
+    sans limite par le navigateur.
+    """
+    if endpoint == 'static' and 'v' not in values and 'filename' in values:
+        version = empreinte_statique(values['filename'])
+        if version is not None:
+            values['v'] = version
+
+
+def empreinte_statique(nom_fichier):
+    """
+    @brief Empreinte du contenu d'un fichier statique, ou None s'il n'existe pas.
+    """
+    chemin = os.path.join(current_app.static_folder, nom_fichier)
+    try:
+        infos = os.stat(chemin)
+    except OSError:
+        return None
+    return _empreinte_fichier(chemin, infos.st_mtime_ns, infos.st_size)
+
+
+@lru_cache(maxsize=256)
+def _empreinte_fichier(chemin, mtime_ns, taille):
+    # La date et la taille font partie de la clé : un fichier modifié est relu
+    with open(chemin, 'rb') as f:
+        return hashlib.blake2b(f.read(), digest_size=8).hexdigest()
+
+
+def mettre_en_cache_statique(reponse):
+    """
+    @brief Autorise la mise en cache longue d'un fichier statique demandé avec son empreinte courante.
+
+    @details
+    Une URL portant une ancienne empreinte reçoit le fichier actuel, sans
+    cache longue durée : le navigateur le revalidera.
+    """
+    if request.endpoint != 'static' or reponse.status_code not in (200, 304):
+        return reponse
+    version = request.args.get('v')
+    if version and version == empreinte_statique(request.view_args['filename']):
+        reponse.cache_control.no_cache = None
+        reponse.cache_control.public = True
+        reponse.cache_control.max_age = DUREE_CACHE_STATIQUE
+        reponse.cache_control.immutable = True
+    return reponse
+
+
+def validateurs(features, *variantes):
+    """
+    @brief Validateurs HTTP (ETag, Last-Modified) d'une page construite à partir d'un backlog.
+
+    @param features La FeatureCollection affichée ou exportée.
+    @param variantes Les autres données dont dépend la réponse (paramètres, version d'un index...).
+    @return Un couple (etag, date de dernière modification).
+
+    @details
+    L'ETag combine l'empreinte du backlog, la version du site et les variantes :
+    il change dès que l'une d'elles change, et il est le même dans tous les
+    processus de service.
+    """
+    etag = hashlib.blake2b(digest_size=16)
+    for partie in (features.empreinte(), sous_systemes().version_site, *variantes):
+        etag.update(f"{partie}|".encode())
+    return etag.hexdigest(), datetime.fromtimestamp(features.modifiee, timezone.utc)
+
+
+def reponse_conditionnelle(cache, construire):
+    """
+    @brief Répond 304 si le client a déjà la version courante de la réponse, sinon la construit.
+
+    @param cache Les validateurs de la réponse (voir validateurs()).
+    @param construire Fonction sans paramètre renvoyant la réponse complète (rendu, export...).
+    @return La réponse 304 ou la réponse construite, avec ses en-têtes ETag et Last-Modified.
+
+    @details
+    La réponse est privée (elle dépend de la session) et doit être revalidée
+    à chaque affichage : une page inchangée ne coûte qu'un aller-retour, sans
+    rendu ni sérialisation du backlog.
+    """
+    etag, modifiee = cache
+    if is_resource_modified(request.environ, etag=etag, last_modified=modifiee):
+        reponse = make_response(construire())
+    else:
+        reponse = Response(status=304)
+    if reponse.status_code in (200, 304):
+        reponse.set_etag(etag)
+        reponse.last_modified = modifiee
+        reponse.cache_control.private = True
+        reponse.cache_control.no_cache = True
+    return reponse
+
+
+def mesurer_requete(sender, response, **extra):
+    """
+    @brief Enregistre la latence, le statut et la taille du cookie de session d'une requête.
+
+    @details
+    Appelée par le signal request_finished, après l'enregistrement de la session :
+    l'en-tête Set-Cookie est donc déjà présent.
+    """
+    endpoint = request.endpoint or 'inconnu'
+    debut = g.get('debut_requete')
+    if debut is not None:
+        metriques.duree_requete.observer(time.perf_counter() - debut, endpoint=endpoint)
+    metriques.requetes_total.inc(endpoint=endpoint, methode=request.method, statut=response.status_code)
+    for cookie in response.headers.getlist('Set-Cookie'):
+        if cookie.startswith(sender.config['SESSION_COOKIE_NAME'] + '='):
+            metriques.taille_cookie.observer(len(cookie))
+
+
+@route('/metrics')
+def metrics():
+    """
+    @brief Expose les métriques de l'application au format texte Prometheus.
+    @return Réponse text/plain (version 0.0.4 du format d'exposition).
+    """
+    return Response(metriques.exposer(), content_type='text/plain; version=0.0.4; charset=utf-8',
+                    headers={'Cache-Control': 'no-cache'})
+
+
+def traiter_vote(room, action, *arguments):
+    """
+    @brief Applique un vote à une partie et enregistre les métriques du tour.
+
+    @param room La partie.
+    @param action La méthode de la partie à appeler (jouer, voter ou expirer_tour).
+    @param arguments Les arguments de l'action.
+    @return Le tuple (issue, details) renvoyé par l'action.
+    """
+    debut = time.perf_counter()
+    issue, details = action(*arguments)
+    metriques.duree_vote.observer(time.perf_counter() - debut)
+    if issue not in (ISSUE_SUIVANT, ISSUE_TERMINE):
+        metriques.tours_total.inc(issue=issue)
+    if issue == ISSUE_VALIDE:
+        feature_id = room.features.id_de(details)
+        metriques.tours_par_feature.observer(room.features.historique(feature_id)['rounds'])
+        suggestions.ajouter(details, room.features.estimation(feature_id))
+        if room.terminee:
+            archiver_partie(room)
+    return issue, details
+
+
+def archiver_partie(room):
+    """
+    @brief Enregistre une partie terminée dans l'historique des estimations.
+
+    @param room La partie : une partie du registre est identifiée par son room_id,
+        une partie en session par son game_id.
+    """
+    partie = room.room_id if room.room_id is not None else session.get('game_id')
+    if partie is None:
+        return
+    os.makedirs(os.path.dirname(analytique.path) or '.', exist_ok=True)
+    analytique.enregistrer_partie(partie, room.players, lignes_export(room.features), room.rules)
+
+
+@route('/')
 def home():
     """
     @brief Affiche la page d'accueil.
@@ -15,7 +465,7 @@ def home():
     """
     return render_template('home.html')
 
-@app.route('/settings', methods=['GET', 'POST'])
+@route('/settings', methods=['GET', 'POST'])
 def settings():
     """
     @brief Gère la configuration des paramètres du jeu.
@@ -40,16 +490,21 @@ def settings():
         session['players'] = players
         session['rules'] = rules
         session['index_player'] = 0
-        session['liste_vote'] = []
-        session['features'] = []  # Liste des fonctionnalités
+        session['liste_vote'] = b''  # Votes encodés (un octet par carte, voir models.cartes)
+        session['features'] = FeatureCollection()  # Fonctionnalités et leurs estimations
         session['current_feature_index'] = 0  # Index de la fonctionnalité en cours
-        session['results'] = {}  # Résultats finaux pour chaque fonctionnalité
+        session.pop('results', None)  # Ancien format : les résultats sont portés par les fonctionnalités
         session['time_limit'] = int(time_limit)  # Stockage du temps limite
+        session.pop('echeance', None)
+
+        # Chaque partie a son propre journal, identifié par 'game_id'
+        session['game_id'] = journaux.creer(GameRoom.depuis_etat(session).vers_sauvegarde())
+        metriques.parties_creees.inc(mode='local')
 
         return redirect(url_for('propose_features'))
     return render_template('settings.html')
 
-@app.route('/propose_features', methods=['GET', 'POST'])
+@route('/propose_features', methods=['GET', 'POST'])
 def propose_features():
     """
     @brief Gère la proposition de fonctionnalités par les utilisateurs.
@@ -58,36 +513,156 @@ def propose_features():
 
     @return Redirection ou affichage de la page de proposition de fonctionnalités.
     """
-    if 'features' not in session:
-        session['features'] = []  # Initialiser si absent
+    features = features_session()
 
     if request.method == 'POST':
         new_feature = request.form.get('feature')
         if new_feature:
-            features = session['features']
-            features.append(new_feature)
+            # Un titre déjà proposé est ignoré
+            feature_id = features.ajouter(new_feature)
             session['features'] = features
+            if feature_id is not None:
+                journaliser(EVENEMENT_FEATURE_AJOUTEE, features=[[feature_id, new_feature]])
         return redirect(url_for('propose_features'))
 
-    return render_template('propose_features.html', features=session['features'])
+    def afficher():
+        # Suggestions pour les fonctionnalités restant à chiffrer
+        similaires = {feature_id: suggestions.suggerer(titre)
+                      for feature_id, titre in features.items() if features.estimation(feature_id) is None}
+        return render_template('propose_features.html', features=features, suggestions=similaires)
+    return reponse_conditionnelle(validateurs(features, suggestions.version), afficher)
+
+
+@route('/suggestions')
+def suggest_estimates():
+    """
+    @brief Estimations passées des fonctionnalités proches d'un titre.
+
+    @details
+    Paramètres : feature (le titre recherché) et limit (3 par défaut, 20 au plus).
+
+    @return Réponse JSON {"feature": titre, "suggestions": [{"feature", "estimate", "count", "score"}...]}.
+    """
+    titre = request.args.get('feature', '')
+    nombre = max(1, min(request.args.get('limit', 3, type=int), 20))
+    return jsonify({"feature": titre, "suggestions": suggestions.suggerer(titre, nombre)})
+
+
+def features_session():
+    """
+    @brief Backlog de la partie en session, converti en FeatureCollection si besoin.
+
+    @details
+    Les anciennes sessions (liste de titres et dictionnaire 'results') sont
+    converties une fois, puis la FeatureCollection est conservée telle quelle.
+
+    @return La FeatureCollection de la session.
+    """
+    features = session.get('features')
+    if not isinstance(features, FeatureCollection) or 'results' in session:
+        features = FeatureCollection.depuis(features, session.pop('results', None))
+        session['features'] = features
+    return features
+
+
+def enregistrer_partie(room):
+    """
+    @brief Enregistre dans la session l'état d'une partie jouée en mode local.
+
+    @param room La GameRoom reconstruite depuis la session.
+    """
+    session.update(room.vers_etat())
+    session.pop('results', None)
+
+
+def journaliser(type_evenement, room=None, **donnees):
+    """
+    @brief Ajoute un événement au journal de la partie en session.
+
+    @details
+    Seul l'événement est écrit (une ligne en fin de journal). L'état complet
+    n'est reconstruit que lorsque le journal doit être compacté. Une session
+    sans 'game_id' (ancienne session) n'est pas journalisée.
+
+    @param type_evenement Le type d'événement (voir models.journal).
+    @param room La GameRoom à jour, si l'appelant l'a déjà reconstruite.
+    @param donnees Le contenu de l'événement.
+    """
+    game_id = session.get('game_id')
+    if game_id is None:
+        return
+
+    def etat():
+        return (room or GameRoom.depuis_etat(session)).vers_sauvegarde()
+
+    journal = journaux.journal(game_id)
+    try:
+        journal.ajouter(type_evenement, etat=etat, **donnees)
+    except FileNotFoundError:
+        # Journal disparu (répertoire nettoyé) : on repart de l'état courant
+        journal.initialiser(etat())
+
+@route('/import_backlog', methods=['POST'])
+def import_backlog():
+    """
+    @brief Importe en masse un backlog de fonctionnalités (tableau JSON ou NDJSON).
+
+    @details
+    Le backlog est reçu dans le champ de fichier 'backlog' ou directement dans le
+    corps de la requête. Il est lu au fil de l'eau : les éléments invalides ou déjà
+    présents sont ignorés et comptés.
+
+    @return Réponse JSON avec le nombre d'éléments importés, dupliqués et invalides.
+    """
+    features = features_session()
+    try:
+        nouvelles, stats = lire_backlog_importe(features)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    ajoutees = [[features.ajouter(titre), titre] for titre in nouvelles]
+    session['features'] = features
+    if ajoutees:
+        journaliser(EVENEMENT_FEATURE_AJOUTEE, features=ajoutees)
+    return jsonify(stats)
+
 
-@app.route('/delete_feature', methods=['POST'])
+def lire_backlog_importe(existantes):
+    """
+    @brief Lit le backlog envoyé avec la requête courante.
+
+    @param existantes Les fonctionnalités déjà présentes dans la partie.
+    @return Le tuple (nouvelles, stats) de importer_backlog().
+    @exception ValueError Si le backlog est absent ou mal formé.
+    """
+    fichier = request.files.get('backlog')
+    flux = fichier.stream if fichier else request.stream
+    return importer_backlog(flux, existantes,
+                            max_elements=current_app.config.get('IMPORT_MAX_ELEMENTS', 100000))
+
+
+@route('/delete_feature', methods=['POST'])
 def delete_feature():
     """
     @brief Supprime une fonctionnalité proposée.
+
+    @details
+    La fonctionnalité est désignée par son identifiant ('feature_id') ou,
+    pour compatibilité, par son titre ('feature').
+
     @return Réponse JSON confirmant la suppression ou indiquant une erreur.
     """
     data = request.get_json()
-    feature_to_delete = data.get('feature')
-    if 'features' in session and feature_to_delete in session['features']:
-        # Supprime la fonctionnalité et met à jour la session
-        features = session['features']
-        features.remove(feature_to_delete)
+    features = features_session()
+    feature_id = data.get('feature_id')
+    if feature_id is None:
+        feature_id = features.id_de(data.get('feature'))
+    if features.supprimer(feature_id):
         session['features'] = features  # Réaffecter pour mettre à jour la session
+        journaliser(EVENEMENT_FEATURE_SUPPRIMEE, id=feature_id)
         return jsonify({"success": True})
     return jsonify({"success": False})
 
-@app.route('/game', methods=['GET', 'POST'])
+@route('/game', methods=['GET', 'POST'])
 def game():
     """
     @brief Gère le processus de vote pour chaque fonctionnalité, joueur par joueur.
@@ -95,8 +670,9 @@ def game():
     - POST : Enregistre un vote ou passe au joueur suivant si pas de vote.
     
     @details
-    Le temps est géré côté front. Si le joueur n'a pas voté avant la fin du temps,
-    il vote 'interro'. Lorsque tous les joueurs ont été itérés, on évalue le résultat.
+    Le temps est affiché côté front mais l'échéance est fixée par le serveur :
+    si le joueur n'a pas voté avant la fin du temps, il vote 'interro'.
+    Lorsque tous les joueurs ont été itérés, on évalue le résultat.
     Si tous ont voté "cafe", on passe en mode pause.
     Si le vote est unanime ou majoritaire, on enregistre le résultat.
     Si le vote enregistrer est 'interro', alors une phase de discussion est mise ne place,
@@ -105,78 +681,74 @@ def game():
 
     @return Redirection ou affichage de la page de jeu.
     """
-    players = session.get('players', [])
-    features = session.get('features', [])
-    current_feature_index = session.get('current_feature_index', 0)
-    current_player_index = session['index_player'] % len(players)
-    time_limit = session.get('time_limit', 30)
+    room = GameRoom.depuis_etat(session)
+    if not room.players:
+        return redirect(url_for('settings'))
 
-    if current_feature_index >= len(features):
+    if room.terminee:
         return redirect(url_for('results'))
 
-    current_feature = features[current_feature_index]
-
     if request.method == 'POST':
+        # Si le joueur n'a pas eu le temps de répondre = 'interro'
+        valeur_choisi = request.form.get('valeur_choisi', 'interro')
+        # Un vote arrivé après l'échéance fixée par le serveur compte comme 'interro'
+        echeance = session.pop('echeance', None)
+        if echeance is not None and time.time() > echeance + DELAI_GRACE:
+            valeur_choisi = 'interro'
+        try:
+            issue, details = traiter_vote(room, room.jouer, valeur_choisi)
+        except ValueError as e:
+            return f"Vote invalide : {e}", 400
+        enregistrer_partie(room)
+        journaliser(EVENEMENT_VOTE, room, valeur=valeur_choisi)
+        if issue == ISSUE_VALIDE:
+            journaliser(EVENEMENT_TOUR_VALIDE, room, feature=details)
+        return repondre_issue(issue, details)
 
-        # Si on revient de "interro", ne pas incrémenter `index_player` et son choix
-        if not session.get('revote', False):
-            session['index_player'] += 1
-            valeur_choisi = request.form.get('valeur_choisi', 'interro')  # Si le joueur n'a pas eu le temps de répondre = 'interro'
-        else:
-            session['revote'] = False  # Désactiver l'état de revote
-            session['index_player'] = 0  # Revenir au premier joueur
-            valeur_choisi = None
-
-        if valeur_choisi:
-            # Valeur café/interro ou chiffre
-            if valeur_choisi == "cafe" or valeur_choisi == "interro":
-                session['liste_vote'].append(valeur_choisi)
-            else:
-                session['liste_vote'].append(int(valeur_choisi))
-
-            # Si on a traité tous les joueurs pour cette fonctionnalité
-            if (session['index_player'] % len(players)) == 0:
-                # Evaluation du vote
-                resultat, chiffrage = valider_vote(session['liste_vote'], session['rules'])
-                if resultat:
-                    session['liste_vote'] = []
-                    session['index_player'] = 0
-                    if chiffrage == "cafe":
-                        # Tous ont voté café, rediriger vers /pause
-                        return redirect(url_for('pause'))
-                    elif chiffrage == "interro":
-                        # Tous ont voté "interro", rediriger vers /interro
-                        return redirect(url_for('interro'))
-                    else:
-                        # On a un résultat valide (unanime ou majorite)
-                        session['results'][current_feature] = chiffrage
-                        session['current_feature_index'] += 1
-                else:
-                    # Aucun résultat majoritaire/unanime.
-                    if len(session['liste_vote']) == 0:
-                        # Personne n'a voté, on recommence le tour
-                        session['index_player'] = 0
-                        # Pas de changement de current_feature_index
-                    else:
-                        min_vote = min(session['liste_vote'])
-                        max_vote = max(session['liste_vote'])
-                        debate_players = [
-                            players[session['liste_vote'].index(min_vote)],
-                            players[session['liste_vote'].index(max_vote)]
-                        ]
-                        session['revote'] = True
-                        session['liste_vote'] = []
-                        return render_template('debate.html', feature=current_feature, debate_players=debate_players, vote=[min_vote, max_vote])
-
-            return redirect(url_for('game'))
+    # L'échéance du joueur courant est fixée par le serveur au premier affichage
+    time_limit = room.time_limit
+    if time_limit:
+        echeance = session.get('echeance')
+        if echeance is None:
+            echeance = session['echeance'] = time.time() + time_limit
+        time_limit = max(0, math.ceil(echeance - time.time()))
 
-    current_player_index = session['index_player'] % len(players)
-    return render_template('game.html', 
-                           player=players[current_player_index], 
-                           feature=current_feature, 
+    return render_template('game.html',
+                           player=room.joueur_courant,
+                           feature=room.feature_courante,
                            time_limit=time_limit)
 
-@app.route('/debate', methods=['GET'])
+
+def repondre_issue(issue, details, room_id=None):
+    """
+    @brief Construit la réponse HTTP correspondant à l'issue d'un vote.
+
+    @param issue L'issue renvoyée par GameRoom.jouer().
+    @param details Les détails associés (voir GameRoom.jouer()).
+    @param room_id L'identifiant de la partie, ou None pour la partie en session.
+    @return Redirection ou affichage de la page de débat.
+    """
+    # Les routes d'une partie du registre sont préfixées par 'room_'
+    if room_id is None:
+        def url(endpoint):
+            return url_for(endpoint)
+    else:
+        def url(endpoint):
+            return url_for('room_' + endpoint, room_id=room_id)
+
+    if issue == ISSUE_PAUSE:
+        # Tous ont voté café, rediriger vers /pause
+        return redirect(url('pause'))
+    if issue == ISSUE_INTERRO:
+        # Tous ont voté "interro", rediriger vers /interro
+        return redirect(url('interro'))
+    if issue == ISSUE_TERMINE:
+        return redirect(url('results'))
+    if issue == ISSUE_DEBAT:
+        return render_template('debate.html', game_url=url('game'), **details)
+    return redirect(url('game'))
+
+@route('/debate', methods=['GET'])
 def debate():
     """
     @brief Gère la redirection pendant un débat.
@@ -184,7 +756,7 @@ def debate():
     """
     return redirect(url_for('game'))
 
-@app.route('/interro')
+@route('/interro')
 def interro():
     """
     @brief Affiche une page spéciale lorsque tous les joueurs votent "interro".
@@ -195,117 +767,715 @@ def interro():
     
     @return Le template 'interro.html'.
     """
-    # Réinitialiser index_player pour recommencer le tour
-    session['index_player'] = 0
-
-    session['revote'] = True  # Indiquer qu'on revient d'une phase interro
-
-    current_feature_index = session.get('current_feature_index', 0)
-    features = session.get('features', [])
-    current_feature = features[current_feature_index] if current_feature_index < len(features) else None
+    # Recommencer le tour, en indiquant qu'on revient d'une phase interro
+    room = GameRoom.depuis_etat(session)
+    room.relancer_interro()
+    enregistrer_partie(room)
+    journaliser(EVENEMENT_INTERRO, room)
 
-    return render_template('interro.html', feature=current_feature)
+    return render_template('interro.html', feature=room.feature_courante)
 
-@app.route('/pause', methods=['GET', 'POST'])
+@route('/pause', methods=['GET', 'POST'])
 def pause():
     """
     @brief Affiche l'écran de pause lorsque tous les joueurs ont voté 'cafe'.
     
     @details
-    Sur cette page, deux options :
+    La partie est déjà sauvegardée côté serveur par son journal : elle peut être
+    reprise depuis /load_game avec son code ('game_id'). Sur cette page, deux options :
     - Télécharger la partie sauvegardée.
     - Retourner directement au jeu.
     
-    @return Le template 'pause.html'.
+    @return Le template 'pause.html', ou la sauvegarde de la partie (JSON ou binaire).
     """
     if request.method == 'POST':
-        # Crée un fichier de sauvegarde au format JSON
-        game_state = {
-            "players": session.get("players", []),
-            "features": session.get("features", []),
-            "current_feature_index": session.get("current_feature_index", 0),
-            "index_player": session.get("index_player", 0),
-            "rules": session.get("rules", "unanime"),
-            "results": session.get("results", {}),
-            "liste_vote": session.get("liste_vote", []),
-            "time_limit": session.get("time_limit", None)
-        }
-        save_path = os.path.join(os.getcwd(), "sauvegarde.json")
-        with open(save_path, "w") as f:
-            json.dump(game_state, f)
+        return telecharger_sauvegarde(GameRoom.depuis_etat(session).vers_sauvegarde())
+
+    return render_template('pause.html', game_id=session.get('game_id'))
 
-        return send_file(save_path, as_attachment=True)
 
-    return render_template('pause.html')
+def telecharger_sauvegarde(game_state):
+    """
+    @brief Construit le fichier de sauvegarde téléchargeable d'une partie.
 
-@app.route('/load_game', methods=['GET', 'POST'])
+    @details
+    Le format est choisi par le champ 'format' du formulaire : 'json' (par défaut,
+    interopérable) ou 'binaire' (compact, voir models.sauvegarde). Le fichier est
+    construit en mémoire : aucun fichier partagé entre les parties.
+
+    @param game_state L'état de la partie (GameRoom.vers_sauvegarde()).
+    @return La réponse contenant le fichier, ou une erreur 400 si le format est inconnu.
+    """
+    format_sauvegarde = request.form.get('format', FORMAT_JSON)
+    try:
+        contenu = encoder_sauvegarde(game_state, format_sauvegarde)
+    except ValueError as e:
+        return str(e), 400
+    return send_file(BytesIO(contenu), as_attachment=True,
+                     download_name='sauvegarde' + EXTENSIONS[format_sauvegarde],
+                     mimetype=MIMETYPES[format_sauvegarde])
+
+@route('/load_game', methods=['GET', 'POST'])
 def load_game():
     """
-    @brief Charge l'état d'une partie depuis un fichier JSON uploadé par l'utilisateur.
+    @brief Charge l'état d'une partie depuis son journal ou un fichier JSON uploadé par l'utilisateur.
 
     @details
-    - L'utilisateur upload un fichier JSON via un formulaire.
+    - L'utilisateur donne le code d'une partie ('game_id') : elle est reconstruite
+      depuis son dernier instantané, puis les événements suivants sont rejoués.
+    - Ou l'utilisateur upload un fichier de sauvegarde via un formulaire (JSON ou
+      binaire, détecté automatiquement) : une nouvelle partie journalisée est
+      créée à partir de cet état.
     - L'état du jeu est restauré dans la session.
 
     @return Redirection vers la page de jeu après chargement.
     """
     if request.method == 'POST':
+        game_id = request.form.get('game_id', '').strip()
+        if game_id:
+            if not journaux.existe(game_id):
+                return "Partie introuvable.", 404
+            enregistrer_partie(journaux.journal(game_id).charger())
+            session['game_id'] = game_id
+            session.pop('echeance', None)
+            return redirect(url_for('game'))
+
         file = request.files.get('savefile')
-        if file and file.filename.endswith('.json'):
+        if file and file.filename.endswith(tuple(EXTENSIONS.values())):
             try:
-                game_state = json.load(file)
-                session['players'] = game_state.get("players", [])
-                session['features'] = game_state.get("features", [])
-                session['current_feature_index'] = game_state.get("current_feature_index", 0)
-                session['index_player'] = game_state.get("index_player", 0)
-                session['rules'] = game_state.get("rules", "unanime")
-                session['results'] = game_state.get("results", {})
-                session['liste_vote'] = game_state.get("liste_vote", [])
-                session['time_limit'] = game_state.get("time_limit", None)
+                game_state = decoder_sauvegarde(file.read())
+                room = GameRoom.depuis_etat(game_state)
+                enregistrer_partie(room)
+                session['game_id'] = journaux.creer(room.vers_sauvegarde())
+                session.pop('echeance', None)
                 return redirect(url_for('game'))
             except Exception as e:
                 return f"Erreur lors du chargement de la sauvegarde : {e}", 400
         else:
-            return "Veuillez fournir un fichier JSON valide.", 400
+            return "Veuillez fournir un fichier de sauvegarde valide (.json ou .capi).", 400
     return render_template('load_game.html')
 
-@app.route('/results')
+
+@route('/load_game/preview', methods=['POST'])
+def load_game_preview():
+    """
+    @brief Aperçu d'un fichier de sauvegarde avant son chargement.
+
+    @details
+    Pour une sauvegarde binaire, seuls l'en-tête, les titres et les estimations sont lus :
+    les historiques et les votes ne sont pas chargés.
+
+    @return Réponse JSON avec les joueurs, les règles, le nombre de fonctionnalités et les résultats.
+    """
+    file = request.files.get('savefile')
+    if not file:
+        return jsonify({"error": "Aucun fichier de sauvegarde."}), 400
+    try:
+        entete = lire_apercu(file.stream)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({
+        "players": entete.get('players', []),
+        "rules": entete.get('rules'),
+        "features": len(entete.get('features') or ()),
+        "results": entete.get('results', {}),
+    })
+
+@route('/results')
 def results():
     """
     @brief Affiche les résultats finaux du processus de vote.
-    @return Le template HTML avec les résultats.
+    @return Le template HTML avec les résultats (304 si le backlog n'a pas changé).
     """
-    results = session.get('results', {})
-    return render_template('results.html', results=results)
+    features = features_session()
+    return reponse_conditionnelle(validateurs(features),
+                                  lambda: render_template('results.html', results=features.resultats_par_id()))
 
-@app.route('/export_results', methods=['GET'])
+@route('/export_results', methods=['GET'])
 def export_results():
     """
-    @brief Exporte les résultats finaux (backlog avec estimations) au format JSON.
+    @brief Exporte les résultats finaux (backlog avec estimations et métadonnées).
+
+    @details
+    Paramètres de la requête :
+    - format : 'json' (par défaut), 'csv' ou 'ndjson' ;
+    - gzip : si présent (gzip=1), le fichier est compressé.
     
-    @return Fichier JSON téléchargeable contenant les fonctionnalités et leurs estimations.
+    @return Fichier téléchargeable contenant les fonctionnalités et leurs estimations
+        (304 si le backlog n'a pas changé).
+    """
+    features = features_session()
+    return reponse_conditionnelle(validateurs(features, request.query_string),
+                                  lambda: exporter_resultats(lignes_export(features)))
+
+
+def exporter_resultats(lignes):
+    """
+    @brief Construit la réponse téléchargeable des résultats d'une partie.
+
+    @details
+    Le document est envoyé au fil de l'eau (réponse en streaming) : il n'est
+    jamais construit en entier en mémoire.
+
+    @param lignes Les fonctionnalités chiffrées (voir models.export.lignes_export()).
+    @return La réponse contenant le fichier, ou une erreur 400 s'il n'y a aucun résultat
+        ou si le format est inconnu.
     """
-    # Vérifier que les résultats existent dans la session
-    results = session.get('results', {})
-    if not results:
+    if not lignes:
         return jsonify({"error": "Aucun résultat à exporter."}), 400
 
-    # Créer le contenu du fichier JSON
-    backlog_data = {"backlog": results}
-    json_content = json.dumps(backlog_data, indent=4)
+    format_export = request.args.get('format', FORMAT_EXPORT_JSON)
+    compresse = request.args.get('gzip', '0') not in ('', '0', 'false')
+    try:
+        morceaux = exporter(lignes, format_export, compresse)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    nom_fichier = f'backlog_results.{format_export}'
+    mimetype = MIMETYPES_EXPORT[format_export]
+    if compresse:
+        nom_fichier += '.gz'
+        mimetype = 'application/gzip'
+    return Response(morceaux, mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename={nom_fichier}'})
+
+def page_analytique(requete):
+    """
+    @brief Exécute une requête paginée de l'historique et met en forme la réponse.
+
+    @param requete Fonction recevant la limite et le curseur (paramètres 'limit' et 'cursor').
+    @return Réponse JSON {"items": [...], "next": curseur de la page suivante ou null}.
+    """
+    try:
+        elements, suivant = requete(request.args.get('limit', 50, type=int), request.args.get('cursor'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"items": elements, "next": suivant})
+
+
+def equipe_demandee():
+    """
+    @brief L'équipe désignée par le paramètre 'team' (liste de joueurs séparés par des virgules).
+    """
+    from models.analytics import equipe_de
+
+    team = request.args.get('team')
+    return None if team is None else equipe_de(p.strip() for p in team.split(','))
+
+
+@route('/analytics/velocity')
+def analytics_velocity():
+    """
+    @brief Vélocité d'une équipe : points estimés par période.
+
+    @details
+    Paramètres : team (joueurs séparés par des virgules, toutes les équipes par défaut),
+    period ('jour', 'semaine' ou 'mois'), limit et cursor.
+
+    @return Réponse JSON paginée.
+    """
+    equipe, periode = equipe_demandee(), request.args.get('period', 'semaine')
+    return page_analytique(lambda limite, curseur: analytique.velocite(equipe, periode, limite, curseur))
+
+
+@route('/analytics/spread')
+def analytics_spread():
+    """
+    @brief Dispersion des estimations de chaque fonctionnalité entre les parties.
+
+    @details
+    Paramètres : feature (une seule fonctionnalité), limit et cursor.
+
+    @return Réponse JSON paginée.
+    """
+    feature = request.args.get('feature')
+    return page_analytique(lambda limite, curseur: analytique.dispersion(limite, curseur, feature))
+
+
+@route('/analytics/debated')
+def analytics_debated():
+    """
+    @brief Fonctionnalités ayant demandé le plus de tours de vote.
+
+    @details
+    Paramètres : team, estimate (une estimation finale), limit et cursor.
+
+    @return Réponse JSON paginée.
+    """
+    equipe, estimation = equipe_demandee(), request.args.get('estimate', type=int)
+    return page_analytique(lambda limite, curseur: analytique.plus_debattues(limite, curseur, equipe, estimation))
+
+@route('/rooms', methods=['POST'])
+def create_room():
+    """
+    @brief Crée une nouvelle partie dans le registre des parties.
+
+    @details
+    Les paramètres sont reçus en JSON ({"players": [...], "rules": ..., "time_limit": ...,
+    "features": [...]}) ou via le formulaire de la page de configuration.
+
+    @return Réponse JSON contenant l'identifiant de la partie et l'URL de jeu.
+    """
+    data = request.get_json(silent=True)
+    if data is None:
+        num_players = int(request.form.get('num_players', 0))
+        data = {
+            "players": [request.form.get(f'player_{i+1}') for i in range(num_players)],
+            "rules": request.form.get('rules', 'majorite'),
+            "time_limit": None if request.form.get('no_time_limit') else int(request.form.get('time_limit', 30)),
+            "features": request.form.getlist('feature'),
+            "simultaneous": bool(request.form.get('simultaneous')),
+        }
+    try:
+        room = rooms.creer(
+            data.get("players", []),
+            data.get("rules", "majorite"),
+            data.get("time_limit", 30),
+            data.get("features", []),
+            bool(data.get("simultaneous", False)),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    metriques.parties_creees.inc(mode='room')
+    # L'échéance est enregistrée dans la partie : le registre partagé la conserve
+    with rooms.ouvrir(room.room_id) as room:
+        planifier_echeance(room, ISSUE_SUIVANT)
+    planifier_purge(remplacer=False)
+    return jsonify({"room_id": room.room_id, "url": url_for('room_game', room_id=room.room_id)}), 201
+
+
+def ouvrir_room(room_id):
+    """
+    @brief Donne un accès exclusif à une partie du registre, ou renvoie une erreur 404.
+
+    @param room_id L'identifiant de la partie.
+    @return Le gestionnaire de contexte fourni par RoomRegistry.ouvrir().
+    """
+    if room_id not in rooms:
+        abort(404)
+    return rooms.ouvrir(room_id)
+
+
+@route('/rooms/<room_id>', methods=['GET'])
+def room_state(room_id):
+    """
+    @brief Renvoie l'état d'une partie.
+    @return Réponse JSON résumant la partie.
+    """
+    with ouvrir_room(room_id) as room:
+        return jsonify(room.resume())
+
+
+@route('/rooms/<room_id>/features', methods=['POST'])
+def room_add_feature(room_id):
+    """
+    @brief Ajoute une fonctionnalité à chiffrer dans une partie.
+    @return Réponse JSON confirmant l'ajout ou indiquant une erreur.
+    """
+    data = request.get_json(silent=True) or request.form
+    new_feature = data.get('feature')
+    if not new_feature:
+        return jsonify({"success": False}), 400
+    with ouvrir_room(room_id) as room:
+        if room.features.ajouter(new_feature) is None:
+            return jsonify({"success": False, "error": "Fonctionnalité déjà proposée."}), 409
+        bus.publier(room_id, 'feature', feature=new_feature, current_feature=room.feature_courante)
+        planifier_echeance(room, ISSUE_SUIVANT)
+    return jsonify({"success": True})
+
+
+@route('/rooms/<room_id>/import_backlog', methods=['POST'])
+def room_import_backlog(room_id):
+    """
+    @brief Importe en masse un backlog dans une partie du registre (voir /import_backlog).
+    @return Réponse JSON avec le nombre d'éléments importés, dupliqués et invalides.
+    """
+    with ouvrir_room(room_id) as room:
+        existantes = list(room.features)
+    try:
+        nouvelles, stats = lire_backlog_importe(existantes)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    with ouvrir_room(room_id) as room:
+        # Des fonctionnalités ont pu être ajoutées pendant la lecture : ajouter() les ignore
+        for titre in nouvelles:
+            room.features.ajouter(titre)
+        bus.publier(room_id, 'feature', imported=stats['imported'], current_feature=room.feature_courante)
+        planifier_echeance(room, ISSUE_SUIVANT)
+    return jsonify(stats)
+
+
+@route('/rooms/<room_id>/game', methods=['GET', 'POST'])
+def room_game(room_id):
+    """
+    @brief Gère le processus de vote d'une partie du registre.
+
+    @details
+    Même déroulement que /game, mais l'état est celui de la partie room_id,
+    protégé par son verrou : plusieurs parties avancent en parallèle.
+
+    @return Redirection ou affichage de la page de jeu.
+    """
+    with ouvrir_room(room_id) as room:
+        if room.terminee:
+            return redirect(url_for('room_results', room_id=room_id))
+        if request.method == 'POST':
+            try:
+                issue, details = traiter_vote(room, room.jouer, request.form.get('valeur_choisi', 'interro'))
+            except ValueError as e:
+                return f"Vote invalide : {e}", 400
+            publier_issue(room, issue, details)
+        else:
+            issue = None
+            player, feature, time_limit = room.joueur_courant, room.feature_courante, room.time_limit
+
+    if issue is not None:
+        return repondre_issue(issue, details, room_id)
+    return render_template('game.html', player=player, feature=feature, time_limit=time_limit)
+
+
+@route('/rooms/<room_id>/play')
+def room_play(room_id):
+    """
+    @brief Page de vote simultané d'un joueur, sur son propre appareil.
+
+    @details
+    Les votes sont envoyés à /rooms/<room_id>/vote et l'état de la partie
+    est reçu en temps réel via /rooms/<room_id>/events, sans rechargement de page.
+
+    @return Le template 'room.html'.
+    """
+    with ouvrir_room(room_id) as room:
+        players = list(room.players)
+    return render_template('room.html', room_id=room_id, players=players,
+                           player=request.args.get('player'))
+
+
+@route('/rooms/<room_id>/vote', methods=['POST'])
+def room_vote(room_id):
+    """
+    @brief Enregistre le vote simultané d'un joueur.
+
+    @details
+    Corps JSON attendu : {"player": <nom ou indice>, "valeur": <carte>}.
+    Le tour est évalué dès que tous les joueurs ont voté ; le résultat est
+    poussé à tous les clients abonnés.
+
+    @return Réponse JSON décrivant l'effet du vote.
+    """
+    data = request.get_json(silent=True) or {}
+    with ouvrir_room(room_id) as room:
+        try:
+            issue, details = traiter_vote(room, room.voter, data.get('player'), data.get('valeur', 'interro'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        delta = publier_issue(room, issue, details)
+    return jsonify(delta)
+
+
+@route('/rooms/<room_id>/votes', methods=['POST'])
+def room_vote_async(room_id):
+    """
+    @brief Met en file le vote simultané d'un joueur, sans attendre son traitement.
+
+    @details
+    Corps JSON attendu : {"player": <nom ou indice>, "valeur": <carte>}.
+    Le vote est appliqué par le pipeline d'ingestion (voir appliquer_votes())
+    et son effet est poussé aux clients via /rooms/<room_id>/events.
+    Un vote refusé par un pipeline saturé reçoit une réponse 429 (file de la
+    partie pleine) ou 503 (pipeline plein) avec un en-tête Retry-After.
+
+    @return Réponse JSON 202 indiquant la position du vote dans la file.
+    """
+    data = request.get_json(silent=True) or {}
+    valeur = data.get('valeur', 'interro')
+    try:
+        encoder_carte(valeur)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if room_id not in rooms:
+        abort(404)
+    try:
+        position = ingestion.soumettre(room_id, (data.get('player'), valeur))
+    except FileSaturee as e:
+        metriques.votes_refuses.inc(motif='pipeline' if e.globale else 'partie')
+        return (jsonify({"error": str(e)}), 503 if e.globale else 429,
+                {'Retry-After': str(e.reessayer_apres)})
+    return jsonify({"queued": position}), 202
+
+
+def appliquer_votes(room_id, votes):
+    """
+    @brief Applique un lot de votes simultanés d'une partie (appelée par le pipeline d'ingestion).
+
+    @param room_id L'identifiant de la partie.
+    @param votes Les votes (joueur, valeur), dans l'ordre de soumission.
+
+    @details
+    Le lot est appliqué en une seule prise du verrou de la partie. Les tours
+    clos sont publiés au fil de l'eau ; la progression des bulletins ('vote')
+    n'est publiée qu'une fois, à la fin du lot. Un vote invalide (joueur
+    inconnu) est signalé aux clients par un événement 'erreur'.
+    """
+    if room_id not in rooms:
+        return
+    with rooms.ouvrir(room_id) as room:
+        en_suspens = None
+        for joueur, valeur in votes:
+            try:
+                issue, details = traiter_vote(room, room.voter, joueur, valeur)
+            except ValueError as e:
+                bus.publier(room_id, 'erreur', player=joueur, error=str(e))
+                continue
+            if issue == ISSUE_SUIVANT:
+                en_suspens = (issue, details)
+            else:
+                en_suspens = None
+                publier_issue(room, issue, details)
+        if en_suspens is not None:
+            publier_issue(room, *en_suspens)
+
+
+@route('/rooms/<room_id>/events')
+def room_events(room_id):
+    """
+    @brief Flux Server-Sent Events de la partie.
+
+    @details
+    Le premier événement ('etat') contient l'état complet de la partie, les
+    suivants ('vote', 'tour', 'feature') de petits deltas JSON.
+
+    @return Réponse text/event-stream.
+    """
+    # Le flux est lu après la fin de la requête, hors du contexte de l'application
+    instance = sous_systemes()
+    rafraichir = suivre_room(instance.rooms, room_id) if instance.rooms.partage else None
+    with ouvrir_room(room_id) as room:
+        etat = room.resume()
+    return Response(flux_sse(instance.bus, room_id, etat, rafraichir=rafraichir), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def suivre_room(registre, room_id):
+    """
+    @brief Construit la fonction de rafraîchissement du flux SSE d'une partie partagée.
+
+    @details
+    Les événements du bus ne sont reçus que par les clients du processus qui a
+    traité le vote. Avec un registre partagé entre processus, le flux relit la
+    version de la partie et renvoie son état complet lorsqu'elle a changé.
+
+    @param registre Le registre partagé des parties.
+    @param room_id L'identifiant de la partie.
+    @return Une fonction renvoyant le nouvel état de la partie, ou None.
+    """
+    derniere = registre.version(room_id)
+
+    def rafraichir():
+        nonlocal derniere
+        version = registre.version(room_id)
+        if version is None or version == derniere:
+            return None
+        derniere = version
+        with registre.ouvrir(room_id) as room:
+            return room.resume()
+
+    return rafraichir
+
+
+def publier_issue(room, issue, details):
+    """
+    @brief Pousse aux clients d'une partie l'effet d'un vote.
+
+    @param room La partie (dont le verrou est détenu par l'appelant).
+    @param issue L'issue renvoyée par GameRoom.jouer() ou GameRoom.voter().
+    @param details Les détails associés.
+    @return Le delta publié.
+    """
+    delta = {
+        "issue": issue,
+        "current_feature": room.feature_courante,
+        "current_player": room.joueur_courant,
+        "nb_bulletins": room.nb_bulletins,
+    }
+    if issue == ISSUE_VALIDE:
+        delta.update(feature=details, estimation=room.features.estimation(room.features.id_de(details)))
+    elif issue == ISSUE_DEBAT:
+        delta.update(details)
+    bus.publier(room.room_id, 'vote' if issue == ISSUE_SUIVANT else 'tour', **delta)
+    planifier_echeance(room, issue)
+    return delta
+
+
+def planifier_echeance(room, issue):
+    """
+    @brief Met à jour l'échéance côté serveur du tour d'une partie après un vote.
+
+    @param room La partie (dont le verrou est détenu par l'appelant).
+    @param issue L'issue du dernier vote.
+
+    @details
+    - Un nouveau tour (ou, en tour par tour, un nouveau joueur) démarre le chronomètre.
+    - En mode simultané, les votes d'un tour déjà chronométré ne le relancent pas.
+    - Pendant une pause, une discussion ou un débat, le chronomètre est suspendu
+      jusqu'au vote suivant.
+    L'échéance est enregistrée dans la partie (room.echeance) : avec un registre
+    partagé, seul le chronomètre correspondant à l'échéance courante clôt le tour.
+    """
+    if room.time_limit is None or room.terminee or issue in (ISSUE_PAUSE, ISSUE_INTERRO, ISSUE_DEBAT):
+        scheduler.annuler(room.room_id)
+        room.echeance = None
+    elif issue == ISSUE_SUIVANT and room.simultane and room.echeance is not None:
+        # L'échéance a pu être fixée par un autre processus : elle est planifiée ici aussi
+        scheduler.planifier(room.room_id, max(0.0, room.echeance - time.time()), remplacer=False)
+    else:
+        room.echeance = time.time() + room.time_limit
+        scheduler.planifier(room.room_id, room.time_limit)
+
+
+def traiter_echeance(cle):
+    """
+    @brief Échéance déclenchée par l'échéancier : fin d'un tour chronométré ou purge du registre.
+
+    @param cle L'identifiant de la partie, ou CLE_PURGE.
+    """
+    if cle == CLE_PURGE:
+        purger_rooms()
+    else:
+        expirer_tour(cle)
+
+
+def planifier_purge(remplacer=True):
+    """
+    @brief Planifie la prochaine purge des parties inactives (toutes les CAPI_ROOM_PURGE_INTERVALLE secondes).
+
+    @param remplacer Si False, une purge déjà planifiée est conservée.
+    """
+    scheduler.planifier(CLE_PURGE, float(current_app.config.get('ROOM_PURGE_INTERVALLE', 300)), remplacer=remplacer)
+
+
+def purger_rooms():
+    """
+    @brief Retire du registre les parties inactives, puis planifie la purge suivante.
+
+    @details
+    Une partie en cours est retirée après CAPI_ROOM_INACTIVITE secondes sans
+    activité (6 heures par défaut), une partie terminée après
+    CAPI_ROOM_INACTIVITE_TERMINEE secondes (30 minutes par défaut) : ses
+    résultats restent consultables et exportables entre-temps.
+    Les journaux des parties en mode local sont supprimés après
+    CAPI_JOURNAL_RETENTION secondes sans activité (7 jours par défaut) :
+    une partie en pause café peut être reprise avec son code jusque-là.
+    """
+    config = current_app.config
+    try:
+        for room_id in rooms.purger(float(config.get('ROOM_INACTIVITE', 6 * 3600)),
+                                    float(config.get('ROOM_INACTIVITE_TERMINEE', 1800))):
+            scheduler.annuler(room_id)
+        journaux.purger(float(config.get('JOURNAL_RETENTION', 7 * 24 * 3600)))
+    finally:
+        planifier_purge()
+
+
+def expirer_tour(room_id):
+    """
+    @brief Clôt le tour d'une partie dont le temps limite est écoulé.
+
+    @details
+    Appelée par l'échéancier : les joueurs n'ayant pas voté votent "interro"
+    (voir GameRoom.expirer_tour()) et le résultat est poussé aux clients.
+
+    @param room_id L'identifiant de la partie.
+    """
+    if room_id not in rooms:
+        return
+    with rooms.ouvrir(room_id) as room:
+        if room.echeance is None or time.time() < room.echeance - TOLERANCE_ECHEANCE:
+            # Tour déjà clos ou relancé entre-temps, éventuellement par un autre processus
+            return
+        issue, details = traiter_vote(room, room.expirer_tour)
+        publier_issue(room, issue, details)
+
+
+@route('/rooms/<room_id>/interro')
+def room_interro(room_id):
+    """
+    @brief Phase de discussion d'une partie du registre (voir /interro).
+    @return Le template 'interro.html'.
+    """
+    with ouvrir_room(room_id) as room:
+        room.relancer_interro()
+        feature = room.feature_courante
+    return render_template('interro.html', feature=feature, game_url=url_for('room_game', room_id=room_id))
+
+
+@route('/rooms/<room_id>/pause', methods=['GET', 'POST'])
+def room_pause(room_id):
+    """
+    @brief Écran de pause d'une partie du registre (voir /pause).
+    @return Le template 'pause.html', ou la sauvegarde de la partie (JSON ou binaire).
+    """
+    if request.method == 'POST':
+        with ouvrir_room(room_id) as room:
+            game_state = room.vers_sauvegarde()
+        return telecharger_sauvegarde(game_state)
+    return render_template('pause.html',
+                           pause_url=url_for('room_pause', room_id=room_id),
+                           game_url=url_for('room_game', room_id=room_id))
+
+
+@route('/rooms/<room_id>/results')
+def room_results(room_id):
+    """
+    @brief Affiche les résultats d'une partie du registre.
+    @return Le template HTML avec les résultats (304 si le backlog n'a pas changé).
+    """
+    with ouvrir_room(room_id) as room:
+        cache = validateurs(room.features)
+        results = room.features.resultats_par_id()
+    return reponse_conditionnelle(cache, lambda: render_template(
+        'results.html', results=results, export_url=url_for('room_export_results', room_id=room_id)))
+
+
+@route('/rooms/<room_id>/export_results', methods=['GET'])
+def room_export_results(room_id):
+    """
+    @brief Exporte les résultats d'une partie du registre (voir /export_results).
+    @return Fichier téléchargeable contenant les fonctionnalités et leurs estimations.
+    """
+    with ouvrir_room(room_id) as room:
+        # Les lignes ne sont construites que si le client n'a pas déjà cette version
+        return reponse_conditionnelle(validateurs(room.features, request.query_string),
+                                      lambda: exporter_resultats(lignes_export(room.features)))
+
+_application = None
+_verrou_application = threading.Lock()
+
+
+def application_par_defaut():
+    """
+    @brief L'application par défaut (app), configurée par les variables d'environnement CAPI_*.
+
+    @details
+    Elle n'est créée qu'au premier accès : importer le module (tests,
+    create_app()) ne construit aucune instance.
+    """
+    global _application
+    with _verrou_application:
+        if _application is None:
+            _application = create_app()
+        return _application
+
 
-    # Créer un fichier JSON téléchargeable en mémoire
-    buffer = BytesIO()
-    buffer.write(json_content.encode('utf-8'))
-    buffer.seek(0)
+def __getattr__(nom):
+    # from app import app : l'application par défaut, créée à la demande
+    if nom == 'app':
+        return application_par_defaut()
+    raise AttributeError(f"module {__name__!r} has no attribute {nom!r}")
 
-    return send_file(buffer, 
-                     as_attachment=True, 
-                     download_name='backlog_results.json', 
-                     mimetype='application/json')
 
 if __name__ == '__main__':
     """
-    @brief Point d'entrée de l'application Flask.
+    @brief Point d'entrée de l'application Flask (développement, mode debug).
     """
-    app.run(debug=True)
\ No newline at end of file
+    create_app({'DEBUG': True}).run(debug=True)
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+@brief Banc d'essai des performances du cœur de vote et du parcours des requêtes Flask.
+
+@details
+Lancer l'ensemble des mesures avec `python -m benchmarks` (voir `python -m benchmarks --help`).
+Chaque mesure rapporte le débit (opérations par seconde), les percentiles de
+latence et le pic de mémoire allouée.
+"""
@@ -0,0 +1,51 @@
+import argparse
+import sys
+
+import benchmarks
+from benchmarks import bench_demarrage, bench_flask, bench_sauvegarde, bench_suggestions, bench_vote
+from benchmarks.mesure import formater_rapport
+
+# Suites de mesures : nom -> (module, répétitions par défaut)
+SUITES = {
+    'vote': (bench_vote, 2000),
+    'flask': (bench_flask, 20),
+    'sauvegarde': (bench_sauvegarde, 20),
+    'suggestions': (bench_suggestions, 200),
+    'demarrage': (bench_demarrage, 10),
+}
+
+
+def main(arguments=None):
+    """
+    @brief Lance les mesures demandées et affiche le rapport.
+
+    @param arguments Les arguments de la ligne de commande (sys.argv par défaut).
+    @return Le code de sortie du programme.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=benchmarks.__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('suites', nargs='*', metavar='suite',
+                        help=f"Suites à lancer parmi {', '.join(SUITES)} (toutes par défaut).")
+    parser.add_argument('--facteur', type=float, default=1.0,
+                        help="Multiplie le nombre de répétitions (ex. 0.1 pour un essai rapide).")
+    parser.add_argument('--sortie', help="Fichier dans lequel écrire aussi le rapport (ex. bench_output.txt).")
+    options = parser.parse_args(arguments)
+    inconnues = set(options.suites) - set(SUITES)
+    if inconnues:
+        parser.error(f"suite inconnue : {', '.join(sorted(inconnues))}")
+
+    resultats = []
+    for nom in options.suites or SUITES:
+        module, repetitions = SUITES[nom]
+        resultats.extend(module.executer(max(int(repetitions * options.facteur), 3)))
+
+    rapport = formater_rapport(resultats)
+    print(rapport)
+    if options.sortie:
+        with open(options.sortie, 'w', encoding='utf-8') as f:
+            f.write(rapport + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
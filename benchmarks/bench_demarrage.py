@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+from benchmarks.mesure import mesurer
+
+# Répertoire du projet, pour lancer les interpréteurs mesurés depuis n'importe où
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Démarrages mesurés, chacun dans un nouvel interpréteur : nom -> code exécuté
+DEMARRAGES = {
+    "démarrage : import app": "import app",
+    "démarrage : import app + première requête":
+        "from app import create_app; create_app({'TESTING': True}).test_client().get('/')",
+}
+
+
+def lancer(code):
+    """
+    @brief Exécute du code dans un nouvel interpréteur Python, depuis la racine du projet.
+    """
+    subprocess.run([sys.executable, '-c', code], cwd=RACINE, check=True)
+
+
+def executer(repetitions=10):
+    """
+    @brief Mesure le démarrage à froid de l'application et la création d'une instance.
+
+    @param repetitions Le nombre de démarrages chronométrés par mesure.
+    @return La liste des résultats de mesurer().
+
+    @details
+    Un démarrage à froid est celui d'un processus de service ou d'un module
+    de test : il comprend l'import des modules et la création de l'application.
+    La création d'une instance supplémentaire (create_app()) est mesurée dans
+    le processus courant.
+    """
+    resultats = [mesurer(nom, lambda code=code: lancer(code), repetitions, echauffement=1)
+                 for nom, code in DEMARRAGES.items()]
+    from app import create_app
+    resultats.append(mesurer("create_app()", lambda: create_app({'TESTING': True}), repetitions * 10))
+    return resultats
@@ -0,0 +1,76 @@
+import itertools
+import os
+import tempfile
+from contextlib import contextmanager
+
+from app import create_app
+from benchmarks.mesure import mesurer
+
+# Tailles de partie mesurées : (nombre de joueurs, nombre de fonctionnalités)
+TAILLES_PARTIE = ((3, 5), (8, 20), (20, 50))
+
+
+def jouer_partie(client, nb_joueurs, nb_features):
+    """
+    @brief Joue une partie complète via le client de test Flask.
+
+    @details
+    Parcours /settings -> /propose_features -> /game -> /results : chaque
+    fonctionnalité est validée au premier tour, à l'unanimité.
+    """
+    donnees = {'num_players': nb_joueurs, 'rules': 'unanime', 'no_time_limit': '1', 'time_limit': 30}
+    donnees.update({f'player_{i + 1}': f'Joueur {i + 1}' for i in range(nb_joueurs)})
+    client.post('/settings', data=donnees)
+    for i in range(nb_features):
+        client.post('/propose_features', data={'feature': f'Fonctionnalité {i}'})
+    for _ in range(nb_joueurs * nb_features):
+        client.post('/game', data={'valeur_choisi': '5'})
+    response = client.get('/results')
+    if response.status_code != 200:
+        raise RuntimeError(f"/results a répondu {response.status_code}")
+
+
+@contextmanager
+def application_temporaire(config=None):
+    """
+    @brief Crée une instance de l'application dont tous les fichiers sont écrits dans un répertoire temporaire.
+
+    @param config Configuration complémentaire de l'instance.
+    @return (via with) L'application : les parties jouées ne sont archivées ni
+        dans les journaux ni dans l'historique des estimations de l'instance réelle.
+    """
+    with tempfile.TemporaryDirectory() as repertoire:
+        instance = create_app({
+            'TESTING': True,
+            'JOURNAL_DIR': os.path.join(repertoire, 'parties'),
+            'ANALYTICS_PATH': os.path.join(repertoire, 'analytics.sqlite3'),
+            'SESSION_SQLITE_PATH': os.path.join(repertoire, 'sessions.sqlite3'),
+            'ROOM_SQLITE_PATH': os.path.join(repertoire, 'rooms.sqlite3'),
+            **(config or {}),
+        })
+        try:
+            yield instance
+        finally:
+            sous_systemes = instance.extensions['capi']
+            # Arrêt des threads de fond avant la suppression du répertoire
+            if '_ingestion' in vars(sous_systemes):
+                sous_systemes.ingestion.arreter()
+            if '_scheduler' in vars(sous_systemes):
+                sous_systemes.scheduler.arreter()
+
+
+def executer(repetitions=20):
+    """
+    @brief Mesure une partie complète à travers la pile Flask (sessions comprises).
+
+    @param repetitions Le nombre de parties chronométrées par taille.
+    @return La liste des résultats de mesurer().
+    """
+    resultats = []
+    with application_temporaire() as app:
+        for nb_joueurs, nb_features in TAILLES_PARTIE:
+            clients = itertools.cycle([app.test_client() for _ in range(4)])
+            resultats.append(mesurer(f"partie Flask {nb_joueurs} joueurs x {nb_features} features",
+                                     lambda client: jouer_partie(client, nb_joueurs, nb_features),
+                                     repetitions, echauffement=1, preparer=clients.__next__))
+    return resultats
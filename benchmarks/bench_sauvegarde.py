@@ -0,0 +1,55 @@
+import io
+
+from benchmarks.mesure import mesurer
+from models.export import exporter, lignes_export, FORMAT_JSON, FORMAT_CSV, FORMAT_NDJSON
+from models.room import GameRoom
+from models.sauvegarde import encoder_sauvegarde, decoder_sauvegarde, lire_apercu, FORMAT_BINAIRE
+
+# Tailles de backlog mesurées
+TAILLES_BACKLOG = (1000, 20000)
+
+
+def partie_chiffree(nb_features, nb_joueurs=5):
+    """
+    @brief Construit une partie dont toutes les fonctionnalités sont chiffrées.
+    """
+    room = GameRoom(players=[f"Joueur {i}" for i in range(nb_joueurs)], rules="majorite",
+                    features=[f"Fonctionnalité {i}" for i in range(nb_features)])
+    cartes = ("3", "5", "8")
+    for i in range(nb_features):
+        for j in range(nb_joueurs):
+            room.jouer(cartes[(i + j) % 3] if j else cartes[i % 3])
+    return room
+
+
+def executer(repetitions=20):
+    """
+    @brief Mesure la sauvegarde, le chargement et l'export de grands backlogs.
+
+    @param repetitions Le nombre d'appels chronométrés par mesure.
+    @return La liste des résultats de mesurer().
+    """
+    resultats = []
+    for taille in TAILLES_BACKLOG:
+        room = partie_chiffree(taille)
+        etat = room.vers_sauvegarde()
+        for format_sauvegarde in ('json', FORMAT_BINAIRE):
+            donnees = encoder_sauvegarde(etat, format_sauvegarde)
+            resultats.append(mesurer(f"sauvegarde {format_sauvegarde} {taille} features",
+                                     lambda: encoder_sauvegarde(room.vers_sauvegarde(), format_sauvegarde),
+                                     repetitions, echauffement=1))
+            resultats.append(mesurer(f"chargement {format_sauvegarde} {taille} features",
+                                     lambda: GameRoom.depuis_etat(decoder_sauvegarde(donnees)),
+                                     repetitions, echauffement=1))
+            resultats.append(mesurer(f"aperçu {format_sauvegarde} {taille} features",
+                                     lambda: lire_apercu(io.BytesIO(donnees)),
+                                     repetitions, echauffement=1))
+
+        for format_export in (FORMAT_JSON, FORMAT_CSV, FORMAT_NDJSON):
+            resultats.append(mesurer(f"export {format_export} {taille} features",
+                                     lambda: sum(map(len, exporter(lignes_export(room.features), format_export))),
+                                     repetitions, echauffement=1))
+        resultats.append(mesurer(f"export json gzip {taille} features",
+                                 lambda: sum(map(len, exporter(lignes_export(room.features), compresse=True))),
+                                 repetitions, echauffement=1))
+    return resultats
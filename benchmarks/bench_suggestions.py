@@ -0,0 +1,44 @@
+import random
+import string
+
+from benchmarks.mesure import mesurer
+from models.suggestions import IndexSimilarite
+
+# Taille de l'historique indexé
+TAILLE_HISTORIQUE = 100000
+
+
+def generer_titres(nombre, taille_vocabulaire=3000, graine=0):
+    """
+    @brief Génère des titres de fonctionnalités reproductibles (mots tirés selon une loi de Zipf).
+    """
+    aleatoire = random.Random(graine)
+    vocabulaire = ["".join(aleatoire.choice(string.ascii_lowercase) for _ in range(aleatoire.randint(4, 10)))
+                   for _ in range(taille_vocabulaire)]
+    poids = [1 / (rang + 1) for rang in range(taille_vocabulaire)]
+    return [" ".join(aleatoire.choices(vocabulaire, poids, k=aleatoire.randint(3, 6))) for _ in range(nombre)]
+
+
+def executer(repetitions=200):
+    """
+    @brief Mesure la construction de l'index de similarité et les recherches sur un grand historique.
+
+    @param repetitions Le nombre de recherches chronométrées par mesure.
+    @return La liste des résultats de mesurer().
+    """
+    titres = generer_titres(TAILLE_HISTORIQUE)
+    estimations = [(titre, (1, 2, 3, 5, 8, 13)[i % 6]) for i, titre in enumerate(titres)]
+    index = IndexSimilarite(taille_cache=0)
+    resultats = [mesurer(f"chargement {TAILLE_HISTORIQUE} estimations",
+                         lambda: IndexSimilarite().charger(estimations), repetitions=1, echauffement=0)]
+    index.charger(estimations)
+
+    # Requêtes inédites : un titre de l'historique amputé de sa dernière lettre
+    requetes = iter([titre[:-1] for titre in generer_titres(repetitions + 20, graine=1)])
+    resultats.append(mesurer(f"recherche {TAILLE_HISTORIQUE} estimations", lambda requete: index.suggerer(requete),
+                             repetitions, preparer=lambda: next(requetes)))
+    cache = IndexSimilarite()
+    cache.charger(estimations[:1000])
+    cache.suggerer(titres[0])
+    resultats.append(mesurer("recherche en cache", lambda: cache.suggerer(titres[0]), repetitions))
+    return resultats
@@ -0,0 +1,97 @@
+import itertools
+import random
+from collections import Counter
+
+from benchmarks.mesure import mesurer
+from models.cartes import VALEURS_CARTES, encoder_votes
+from models.game import valider_vote, valider_majorite_decompte, valider_codes, valider_votes_lot
+
+# Tailles d'équipe mesurées
+TAILLES_EQUIPE = (3, 8, 20, 100)
+
+# Nombre de tours distincts générés par mesure, joués en boucle
+NB_TOURS = 64
+
+CARTES_NUMERIQUES = [str(v) for v in VALEURS_CARTES if isinstance(v, int)]
+
+
+def tour_consensus(rng, taille):
+    """
+    @brief Tous les joueurs votent la même carte.
+    """
+    carte = rng.choice(CARTES_NUMERIQUES)
+    return [carte] * taille
+
+
+def tour_majoritaire(rng, taille):
+    """
+    @brief Environ deux tiers des joueurs votent la même carte, les autres au hasard.
+    """
+    carte = rng.choice(CARTES_NUMERIQUES)
+    return [carte if rng.random() < 0.66 else rng.choice(CARTES_NUMERIQUES) for _ in range(taille)]
+
+
+def tour_disperse(rng, taille):
+    """
+    @brief Chaque joueur vote une carte au hasard, cartes spéciales comprises.
+    """
+    return [str(rng.choice(VALEURS_CARTES)) for _ in range(taille)]
+
+
+def tour_cafe(rng, taille):
+    """
+    @brief La plupart des joueurs demandent une pause café.
+    """
+    return ['cafe' if rng.random() < 0.8 else rng.choice(CARTES_NUMERIQUES) for _ in range(taille)]
+
+
+DISTRIBUTIONS = {
+    'consensus': tour_consensus,
+    'majoritaire': tour_majoritaire,
+    'disperse': tour_disperse,
+    'cafe': tour_cafe,
+}
+
+
+def generer_tours(distribution, taille, nb_tours=NB_TOURS, graine=0):
+    """
+    @brief Génère des tours de vote reproductibles.
+
+    @param distribution Le nom d'une distribution de DISTRIBUTIONS.
+    @param taille Le nombre de joueurs.
+    @return La liste des tours (listes de votes).
+    """
+    rng = random.Random(graine)
+    return [DISTRIBUTIONS[distribution](rng, taille) for _ in range(nb_tours)]
+
+
+def executer(repetitions=2000):
+    """
+    @brief Mesure la validation des votes selon la taille d'équipe et la distribution des cartes.
+
+    @param repetitions Le nombre d'appels chronométrés par mesure.
+    @return La liste des résultats de mesurer().
+    """
+    resultats = []
+    for taille, distribution in itertools.product(TAILLES_EQUIPE, DISTRIBUTIONS):
+        tours = generer_tours(distribution, taille)
+        suivant = itertools.cycle(tours).__next__
+        resultats.append(mesurer(f"valider_vote majorite n={taille} {distribution}",
+                                 lambda votes: valider_vote(votes, 'majorite'),
+                                 repetitions, preparer=suivant))
+
+        decomptes = itertools.cycle([Counter(v for v in tour if v not in ('cafe', 'interro')) for tour in tours])
+        resultats.append(mesurer(f"valider_majorite_decompte n={taille} {distribution}",
+                                 valider_majorite_decompte, repetitions, preparer=decomptes.__next__))
+
+        codes = itertools.cycle([encoder_votes(tour) for tour in tours])
+        resultats.append(mesurer(f"valider_codes majorite n={taille} {distribution}",
+                                 lambda tour: valider_codes(tour, 'majorite'),
+                                 repetitions, preparer=codes.__next__))
+
+    # Validation vectorisée d'un lot de tours
+    lot = generer_tours('majoritaire', 8, nb_tours=10000)
+    resultats.append(mesurer("valider_votes_lot majorite 10000 tours n=8",
+                             lambda: valider_votes_lot(lot, 'majorite'),
+                             max(repetitions // 200, 3), echauffement=1))
+    return resultats
@@ -0,0 +1,325 @@
+"""
+@brief Générateur de charge : des équipes virtuelles jouent des parties complètes en parallèle.
+
+@details
+Chaque équipe joue /settings -> /propose_features -> /game (votes, débats, pauses
+café, phases interro, temps écoulés) -> /results -> /export_results, dans son propre
+thread et avec sa propre session. La cible est soit le client de test Flask (par
+défaut), soit une instance lancée à l'adresse donnée par --url.
+
+Exemple : python -m benchmarks.charge --equipes 50 --joueurs 5 --features 10 --profil realiste
+"""
+import argparse
+import http.cookiejar
+import random
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.mesure import percentile
+
+# Cartes numériques du jeu
+CARTES = ('1', '2', '3', '5', '8', '13', '20', '40', '100')
+
+# Vote simulé d'un joueur qui laisse passer le temps limite (aucune carte envoyée)
+TEMPS_ECOULE = None
+
+# Profils de vote : probabilité de voter la carte de consensus de la fonctionnalité,
+# de jouer café, interro ou de laisser passer le temps (le reste : une carte au hasard)
+PROFILS = {
+    'consensus': {'consensus': 1.0, 'cafe': 0.0, 'interro': 0.0, 'temps_ecoule': 0.0},
+    'realiste': {'consensus': 0.75, 'cafe': 0.02, 'interro': 0.03, 'temps_ecoule': 0.02},
+    'disperse': {'consensus': 0.4, 'cafe': 0.05, 'interro': 0.05, 'temps_ecoule': 0.05},
+}
+
+# Nombre maximal de votes envoyés par une équipe, pour borner une partie qui ne converge pas
+MAX_VOTES_PAR_FEATURE = 200
+
+
+class ClientFlask:
+    """
+    @brief Transport vers l'application via le client de test Flask (une session par équipe).
+    """
+
+    def __init__(self, app):
+        """
+        @param app L'application Flask (voir benchmarks.bench_flask.application_temporaire()).
+        """
+        self.client = app.test_client()
+
+    def requete(self, methode, chemin, donnees=None):
+        """
+        @brief Envoie une requête sans suivre les redirections.
+
+        @return Un tuple (statut, location, nombre d'octets reçus).
+        """
+        response = self.client.open(chemin, method=methode, data=donnees)
+        return response.status_code, response.headers.get('Location'), len(response.get_data())
+
+
+class _SansRedirection(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class ClientHTTP:
+    """
+    @brief Transport HTTP vers une instance lancée (un jeu de cookies par équipe).
+    """
+
+    def __init__(self, url):
+        self.url = url.rstrip('/')
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _SansRedirection())
+
+    def requete(self, methode, chemin, donnees=None):
+        """
+        @brief Envoie une requête sans suivre les redirections.
+
+        @return Un tuple (statut, location, nombre d'octets reçus).
+        """
+        corps = urllib.parse.urlencode(donnees).encode() if donnees is not None else None
+        requete = urllib.request.Request(self.url + chemin, data=corps, method=methode)
+        try:
+            with self.opener.open(requete, timeout=30) as response:
+                return response.status, response.headers.get('Location'), len(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Location'), len(e.read())
+
+
+class Statistiques:
+    """
+    @brief Latences et erreurs collectées par toutes les équipes.
+    """
+
+    def __init__(self):
+        self.latences = {}   # étape -> liste des latences (secondes)
+        self.erreurs = {}    # étape -> nombre de réponses en erreur ou d'exceptions
+        self.parties = 0
+        self.parties_en_echec = 0
+        self._lock = threading.Lock()
+
+    def enregistrer(self, etape, latences, erreurs):
+        """
+        @brief Fusionne les mesures d'une équipe (une seule prise de verrou par partie).
+        """
+        with self._lock:
+            for nom, valeurs in latences.items():
+                self.latences.setdefault(nom, []).extend(valeurs)
+            for nom, nombre in erreurs.items():
+                self.erreurs[nom] = self.erreurs.get(nom, 0) + nombre
+            self.parties += 1
+            self.parties_en_echec += etape is not None
+
+    def rapport(self, duree):
+        """
+        @brief Met en forme le débit, les latences par étape et le taux d'erreur.
+
+        @param duree La durée totale du test, en secondes.
+        """
+        toutes = sorted(l for valeurs in self.latences.values() for l in valeurs)
+        nb_requetes = len(toutes)
+        nb_erreurs = sum(self.erreurs.values())
+        lignes = [
+            f"parties : {self.parties} ({self.parties_en_echec} en échec) en {duree:.2f} s "
+            f"-> {self.parties / duree:.1f} parties/s",
+            f"requêtes : {nb_requetes} -> {nb_requetes / duree:.1f} req/s, "
+            f"erreurs : {nb_erreurs} ({100 * nb_erreurs / max(nb_requetes, 1):.2f} %)",
+            "",
+            f"{'étape':<18} {'requêtes':>9} {'erreurs':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}",
+        ]
+        for nom, valeurs in sorted(self.latences.items()) + [('total', toutes)]:
+            valeurs = sorted(valeurs)
+            if not valeurs:
+                continue
+            erreurs = nb_erreurs if nom == 'total' else self.erreurs.get(nom, 0)
+            lignes.append(f"{nom:<18} {len(valeurs):>9} {erreurs:>8} "
+                          f"{1000 * percentile(valeurs, 50):>9.2f} {1000 * percentile(valeurs, 95):>9.2f} "
+                          f"{1000 * percentile(valeurs, 99):>9.2f} {1000 * valeurs[-1]:>9.2f}")
+        return '\n'.join(lignes)
+
+
+class Equipe:
+    """
+    @brief Une équipe virtuelle jouant une partie complète.
+    """
+
+    def __init__(self, client, numero, nb_joueurs, nb_features, profil, rules='majorite', graine=None):
+        self.client = client
+        self.numero = numero
+        self.nb_joueurs = nb_joueurs
+        self.nb_features = nb_features
+        self.profil = PROFILS[profil]
+        self.rules = rules
+        self.rng = random.Random(graine)
+        self.latences = {}
+        self.erreurs = {}
+
+    def requete(self, etape, methode, chemin, donnees=None):
+        """
+        @brief Envoie une requête chronométrée.
+
+        @return Le tuple (statut, location) de la réponse.
+        @exception RuntimeError Si la réponse est une erreur.
+        """
+        debut = time.perf_counter()
+        try:
+            statut, location, _ = self.client.requete(methode, chemin, donnees)
+        except Exception:
+            self.erreurs[etape] = self.erreurs.get(etape, 0) + 1
+            raise
+        finally:
+            self.latences.setdefault(etape, []).append(time.perf_counter() - debut)
+        if statut >= 400:
+            self.erreurs[etape] = self.erreurs.get(etape, 0) + 1
+            raise RuntimeError(f"{methode} {chemin} : statut {statut}")
+        return statut, location
+
+    def choisir_vote(self, carte_consensus):
+        """
+        @brief Tire le vote d'un joueur selon le profil de l'équipe.
+
+        @return La carte jouée, ou TEMPS_ECOULE si le joueur laisse passer le temps.
+        """
+        tirage = self.rng.random()
+        for issue, carte in (('cafe', 'cafe'), ('interro', 'interro'), ('temps_ecoule', TEMPS_ECOULE)):
+            tirage -= self.profil[issue]
+            if tirage < 0:
+                return carte
+        if tirage < self.profil['consensus']:
+            return carte_consensus
+        return self.rng.choice(CARTES)
+
+    def jouer(self):
+        """
+        @brief Joue une partie complète.
+
+        @return None si la partie s'est terminée normalement, sinon le nom de l'étape en échec.
+        """
+        etape = 'settings'
+        try:
+            donnees = {'num_players': self.nb_joueurs, 'rules': self.rules, 'time_limit': 30}
+            donnees.update({f'player_{i + 1}': f'Équipe {self.numero} joueur {i + 1}' for i in range(self.nb_joueurs)})
+            self.requete(etape, 'POST', '/settings', donnees)
+
+            etape = 'propose_features'
+            for i in range(self.nb_features):
+                self.requete(etape, 'POST', '/propose_features', {'feature': f'Fonctionnalité {i}'})
+
+            etape = 'game'
+            self.voter()
+
+            etape = 'results'
+            self.requete(etape, 'GET', '/results')
+            etape = 'export_results'
+            self.requete(etape, 'GET', '/export_results?format=' + self.rng.choice(('json', 'csv', 'ndjson')))
+        except Exception:
+            return etape
+        return None
+
+    def voter(self):
+        """
+        @brief Enchaîne les votes jusqu'à la fin de la partie, en suivant les redirections du serveur.
+
+        @details
+        Les joueurs votent à tour de rôle ; une nouvelle carte de consensus est
+        tirée à chaque tour. Après un débat ou une phase interro, le premier vote
+        envoyé relance le tour sans être compté (voir GameRoom.jouer()).
+        """
+        consensus = self.rng.choice(CARTES)
+        votes_du_tour = 0
+        relance = False
+        for _ in range(MAX_VOTES_PAR_FEATURE * self.nb_features):
+            vote = self.choisir_vote(consensus)
+            donnees = {} if vote is TEMPS_ECOULE else {'valeur_choisi': vote}
+            statut, location = self.requete('game', 'POST', '/game', donnees)
+            if relance:
+                relance = False
+                continue
+            votes_du_tour += 1
+            if votes_du_tour == self.nb_joueurs:
+                votes_du_tour = 0
+                consensus = self.rng.choice(CARTES)
+
+            if statut == 200:
+                # Page de débat : retour au jeu, puis nouveau tour
+                self.requete('debate', 'GET', '/debate')
+                relance = True
+                continue
+            chemin = urllib.parse.urlsplit(location or '').path
+            if chemin.endswith('/results'):
+                return
+            if chemin.endswith('/pause'):
+                self.requete('pause', 'GET', '/pause')
+            elif chemin.endswith('/interro'):
+                self.requete('interro', 'GET', '/interro')
+                relance = True
+        raise RuntimeError("La partie n'a pas convergé.")
+
+
+def lancer(nb_equipes=10, nb_joueurs=5, nb_features=10, profil='realiste', url=None,
+           parties_par_equipe=1, graine=0, app=None):
+    """
+    @brief Lance des équipes virtuelles en parallèle et collecte leurs mesures.
+
+    @param nb_equipes Le nombre d'équipes jouant en même temps (un thread par équipe).
+    @param nb_joueurs Le nombre de joueurs par équipe.
+    @param nb_features Le nombre de fonctionnalités par partie.
+    @param profil Le profil de vote (voir PROFILS).
+    @param url L'adresse d'une instance lancée, ou None pour le client de test Flask.
+    @param parties_par_equipe Le nombre de parties jouées successivement par chaque équipe.
+    @param graine La graine des tirages aléatoires.
+    @param app L'application servie par le client de test Flask (sans url) ; par défaut,
+        une instance dont les fichiers sont temporaires.
+    @return Un tuple (statistiques, durée en secondes).
+    """
+    if profil not in PROFILS:
+        raise ValueError(f"Profil inconnu : {profil!r}. Profils : {', '.join(PROFILS)}")
+    if url is None and app is None:
+        from benchmarks.bench_flask import application_temporaire
+        with application_temporaire() as app:
+            return lancer(nb_equipes, nb_joueurs, nb_features, profil, url, parties_par_equipe, graine, app)
+    statistiques = Statistiques()
+
+    def jouer_equipe(numero):
+        client = ClientHTTP(url) if url else ClientFlask(app)
+        for partie in range(parties_par_equipe):
+            equipe = Equipe(client, numero, nb_joueurs, nb_features, profil,
+                            graine=f'{graine}-{numero}-{partie}')
+            echec = equipe.jouer()
+            statistiques.enregistrer(echec, equipe.latences, equipe.erreurs)
+
+    debut = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=nb_equipes) as executeur:
+        list(executeur.map(jouer_equipe, range(nb_equipes)))
+    return statistiques, time.perf_counter() - debut
+
+
+def main(arguments=None):
+    """
+    @brief Point d'entrée en ligne de commande.
+    """
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.charge',
+                                     description="Simule des équipes jouant des parties complètes en parallèle.")
+    parser.add_argument('--equipes', type=int, default=10, help="Équipes simultanées (défaut : 10).")
+    parser.add_argument('--joueurs', type=int, default=5, help="Joueurs par équipe (défaut : 5).")
+    parser.add_argument('--features', type=int, default=10, help="Fonctionnalités par partie (défaut : 10).")
+    parser.add_argument('--parties', type=int, default=1, help="Parties jouées par équipe (défaut : 1).")
+    parser.add_argument('--profil', choices=list(PROFILS), default='realiste', help="Profil de vote.")
+    parser.add_argument('--url', help="Adresse d'une instance lancée (ex. http://127.0.0.1:5000). "
+                                      "Par défaut, le client de test Flask est utilisé.")
+    parser.add_argument('--graine', type=int, default=0, help="Graine des tirages aléatoires.")
+    options = parser.parse_args(arguments)
+
+    statistiques, duree = lancer(options.equipes, options.joueurs, options.features, options.profil,
+                                 options.url, options.parties, options.graine)
+    print(statistiques.rapport(duree))
+    return 1 if statistiques.parties_en_echec else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
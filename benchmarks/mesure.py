@@ -0,0 +1,94 @@
+import gc
+import math
+import time
+import tracemalloc
+
+
+def mesurer(nom, fonction, repetitions=1000, echauffement=10, preparer=None):
+    """
+    @brief Mesure une opération : débit, percentiles de latence et mémoire.
+
+    @param nom Le nom de la mesure, affiché dans le rapport.
+    @param fonction L'opération à mesurer, appelée sans argument
+        (ou avec le résultat de preparer()).
+    @param repetitions Le nombre d'appels chronométrés.
+    @param echauffement Le nombre d'appels préalables, non chronométrés.
+    @param preparer Fonction appelée avant chaque appel, hors chronométrage ;
+        son résultat est passé à l'opération.
+    @return Un dictionnaire {'nom', 'repetitions', 'ops_par_s', 'p50_us', 'p95_us',
+        'p99_us', 'max_us', 'memoire_ko'}.
+
+    @details
+    Les latences sont mesurées avec time.perf_counter_ns, ramasse-miettes
+    désactivé. Le pic de mémoire est mesuré par tracemalloc lors d'un appel
+    supplémentaire, séparé pour ne pas fausser les latences.
+    """
+    def appeler():
+        if preparer is None:
+            return fonction()
+        return fonction(preparer())
+
+    for _ in range(echauffement):
+        appeler()
+
+    latences = []
+    gc_actif = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repetitions):
+            argument = preparer() if preparer is not None else None
+            debut = time.perf_counter_ns()
+            if preparer is None:
+                fonction()
+            else:
+                fonction(argument)
+            latences.append(time.perf_counter_ns() - debut)
+    finally:
+        if gc_actif:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        appeler()
+        _, pic = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    latences.sort()
+    total = sum(latences) or 1
+    return {
+        'nom': nom,
+        'repetitions': repetitions,
+        'ops_par_s': repetitions * 1e9 / total,
+        'p50_us': percentile(latences, 50) / 1000,
+        'p95_us': percentile(latences, 95) / 1000,
+        'p99_us': percentile(latences, 99) / 1000,
+        'max_us': latences[-1] / 1000,
+        'memoire_ko': pic / 1024,
+    }
+
+
+def percentile(valeurs_triees, rang):
+    """
+    @brief Percentile d'une liste triée (méthode du rang le plus proche).
+
+    @param valeurs_triees Les valeurs, triées par ordre croissant.
+    @param rang Le percentile voulu, entre 0 et 100.
+    """
+    index = math.ceil(rang / 100 * len(valeurs_triees)) - 1
+    return valeurs_triees[min(max(index, 0), len(valeurs_triees) - 1)]
+
+
+def formater_rapport(resultats):
+    """
+    @brief Met en forme les résultats des mesures sous forme de tableau texte.
+
+    @param resultats Les dictionnaires renvoyés par mesurer().
+    @return Le tableau, une mesure par ligne.
+    """
+    entete = f"{'mesure':<48} {'ops/s':>12} {'p50 µs':>10} {'p95 µs':>10} {'p99 µs':>10} {'max µs':>10} {'mém. Ko':>9}"
+    lignes = [entete, '-' * len(entete)]
+    for r in resultats:
+        lignes.append(f"{r['nom']:<48} {r['ops_par_s']:>12,.0f} {r['p50_us']:>10.1f} {r['p95_us']:>10.1f} "
+                      f"{r['p99_us']:>10.1f} {r['max_us']:>10.1f} {r['memoire_ko']:>9.1f}")
+    return '\n'.join(lignes)
@@ -0,0 +1,267 @@
+import json
+import sqlite3
+import threading
+import time
+
+# Format strftime de chaque période de vélocité
+PERIODES = {'jour': '%Y-%m-%d', 'semaine': '%Y-W%W', 'mois': '%Y-%m'}
+
+# Nombre maximal de lignes renvoyées par page
+LIMITE_MAX = 500
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS parties ("
+    "id INTEGER PRIMARY KEY, partie TEXT NOT NULL UNIQUE, equipe TEXT NOT NULL, "
+    "date REAL NOT NULL, regle TEXT, nb_joueurs INTEGER NOT NULL)",
+    # L'équipe et la date sont recopiées dans chaque estimation : les requêtes
+    # restent servies par un seul index, sans jointure
+    "CREATE TABLE IF NOT EXISTS estimations ("
+    "id INTEGER PRIMARY KEY, partie_id INTEGER NOT NULL REFERENCES parties(id) ON DELETE CASCADE, "
+    "equipe TEXT NOT NULL, date REAL NOT NULL, feature TEXT NOT NULL, estimation INTEGER, "
+    "tours INTEGER NOT NULL, regle TEXT, votes TEXT, ecart INTEGER)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_partie ON estimations(partie_id)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_feature ON estimations(feature, estimation, ecart)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_equipe ON estimations(equipe, date, estimation, partie_id)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_date ON estimations(date, estimation, partie_id)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_estimation ON estimations(estimation, tours, id)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_tours ON estimations(tours, id)",
+    "CREATE INDEX IF NOT EXISTS idx_estimations_equipe_tours ON estimations(equipe, tours, id)",
+)
+
+
+def equipe_de(players):
+    """
+    @brief Identifie une équipe par la liste triée de ses joueurs.
+    """
+    return ', '.join(sorted(players))
+
+
+class AnalyticsStore:
+    """
+    @brief Historique des parties terminées et de leurs estimations, dans un fichier SQLite.
+
+    @details
+    Chaque fonctionnalité chiffrée est conservée avec son équipe, sa date, son
+    estimation finale, son nombre de tours, la répartition des votes du tour
+    validé et l'écart entre les votes extrêmes. Toutes les requêtes sont
+    servies par un index et paginées par curseur (pagination par clé) : le
+    coût d'une page ne dépend pas du nombre de pages déjà lues, et aucune
+    requête ne charge l'historique complet en mémoire.
+    Le fichier n'est créé qu'à la première utilisation.
+    """
+
+    def __init__(self, path):
+        """
+        @param path Chemin du fichier SQLite.
+        """
+        self.path = path
+        self._local = threading.local()
+        self._schema_cree = False
+        self._lock = threading.Lock()
+
+    def _connexion(self):
+        # Une connexion par thread ; le schéma est créé par la première
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None:
+            connexion = self._local.connexion = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connexion.execute("PRAGMA foreign_keys=ON")
+            with self._lock:
+                if not self._schema_cree:
+                    connexion.execute("PRAGMA journal_mode=WAL")
+                    for instruction in _SCHEMA:
+                        connexion.execute(instruction)
+                    self._schema_cree = True
+        return connexion
+
+    def enregistrer_partie(self, partie, players, lignes, regle=None, date=None):
+        """
+        @brief Enregistre (ou remplace) une partie terminée.
+
+        @param partie L'identifiant de la partie (game_id ou room_id).
+        @param players Les joueurs de la partie, qui identifient l'équipe.
+        @param lignes Les fonctionnalités chiffrées, au format de models.export.lignes_export().
+        @param regle La règle de validation de la partie.
+        @param date L'horodatage de fin de partie (par défaut : maintenant).
+
+        @details
+        Une partie reprise après avoir été terminée (nouvelles fonctionnalités)
+        remplace son enregistrement précédent.
+        """
+        equipe = equipe_de(players)
+        date = time.time() if date is None else date
+        connexion = self._connexion()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            connexion.execute("DELETE FROM parties WHERE partie = ?", (partie,))
+            partie_id = connexion.execute(
+                "INSERT INTO parties (partie, equipe, date, regle, nb_joueurs) VALUES (?, ?, ?, ?, ?)",
+                (partie, equipe, date, regle, len(players))
+            ).lastrowid
+            connexion.executemany(
+                "INSERT INTO estimations (partie_id, equipe, date, feature, estimation, tours, regle, votes, ecart) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                ((partie_id, equipe, date, ligne['feature'], ligne['estimate'], ligne['rounds'],
+                  ligne['rule'], json.dumps(ligne['votes']) if ligne['votes'] else None, _ecart(ligne['votes']))
+                 for ligne in lignes)
+            )
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        connexion.execute("COMMIT")
+
+    def velocite(self, equipe=None, periode='semaine', limite=50, avant=None):
+        """
+        @brief Points estimés par période, de la plus récente à la plus ancienne.
+
+        @param equipe L'équipe (voir equipe_de()), ou None pour toutes les équipes.
+        @param periode 'jour', 'semaine' ou 'mois'.
+        @param limite Nombre maximal de périodes renvoyées.
+        @param avant Curseur renvoyé par la page précédente.
+        @return Un tuple (périodes, curseur suivant ou None). Chaque période est un
+            dictionnaire {'periode', 'points', 'features', 'parties'}.
+        @exception ValueError Si la période ou le curseur est invalide.
+        """
+        if periode not in PERIODES:
+            raise ValueError(f"Période inconnue : {periode!r}. Valeurs possibles : {', '.join(PERIODES)}")
+        conditions, parametres = [], [PERIODES[periode]]
+        if equipe is not None:
+            conditions.append("equipe = ?")
+            parametres.append(equipe)
+        if avant is not None:
+            conditions.append("date < ?")
+            parametres.append(_curseur_nombre(avant))
+        limite = _limite(limite)
+        # Parcours de l'index par date décroissante : les périodes arrivent dans l'ordre
+        # et la lecture s'arrête dès la première période au-delà de la page
+        lignes = self._connexion().execute(
+            "SELECT strftime(?, date, 'unixepoch'), estimation, partie_id, date FROM estimations"
+            + _where(conditions) + " ORDER BY date DESC",
+            parametres
+        )
+        periodes, suivant = [], None
+        for cle, estimation, partie_id, date in lignes:
+            if not periodes or periodes[-1]['periode'] != cle:
+                if len(periodes) == limite:
+                    suivant = repr(debut_periode)
+                    break
+                periodes.append({'periode': cle, 'points': 0, 'features': 0, 'parties': set()})
+            periode = periodes[-1]
+            periode['points'] += estimation or 0
+            periode['features'] += 1
+            periode['parties'].add(partie_id)
+            debut_periode = date
+        lignes.close()
+        for periode in periodes:
+            periode['parties'] = len(periode['parties'])
+        return periodes, suivant
+
+    def dispersion(self, limite=50, apres=None, feature=None):
+        """
+        @brief Dispersion des estimations de chaque fonctionnalité, par ordre alphabétique.
+
+        @param limite Nombre maximal de fonctionnalités renvoyées.
+        @param apres Curseur renvoyé par la page précédente.
+        @param feature Si donné, seule cette fonctionnalité est renvoyée.
+        @return Un tuple (fonctionnalités, curseur suivant ou None). Chaque élément est un
+            dictionnaire {'feature', 'estimations', 'min', 'max', 'moyenne', 'ecart_votes_moyen'} :
+            'min'/'max' portent sur les estimations finales des différentes parties,
+            'ecart_votes_moyen' sur l'écart entre votes extrêmes au tour validé.
+        """
+        conditions, parametres = [], []
+        if feature is not None:
+            conditions.append("feature = ?")
+            parametres.append(feature)
+        if apres is not None:
+            conditions.append("feature > ?")
+            parametres.append(apres)
+        limite = _limite(limite)
+        lignes = self._connexion().execute(
+            "SELECT feature, COUNT(estimation), MIN(estimation), MAX(estimation), AVG(estimation), AVG(ecart) "
+            "FROM estimations" + _where(conditions) + " GROUP BY feature ORDER BY feature LIMIT ?",
+            parametres + [limite + 1]
+        ).fetchall()
+        suivant = lignes[limite - 1][0] if len(lignes) > limite else None
+        return [{'feature': f, 'estimations': n, 'min': mini, 'max': maxi,
+                 'moyenne': _arrondi(moyenne), 'ecart_votes_moyen': _arrondi(ecart)}
+                for f, n, mini, maxi, moyenne, ecart in lignes[:limite]], suivant
+
+    def plus_debattues(self, limite=50, apres=None, equipe=None, estimation=None):
+        """
+        @brief Fonctionnalités ayant demandé le plus de tours de vote.
+
+        @param limite Nombre maximal de fonctionnalités renvoyées.
+        @param apres Curseur renvoyé par la page précédente.
+        @param equipe L'équipe, ou None pour toutes les équipes.
+        @param estimation Si donnée, seules les fonctionnalités chiffrées à cette valeur sont renvoyées.
+        @return Un tuple (fonctionnalités, curseur suivant ou None). Chaque élément est un
+            dictionnaire {'feature', 'team', 'date', 'estimate', 'rounds', 'votes'}.
+        @exception ValueError Si le curseur est invalide.
+        """
+        conditions, parametres = [], []
+        if equipe is not None:
+            conditions.append("equipe = ?")
+            parametres.append(equipe)
+        if estimation is not None:
+            conditions.append("estimation = ?")
+            parametres.append(estimation)
+        if apres is not None:
+            tours, _, dernier_id = apres.partition(':')
+            conditions.append("(tours, id) < (?, ?)")
+            parametres.extend([int(_curseur_nombre(tours)), int(_curseur_nombre(dernier_id))])
+        limite = _limite(limite)
+        lignes = self._connexion().execute(
+            "SELECT id, feature, equipe, date, estimation, tours, votes FROM estimations"
+            + _where(conditions) + " ORDER BY tours DESC, id DESC LIMIT ?",
+            parametres + [limite + 1]
+        ).fetchall()
+        suivant = f"{lignes[limite - 1][5]}:{lignes[limite - 1][0]}" if len(lignes) > limite else None
+        return [{'feature': f, 'team': e, 'date': d, 'estimate': est, 'rounds': tours,
+                 'votes': json.loads(votes) if votes else {}}
+                for _, f, e, d, est, tours, votes in lignes[:limite]], suivant
+
+    def estimations_passees(self):
+        """
+        @brief Parcourt les estimations de l'historique, sans les charger toutes en mémoire.
+
+        @return Un générateur de couples (titre, estimation).
+        """
+        curseur = self._connexion().execute(
+            "SELECT feature, estimation FROM estimations WHERE estimation IS NOT NULL")
+        try:
+            yield from curseur
+        finally:
+            curseur.close()
+
+    def expliquer(self, requete, parametres=()):
+        """
+        @brief Plan d'exécution SQLite d'une requête (pour vérifier l'usage des index).
+        """
+        return [ligne[-1] for ligne in self._connexion().execute("EXPLAIN QUERY PLAN " + requete, parametres)]
+
+    def __len__(self):
+        return self._connexion().execute("SELECT COUNT(*) FROM parties").fetchone()[0]
+
+
+def _ecart(votes):
+    # Écart entre les votes chiffrés extrêmes du tour validé ({"3": 2, "5": 1, "cafe": 1...})
+    valeurs = [int(v) for v in (votes or {}) if v.isdigit()]
+    return max(valeurs) - min(valeurs) if valeurs else None
+
+
+def _where(conditions):
+    return " WHERE " + " AND ".join(conditions) if conditions else ""
+
+
+def _limite(limite):
+    return max(1, min(int(limite), LIMITE_MAX))
+
+
+def _curseur_nombre(curseur):
+    try:
+        return float(curseur)
+    except (TypeError, ValueError):
+        raise ValueError(f"Curseur invalide : {curseur!r}") from None
+
+
+def _arrondi(valeur):
+    return None if valeur is None else round(valeur, 2)
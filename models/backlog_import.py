@@ -0,0 +1,203 @@
+import io
+import json
+
+# Clés acceptées pour le titre d'une fonctionnalité décrite par un objet JSON
+CLES_TITRE = ('title', 'titre', 'feature', 'name', 'summary')
+
+# Taille maximale d'un élément (ou d'une ligne NDJSON) en cours de lecture
+TAILLE_ELEMENT_MAX = 1 << 20
+
+
+def importer_backlog(flux, existantes=(), max_elements=100000, longueur_max=200, taille_bloc=65536):
+    """
+    @brief Importe un backlog volumineux en le lisant au fil de l'eau.
+
+    @param flux Un flux binaire (fichier uploadé, corps de requête) contenant
+        un tableau JSON ou du NDJSON (un élément JSON par ligne).
+    @param existantes Les fonctionnalités déjà présentes (ignorées si elles réapparaissent).
+    @param max_elements Nombre maximal d'éléments lus.
+    @param longueur_max Longueur maximale d'un titre de fonctionnalité.
+    @param taille_bloc Taille des blocs lus dans le flux.
+    @return Un tuple (nouvelles, stats) :
+        - nouvelles : les titres à ajouter, dans l'ordre du fichier, sans doublons ;
+        - stats : {'imported', 'duplicates', 'invalid'}.
+    @exception ValueError Si le document est mal formé ou dépasse max_elements.
+
+    @details
+    Seul un bloc du fichier est en mémoire à la fois : chaque élément est
+    validé et dédoublonné dès qu'il est lu.
+    """
+    lecteur = io.TextIOWrapper(flux, encoding='utf-8-sig')
+    vus = set(existantes)
+    nouvelles = []
+    stats = {'imported': 0, 'duplicates': 0, 'invalid': 0}
+
+    for nombre, element in enumerate(iterer_elements(lecteur, taille_bloc), start=1):
+        if nombre > max_elements:
+            raise ValueError(f"Le backlog dépasse {max_elements} éléments.")
+        titre = extraire_titre(element, longueur_max)
+        if titre is None:
+            stats['invalid'] += 1
+        elif titre in vus:
+            stats['duplicates'] += 1
+        else:
+            vus.add(titre)
+            nouvelles.append(titre)
+            stats['imported'] += 1
+    return nouvelles, stats
+
+
+def extraire_titre(element, longueur_max=200):
+    """
+    @brief Valide un élément du backlog et en extrait le titre.
+
+    @param element Une chaîne, ou un objet JSON portant le titre sous l'une des CLES_TITRE.
+    @param longueur_max Longueur maximale d'un titre.
+    @return Le titre nettoyé, ou None si l'élément est invalide.
+    """
+    if isinstance(element, dict):
+        element = next((element[cle] for cle in CLES_TITRE if cle in element), None)
+    if not isinstance(element, str):
+        return None
+    titre = " ".join(element.split())
+    if not titre or len(titre) > longueur_max:
+        return None
+    return titre
+
+
+def iterer_elements(lecteur, taille_bloc=65536):
+    """
+    @brief Itère sur les éléments d'un tableau JSON ou d'un flux NDJSON.
+
+    @param lecteur Un flux texte.
+    @param taille_bloc Taille des blocs lus dans le flux.
+    @return Un générateur des éléments décodés. Les lignes NDJSON illisibles
+        sont renvoyées sous forme de None (élément invalide).
+    """
+    debut = lecteur.read(taille_bloc)
+    contenu = debut.lstrip()
+    if contenu.startswith('['):
+        yield from iterer_tableau_json(lecteur, debut, taille_bloc)
+    else:
+        yield from iterer_ndjson(lecteur, debut, taille_bloc)
+
+
+def iterer_ndjson(lecteur, debut='', taille_bloc=65536):
+    """
+    @brief Itère sur les éléments d'un flux NDJSON, ligne par ligne.
+
+    @param lecteur Un flux texte.
+    @param debut Le début du flux, déjà lu.
+    @param taille_bloc Taille des blocs lus dans le flux.
+    @exception ValueError Si une ligne dépasse TAILLE_ELEMENT_MAX.
+    """
+    reste = ''
+    for bloc in _blocs(lecteur, debut, taille_bloc):
+        lignes = (reste + bloc).split('\n')
+        reste = lignes.pop()
+        if len(reste) > TAILLE_ELEMENT_MAX:
+            raise ValueError("Ligne NDJSON trop longue.")
+        for ligne in lignes:
+            element = _decoder_ligne(ligne)
+            if element is not _VIDE:
+                yield element
+    element = _decoder_ligne(reste)
+    if element is not _VIDE:
+        yield element
+
+
+def iterer_tableau_json(lecteur, debut='', taille_bloc=65536):
+    """
+    @brief Itère sur les éléments d'un tableau JSON sans charger tout le document.
+
+    @param lecteur Un flux texte.
+    @param debut Le début du flux, déjà lu.
+    @param taille_bloc Taille des blocs lus dans le flux.
+    @exception ValueError Si le tableau est mal formé.
+
+    @details
+    Les éléments sont décodés un par un avec json.JSONDecoder.raw_decode ;
+    le tampon est complété bloc par bloc lorsqu'un élément est coupé.
+    """
+    decodeur = json.JSONDecoder()
+    tampon = debut
+    pos = 0
+    fin = False
+
+    def completer():
+        nonlocal tampon, pos, fin
+        if len(tampon) - pos > TAILLE_ELEMENT_MAX:
+            raise ValueError("Élément JSON trop long.")
+        bloc = lecteur.read(taille_bloc)
+        fin = not bloc
+        tampon = tampon[pos:] + bloc
+        pos = 0
+
+    def caractere_suivant():
+        nonlocal pos
+        while True:
+            while pos < len(tampon) and tampon[pos].isspace():
+                pos += 1
+            if pos < len(tampon):
+                return tampon[pos]
+            if fin:
+                raise ValueError("Tableau JSON incomplet.")
+            completer()
+
+    if caractere_suivant() != '[':
+        raise ValueError("Un tableau JSON est attendu.")
+    pos += 1
+
+    premier = True
+    while True:
+        caractere = caractere_suivant()
+        if caractere == ']':
+            return
+        if not premier:
+            if caractere != ',':
+                raise ValueError("',' ou ']' attendu entre deux éléments du tableau.")
+            pos += 1
+            if caractere_suivant() == ']':
+                raise ValueError("Virgule superflue en fin de tableau.")
+
+        while True:
+            try:
+                element, fin_element = decodeur.raw_decode(tampon, pos)
+            except json.JSONDecodeError:
+                if fin:
+                    raise ValueError("Élément JSON invalide dans le tableau.")
+                completer()
+                continue
+            # Un nombre en fin de tampon peut être coupé : on relit un bloc
+            if fin_element == len(tampon) and not fin:
+                completer()
+                continue
+            break
+
+        yield element
+        pos = fin_element
+        premier = False
+
+
+# Marqueur d'une ligne NDJSON vide
+_VIDE = object()
+
+
+def _decoder_ligne(ligne):
+    ligne = ligne.strip()
+    if not ligne:
+        return _VIDE
+    try:
+        return json.loads(ligne)
+    except json.JSONDecodeError:
+        return None
+
+
+def _blocs(lecteur, debut, taille_bloc):
+    if debut:
+        yield debut
+    while True:
+        bloc = lecteur.read(taille_bloc)
+        if not bloc:
+            return
+        yield bloc
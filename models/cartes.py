@@ -0,0 +1,116 @@
+from array import array
+from enum import IntEnum
+
+
+class Carte(IntEnum):
+    """
+    @brief Cartes du jeu de Planning Poker, encodées sur un octet.
+
+    @details
+    Les cartes numériques sont numérotées dans l'ordre croissant de leur valeur,
+    ce qui permet de comparer directement les codes (min, max, tri).
+    Les cartes "cafe" et "interro" sont placées après les cartes numériques.
+    """
+    UN = 0
+    DEUX = 1
+    TROIS = 2
+    CINQ = 3
+    HUIT = 4
+    TREIZE = 5
+    VINGT = 6
+    QUARANTE = 7
+    CENT = 8
+    CAFE = 9
+    INTERRO = 10
+
+    @property
+    def valeur(self):
+        """
+        @brief Valeur affichée de la carte (entier, "cafe" ou "interro").
+        """
+        return VALEURS_CARTES[self]
+
+    @property
+    def est_numerique(self):
+        """
+        @brief Indique si la carte porte une estimation chiffrée.
+        """
+        return self < Carte.CAFE
+
+
+# Valeur de chaque carte, indexée par son code
+VALEURS_CARTES = (1, 2, 3, 5, 8, 13, 20, 40, 100, "cafe", "interro")
+
+# Table de correspondance valeur -> carte (entiers et chaînes issues des formulaires)
+_CARTES_PAR_VALEUR = {}
+for _carte in Carte:
+    _CARTES_PAR_VALEUR[_carte.valeur] = _carte
+    _CARTES_PAR_VALEUR[str(_carte.valeur)] = _carte
+
+
+def encoder_carte(valeur):
+    """
+    @brief Convertit une valeur de vote en carte.
+
+    @param valeur Une carte, un entier du jeu ou une chaîne ("3", "cafe", "interro").
+    @return La carte correspondante.
+    @exception ValueError Si la valeur ne correspond à aucune carte du jeu.
+    """
+    if isinstance(valeur, Carte):
+        return valeur
+    try:
+        return _CARTES_PAR_VALEUR[valeur]
+    except (KeyError, TypeError):
+        raise ValueError(f"Carte inconnue : {valeur!r}. Cartes valides : {VALEURS_CARTES}") from None
+
+
+def encoder_votes(valeurs):
+    """
+    @brief Encode une liste de valeurs de vote en tableau compact d'octets.
+
+    @param valeurs Les valeurs de vote (entiers, chaînes ou cartes).
+    @return Un array('b') contenant les codes des cartes.
+    """
+    return array('b', [encoder_carte(v) for v in valeurs])
+
+
+def decoder_votes(codes):
+    """
+    @brief Décode un tableau de codes en valeurs de vote lisibles.
+
+    @param codes Les codes des cartes (array, bytes ou liste d'entiers).
+    @return La liste des valeurs correspondantes.
+    """
+    return [VALEURS_CARTES[c] for c in codes]
+
+
+def distribuer_votes(codes):
+    """
+    @brief Répartition des votes d'un tour, par carte.
+
+    @param codes Les codes des cartes votées.
+    @return Un dictionnaire {valeur de la carte (chaîne) : nombre de votes}, dans l'ordre des cartes.
+    """
+    decompte = [0] * len(VALEURS_CARTES)
+    for code in codes:
+        decompte[code] += 1
+    return {str(VALEURS_CARTES[c]): n for c, n in enumerate(decompte) if n}
+
+
+def lire_votes(donnees):
+    """
+    @brief Reconstruit le tableau des votes depuis la session ou une sauvegarde.
+
+    @param donnees Les votes stockés : octets, chaîne hexadécimale,
+        ou ancienne liste de valeurs ("3", 5, "cafe"...).
+    @return Un array('b') contenant les codes des cartes.
+    """
+    if not donnees:
+        return array('b')
+    if isinstance(donnees, array):
+        return array('b', donnees)
+    if isinstance(donnees, str):
+        donnees = bytes.fromhex(donnees)
+    if isinstance(donnees, (bytes, bytearray)):
+        return array('b', donnees)
+    return encoder_votes(donnees)
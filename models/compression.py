@@ -0,0 +1,72 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # Module optionnel : compression gzip seulement
+    brotli = None
+
+# Types de contenu compressés (les images et archives le sont déjà)
+TYPES_COMPRESSIBLES = frozenset((
+    'text/html', 'text/css', 'text/csv', 'text/plain', 'text/javascript',
+    'application/json', 'application/javascript', 'application/x-ndjson', 'image/svg+xml',
+))
+
+
+def encodages_disponibles():
+    """
+    @brief Les encodages gérés, par ordre de préférence ('br' si le module brotli est installé).
+    """
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choisir_encodage(accept_encodings):
+    """
+    @brief Choisit l'encodage d'une réponse d'après l'en-tête Accept-Encoding.
+
+    @param accept_encodings L'en-tête analysé (request.accept_encodings).
+    @return 'br', 'gzip' ou None si le client n'accepte aucun encodage géré.
+    """
+    for encodage in encodages_disponibles():
+        if accept_encodings[encodage] > 0:
+            return encodage
+    return None
+
+
+def compresser_reponse(reponse, accept_encodings, seuil=1024, niveau=6):
+    """
+    @brief Compresse le corps d'une réponse si le client l'accepte et qu'il dépasse un seuil.
+
+    @param reponse La réponse Flask.
+    @param accept_encodings L'en-tête Accept-Encoding de la requête analysé.
+    @param seuil Taille minimale du corps compressé, en octets.
+    @param niveau Niveau de compression gzip (1 à 9 ; brotli : qualité 1 à 11 ramenée à l'échelle).
+    @return La réponse (modifiée sur place).
+
+    @details
+    Seules les réponses 200 de types textuels sont compressées. Les réponses
+    en streaming (flux SSE, export) et les fichiers envoyés tels quels
+    (direct_passthrough) sont laissés intacts : leur corps n'est pas en mémoire.
+    Un ETag fort devient faible, l'encodage changeant les octets envoyés
+    mais pas le contenu.
+    """
+    if reponse.status_code != 200 or reponse.is_streamed or reponse.direct_passthrough:
+        return reponse
+    if reponse.mimetype not in TYPES_COMPRESSIBLES or 'Content-Encoding' in reponse.headers:
+        return reponse
+    reponse.vary.add('Accept-Encoding')
+    encodage = choisir_encodage(accept_encodings)
+    if encodage is None:
+        return reponse
+    donnees = reponse.get_data()
+    if len(donnees) < seuil:
+        return reponse
+    if encodage == 'br':
+        compresse = brotli.compress(donnees, quality=min(11, round(niveau * 11 / 9)))
+    else:
+        compresse = gzip.compress(donnees, compresslevel=niveau, mtime=0)
+    reponse.set_data(compresse)
+    reponse.headers['Content-Encoding'] = encodage
+    etag, faible = reponse.get_etag()
+    if etag and not faible:
+        reponse.set_etag(etag, weak=True)
+    return reponse
@@ -0,0 +1,161 @@
+import json
+import queue
+import threading
+import time
+
+# Marque déposée dans la file d'un client désabonné : son flux SSE se termine
+_FIN_FLUX = object()
+
+
+class EventBus:
+    """
+    @brief Diffusion des événements d'une partie vers les clients abonnés.
+
+    @details
+    Chaque client abonné à une partie reçoit une file bornée d'événements
+    (petits dictionnaires JSON). Un client trop lent dont la file est pleine
+    est désabonné plutôt que de bloquer les votes des autres joueurs : sa file
+    est vidée et son flux se termine (voir flux_sse()). Le navigateur se
+    reconnecte alors et reçoit l'état complet de la partie.
+    """
+
+    def __init__(self, taille_file=100):
+        """
+        @param taille_file Nombre maximal d'événements en attente par client.
+        """
+        self.taille_file = taille_file
+        self._abonnes = {}
+        self._ferme = False
+        self._lock = threading.Lock()
+
+    def abonner(self, room_id):
+        """
+        @brief Abonne un nouveau client aux événements d'une partie.
+
+        @param room_id L'identifiant de la partie.
+        @return La file dans laquelle le client recevra les événements.
+        """
+        file = queue.Queue(maxsize=self.taille_file)
+        with self._lock:
+            if not self._ferme:
+                self._abonnes.setdefault(room_id, set()).add(file)
+                return file
+        # Bus fermé (arrêt du serveur) : le flux se termine aussitôt
+        _fermer(file)
+        return file
+
+    def desabonner(self, room_id, file):
+        """
+        @brief Désabonne un client.
+        """
+        with self._lock:
+            abonnes = self._abonnes.get(room_id)
+            if abonnes is not None:
+                abonnes.discard(file)
+                if not abonnes:
+                    del self._abonnes[room_id]
+
+    def fermer(self):
+        """
+        @brief Termine les flux de tous les clients abonnés, à l'arrêt du serveur.
+
+        @details
+        Un flux SSE ne se termine pas de lui-même : sans cela, l'arrêt attendrait
+        indéfiniment les requêtes des clients connectés. Les abonnements suivants
+        se terminent aussitôt.
+        """
+        with self._lock:
+            self._ferme = True
+            files = [file for abonnes in self._abonnes.values() for file in abonnes]
+            self._abonnes.clear()
+        for file in files:
+            _fermer(file)
+
+    def publier(self, room_id, type_evenement, **donnees):
+        """
+        @brief Envoie un événement à tous les clients abonnés à une partie.
+
+        @param room_id L'identifiant de la partie.
+        @param type_evenement Le type d'événement ('vote', 'tour', 'feature'...).
+        @param donnees Le contenu de l'événement.
+        """
+        evenement = dict(donnees, type=type_evenement)
+        with self._lock:
+            abonnes = list(self._abonnes.get(room_id, ()))
+        for file in abonnes:
+            try:
+                file.put_nowait(evenement)
+            except queue.Full:
+                self.desabonner(room_id, file)
+                _fermer(file)
+
+    def nb_abonnes(self, room_id):
+        """
+        @brief Nombre de clients abonnés à une partie.
+        """
+        return len(self._abonnes.get(room_id, ()))
+
+
+def _fermer(file):
+    # Les événements en attente sont abandonnés : le client recevra l'état complet à sa reconnexion
+    while True:
+        try:
+            while True:
+                file.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            file.put_nowait(_FIN_FLUX)
+            return
+        except queue.Full:
+            continue  # Événement publié entre-temps par un autre thread
+
+
+def flux_sse(bus, room_id, etat_initial, keepalive=15.0, rafraichir=None, intervalle=1.0):
+    """
+    @brief Générateur produisant le flux Server-Sent Events d'une partie.
+
+    @param bus Le bus d'événements.
+    @param room_id L'identifiant de la partie.
+    @param etat_initial L'état complet envoyé à la connexion du client.
+    @param keepalive Délai (en secondes) après lequel un commentaire est envoyé
+        pour garder la connexion ouverte.
+    @param rafraichir Fonction appelée toutes les 'intervalle' secondes sans
+        événement, renvoyant le nouvel état complet de la partie ou None s'il
+        n'a pas changé. Le bus ne relie que les clients d'un même processus :
+        avec plusieurs processus, les votes reçus par les autres sont ainsi
+        transmis sous la forme d'un nouvel événement 'etat'.
+    @param intervalle Période d'appel de rafraichir, en secondes.
+    @return Un générateur de chaînes au format text/event-stream, qui se termine
+        si le client est désabonné (file pleine).
+    """
+    file = bus.abonner(room_id)
+    attente = min(keepalive, intervalle) if rafraichir is not None else keepalive
+    try:
+        yield formater_sse(dict(etat_initial, type='etat'))
+        dernier_envoi = time.monotonic()
+        while True:
+            try:
+                evenement = file.get(timeout=attente)
+            except queue.Empty:
+                etat = rafraichir() if rafraichir is not None else None
+                if etat is not None:
+                    yield formater_sse(dict(etat, type='etat'))
+                elif time.monotonic() - dernier_envoi >= keepalive:
+                    yield ": keepalive\n\n"
+                else:
+                    continue
+            else:
+                if evenement is _FIN_FLUX:
+                    return
+                yield formater_sse(evenement)
+            dernier_envoi = time.monotonic()
+    finally:
+        bus.desabonner(room_id, file)
+
+
+def formater_sse(evenement):
+    """
+    @brief Formate un événement au format Server-Sent Events.
+    """
+    return f"event: {evenement['type']}\ndata: {json.dumps(evenement)}\n\n"
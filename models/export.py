@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+import zlib
+
+FORMAT_JSON = 'json'
+FORMAT_CSV = 'csv'
+FORMAT_NDJSON = 'ndjson'
+
+# Type MIME de chaque format d'export
+MIMETYPES = {
+    FORMAT_JSON: 'application/json',
+    FORMAT_CSV: 'text/csv',
+    FORMAT_NDJSON: 'application/x-ndjson',
+}
+
+# Colonnes de l'export CSV
+COLONNES_CSV = ('id', 'feature', 'estimate', 'rounds', 'rule', 'votes')
+
+# Nombre de fonctionnalités regroupées dans un même morceau de la réponse
+TAILLE_LOT = 256
+
+
+def lignes_export(features):
+    """
+    @brief Liste les fonctionnalités chiffrées à exporter, avec leurs métadonnées.
+
+    @param features La FeatureCollection de la partie.
+    @return Une liste de dictionnaires {'id', 'feature', 'estimate', 'rounds', 'rule', 'votes'},
+        dans l'ordre du backlog.
+
+    @details
+    Seules des références aux données sont copiées : les documents exportés
+    sont ensuite produits morceau par morceau par exporter().
+    """
+    lignes = []
+    for feature_id, titre, estimation in features.resultats_par_id():
+        ligne = {'id': feature_id, 'feature': titre, 'estimate': estimation}
+        ligne.update(features.historique(feature_id))
+        lignes.append(ligne)
+    return lignes
+
+
+def exporter(lignes, format_export=FORMAT_JSON, compresse=False):
+    """
+    @brief Produit le document exporté morceau par morceau.
+
+    @param lignes Les lignes renvoyées par lignes_export().
+    @param format_export FORMAT_JSON, FORMAT_CSV ou FORMAT_NDJSON.
+    @param compresse Si True, le document est compressé au format gzip au fil de l'eau.
+    @return Un générateur d'octets.
+    @exception ValueError Si le format est inconnu.
+    """
+    try:
+        generateur = _GENERATEURS[format_export]
+    except KeyError:
+        raise ValueError(f"Format d'export inconnu : {format_export!r}") from None
+    morceaux = _par_lots(generateur(lignes))
+    return _gzip(morceaux) if compresse else morceaux
+
+
+def exporter_json(lignes):
+    """
+    @brief Export JSON : {"backlog": {titre: estimation}, "features": [métadonnées...]}.
+
+    @details
+    La clé "backlog" conserve le format historique de l'export ; la clé
+    "features" détaille chaque fonctionnalité.
+    """
+    yield '{\n    "backlog": {'
+    for numero, ligne in enumerate(lignes):
+        yield (',' if numero else '') + f'\n        {json.dumps(ligne["feature"])}: {json.dumps(ligne["estimate"])}'
+    yield '\n    },\n    "features": ['
+    for numero, ligne in enumerate(lignes):
+        yield (',' if numero else '') + '\n        ' + json.dumps(ligne)
+    yield '\n    ]\n}\n'
+
+
+def exporter_ndjson(lignes):
+    """
+    @brief Export NDJSON : une fonctionnalité par ligne.
+    """
+    for ligne in lignes:
+        yield json.dumps(ligne) + '\n'
+
+
+def exporter_csv(lignes):
+    """
+    @brief Export CSV, la répartition des votes étant encodée en JSON dans la colonne 'votes'.
+    """
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow(COLONNES_CSV)
+    for ligne in lignes:
+        ligne = dict(ligne, votes=json.dumps(ligne['votes']) if ligne['votes'] else '')
+        ecrivain.writerow([ligne[colonne] for colonne in COLONNES_CSV])
+        yield tampon.getvalue()
+        tampon.seek(0)
+        tampon.truncate()
+    yield tampon.getvalue()
+
+
+_GENERATEURS = {
+    FORMAT_JSON: exporter_json,
+    FORMAT_CSV: exporter_csv,
+    FORMAT_NDJSON: exporter_ndjson,
+}
+
+
+def _par_lots(morceaux):
+    # Regroupe les petits morceaux pour limiter le nombre d'écritures réseau
+    lot = []
+    for morceau in morceaux:
+        lot.append(morceau)
+        if len(lot) >= TAILLE_LOT:
+            yield ''.join(lot).encode('utf-8')
+            lot = []
+    if lot:
+        yield ''.join(lot).encode('utf-8')
+
+
+def _gzip(morceaux):
+    compresseur = zlib.compressobj(wbits=31)  # 31 : en-tête et contrôle gzip
+    for morceau in morceaux:
+        compresse = compresseur.compress(morceau)
+        if compresse:
+            yield compresse
+    yield compresseur.flush()
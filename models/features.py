@@ -0,0 +1,289 @@
+import hashlib
+import json
+import time
+
+
+class FeatureCollection:
+    """
+    @brief Backlog ordonné des fonctionnalités d'une partie, indexé par identifiant.
+
+    @details
+    Chaque fonctionnalité reçoit un identifiant stable (entier croissant) à l'ajout.
+    Un index secondaire par titre permet de refuser les doublons en O(1) :
+    deux fonctionnalités ne peuvent plus porter le même titre et s'écraser
+    dans les résultats. L'estimation retenue est conservée avec la fonctionnalité,
+    ainsi que son historique (nombre de tours, règle appliquée, répartition des votes).
+
+    Chaque modification met à jour la date de dernière modification ('modifiee')
+    et invalide l'empreinte du backlog, qui sert de validateur HTTP (ETag).
+    """
+    __slots__ = ('_titres', '_estimations', '_ids_par_titre', '_prochain_id', '_ordre', '_historiques',
+                 '_empreinte', 'modifiee')
+
+    def __init__(self, titres=()):
+        """
+        @param titres Les titres des fonctionnalités initiales, dans l'ordre.
+        """
+        self._titres = {}          # id -> titre, dans l'ordre d'ajout
+        self._estimations = {}     # id -> estimation retenue
+        self._ids_par_titre = {}   # titre -> id
+        self._prochain_id = 1
+        self._ordre = None         # Cache de la liste des identifiants
+        self._historiques = {}     # id -> {'rounds', 'rule', 'votes'}
+        self._empreinte = None     # Cache de empreinte()
+        self.modifiee = time.time()  # Horodatage de la dernière modification
+        for titre in titres:
+            self.ajouter(titre)
+
+    @classmethod
+    def depuis(cls, donnees, resultats=None):
+        """
+        @brief Reconstruit un backlog depuis la session ou une sauvegarde.
+
+        @param donnees Une FeatureCollection, ou une liste dont les éléments sont
+            des titres (ancien format), des listes [id, titre, estimation, historique]
+            (les derniers éléments sont optionnels) ou des objets {"id", "title", "estimate", "history"}.
+        @param resultats Ancien dictionnaire des résultats (titre -> estimation), optionnel.
+        @return La FeatureCollection correspondante.
+        """
+        if isinstance(donnees, cls):
+            collection = donnees
+        else:
+            collection = cls()
+            for element in donnees or ():
+                if isinstance(element, str):
+                    collection.ajouter(element)
+                elif isinstance(element, dict):
+                    collection.inserer(element['id'], element['title'], element.get('estimate'),
+                                       element.get('history'))
+                else:
+                    collection.inserer(*element)
+        for titre, estimation in (resultats or {}).items():
+            feature_id = collection.id_de(titre)
+            if feature_id is None:
+                feature_id = collection.ajouter(titre)
+            if collection.estimation(feature_id) is None:
+                collection.estimer(feature_id, estimation)
+        return collection
+
+    @classmethod
+    def depuis_colonnes(cls, ids, titres, estimations, historiques):
+        """
+        @brief Reconstruit un backlog d'un seul tenant, depuis des colonnes (sauvegarde binaire).
+
+        @param ids Les identifiants des fonctionnalités, dans l'ordre du backlog.
+        @param titres Les titres, dans le même ordre.
+        @param estimations Les estimations (None si non chiffrée), dans le même ordre.
+        @param historiques Les historiques des fonctionnalités qui en ont un (identifiant -> historique).
+        @return La FeatureCollection correspondante.
+        @exception ValueError Si un identifiant ou un titre est en double.
+
+        @details
+        Équivaut à appeler inserer() pour chaque fonctionnalité, sans le coût
+        d'un appel par fonctionnalité.
+        """
+        collection = cls()
+        collection._titres = dict(zip(ids, titres))
+        collection._ids_par_titre = dict(zip(titres, ids))
+        if not len(collection._titres) == len(collection._ids_par_titre) == len(ids):
+            raise ValueError("Fonctionnalité en double.")
+        collection._estimations = {i: e for i, e in zip(ids, estimations) if e is not None}
+        collection._historiques = historiques
+        collection._prochain_id = max(ids, default=0) + 1
+        return collection
+
+    def copie(self):
+        """
+        @brief Copie indépendante du backlog : modifier l'une ne modifie pas l'autre.
+
+        @details Les titres, estimations et répartitions de votes, qui ne sont
+        jamais modifiés en place, sont partagés ; l'empreinte calculée est conservée.
+        """
+        copie = FeatureCollection.__new__(FeatureCollection)
+        copie._titres = self._titres.copy()
+        copie._estimations = self._estimations.copy()
+        copie._ids_par_titre = self._ids_par_titre.copy()
+        copie._prochain_id = self._prochain_id
+        copie._ordre = None
+        copie._historiques = {i: h.copy() for i, h in self._historiques.items()}
+        copie._empreinte = self._empreinte
+        copie.modifiee = self.modifiee
+        return copie
+
+    def ajouter(self, titre):
+        """
+        @brief Ajoute une fonctionnalité en fin de backlog.
+
+        @param titre Le titre de la fonctionnalité.
+        @return L'identifiant attribué, ou None si le titre est déjà présent.
+        """
+        if titre in self._ids_par_titre:
+            return None
+        feature_id = self._prochain_id
+        self.inserer(feature_id, titre)
+        return feature_id
+
+    def inserer(self, feature_id, titre, estimation=None, historique=None):
+        """
+        @brief Ajoute une fonctionnalité avec un identifiant imposé (rechargement d'une sauvegarde).
+
+        @exception ValueError Si l'identifiant ou le titre est déjà utilisé.
+        """
+        if feature_id in self._titres or titre in self._ids_par_titre:
+            raise ValueError(f"Fonctionnalité en double : {feature_id} / {titre!r}")
+        self._titres[feature_id] = titre
+        self._ids_par_titre[titre] = feature_id
+        if estimation is not None:
+            self._estimations[feature_id] = estimation
+        if historique:
+            self._historiques[feature_id] = dict(historique)
+        self._prochain_id = max(self._prochain_id, feature_id + 1)
+        if self._ordre is not None:
+            self._ordre.append(feature_id)
+        self._modifier()
+
+    def supprimer(self, feature_id):
+        """
+        @brief Supprime une fonctionnalité.
+
+        @return True si la fonctionnalité existait.
+        """
+        titre = self._titres.pop(feature_id, None)
+        if titre is None:
+            return False
+        del self._ids_par_titre[titre]
+        self._estimations.pop(feature_id, None)
+        self._historiques.pop(feature_id, None)
+        self._ordre = None
+        self._modifier()
+        return True
+
+    def titre(self, feature_id):
+        """
+        @brief Titre d'une fonctionnalité, ou None si l'identifiant est inconnu.
+        """
+        return self._titres.get(feature_id)
+
+    def id_de(self, titre):
+        """
+        @brief Identifiant d'une fonctionnalité à partir de son titre, ou None.
+        """
+        return self._ids_par_titre.get(titre)
+
+    def estimer(self, feature_id, estimation, regle=None, votes=None):
+        """
+        @brief Enregistre l'estimation retenue pour une fonctionnalité.
+
+        @param regle La règle de validation appliquée au dernier tour, optionnelle.
+        @param votes La répartition des votes du dernier tour (voir distribuer_votes()), optionnelle.
+        """
+        if feature_id not in self._titres:
+            raise KeyError(feature_id)
+        self._estimations[feature_id] = estimation
+        if regle is not None or votes is not None:
+            historique = self._historiques.setdefault(feature_id, {'rounds': 0})
+            historique.update(rule=regle, votes=votes)
+        self._modifier()
+
+    def compter_tour(self, feature_id):
+        """
+        @brief Compte un tour de vote clos sur des cartes chiffrées (validé ou suivi d'un débat).
+
+        @details Les tours conclus par une pause café ou une phase interro ne sont pas comptés.
+        """
+        if feature_id not in self._titres:
+            raise KeyError(feature_id)
+        historique = self._historiques.setdefault(feature_id, {'rounds': 0})
+        historique['rounds'] += 1
+        self._modifier()
+
+    def _modifier(self):
+        self._empreinte = None
+        self.modifiee = time.time()
+
+    def empreinte(self):
+        """
+        @brief Empreinte du contenu du backlog (titres, estimations, historiques).
+
+        @details
+        Deux backlogs de même contenu ont la même empreinte, quel que soit le
+        processus qui les sert. Elle est calculée au premier appel, puis
+        conservée jusqu'à la modification suivante.
+
+        @return Une chaîne hexadécimale de 32 caractères.
+        """
+        if self._empreinte is None:
+            contenu = json.dumps(self.vers_liste(), separators=(',', ':'), sort_keys=True).encode()
+            self._empreinte = hashlib.blake2b(contenu, digest_size=16).hexdigest()
+        return self._empreinte
+
+    def historique(self, feature_id):
+        """
+        @brief Historique du vote d'une fonctionnalité.
+
+        @return Un dictionnaire {'rounds', 'rule', 'votes'} : nombre de tours clos sur des cartes chiffrées,
+            règle appliquée et répartition des votes du tour validé (None si non chiffrée).
+        """
+        historique = self._historiques.get(feature_id, {})
+        return {'rounds': historique.get('rounds', 0),
+                'rule': historique.get('rule'),
+                'votes': historique.get('votes')}
+
+    def estimation(self, feature_id):
+        """
+        @brief Estimation retenue pour une fonctionnalité, ou None si elle n'est pas encore chiffrée.
+        """
+        return self._estimations.get(feature_id)
+
+    def ids(self):
+        """
+        @brief Identifiants des fonctionnalités, dans l'ordre du backlog.
+        """
+        if self._ordre is None:
+            self._ordre = list(self._titres)
+        return self._ordre
+
+    def items(self):
+        """
+        @brief Paires (identifiant, titre), dans l'ordre du backlog.
+        """
+        return self._titres.items()
+
+    def resultats(self):
+        """
+        @brief Résultats des fonctionnalités chiffrées (titre -> estimation), dans l'ordre du backlog.
+        """
+        return {self._titres[i]: self._estimations[i] for i in self._titres if i in self._estimations}
+
+    def resultats_par_id(self):
+        """
+        @brief Résultats des fonctionnalités chiffrées sous forme de triplets (identifiant, titre, estimation).
+        """
+        return [(i, t, self._estimations[i]) for i, t in self._titres.items() if i in self._estimations]
+
+    def vers_liste(self):
+        """
+        @brief Exporte le backlog sous une forme sérialisable en JSON.
+
+        @return Une liste de triplets [identifiant, titre, estimation], complétés
+            par l'historique du vote lorsqu'il existe.
+        """
+        return [[i, t, self._estimations.get(i)] + ([self._historiques[i]] if i in self._historiques else [])
+                for i, t in self._titres.items()]
+
+    def __contains__(self, cle):
+        """
+        @brief Teste la présence d'une fonctionnalité par identifiant (int) ou par titre (str).
+        """
+        if isinstance(cle, str):
+            return cle in self._ids_par_titre
+        return cle in self._titres
+
+    def __iter__(self):
+        """
+        @brief Itère sur les titres, dans l'ordre du backlog.
+        """
+        return iter(self._titres.values())
+
+    def __len__(self):
+        return len(self._titres)
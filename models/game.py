@@ -1,9 +1,30 @@
+from array import array
+from collections import Counter
+
+from models.cartes import Carte, VALEURS_CARTES
+
+# Registre des règles de validation : nom -> règle (voir enregistrer_regle())
+REGLES = {}
+
+# Liste des types de vote valides, dans l'ordre d'enregistrement
+LISTE_TYPE_VOTE = []
+
+# Cartes indexées par leur code, et codes de toutes les cartes (index du décompte de valider_codes())
+_CARTES = tuple(Carte)
+_CODES = range(len(_CARTES))
+# Au-delà de ce nombre de votes, chaque carte est comptée par bytes.count() plutôt que vote par vote
+_SEUIL_COMPTAGE = 32
+# Codes des cartes spéciales (un membre d'énumération est plus coûteux à lire qu'un entier)
+_CODE_CAFE = int(Carte.CAFE)
+_CODE_INTERRO = int(Carte.INTERRO)
+
+
 def valider_vote(liste_vote, type_vote):
     """
     @brief Valide un vote en fonction du type de vote demandé.
 
     @param liste_vote La liste des votes exprimés (chaque élément représente un vote).
-    @param type_vote Le type de validation à effectuer : 'unanime' ou 'majorite'.
+    @param type_vote Le type de validation à effectuer (voir LISTE_TYPE_VOTE), ou une règle déjà résolue.
     @return Un tuple contenant :
         - Un booléen indiquant si la validation est réussie.
         - La valeur majoritaire ou unanime, si applicable, sinon False.
@@ -12,51 +33,216 @@ def valider_vote(liste_vote, type_vote):
     - Les votes "cafe" et "interro" sont traités comme des cas spécifiques.
     - Pour un vote 'unanime', tous les éléments doivent être identiques.
     - Pour un vote 'majorite', un élément doit apparaître dans au moins la moitié des votes.
+    - La liste n'est parcourue qu'une seule fois : toutes les règles sont évaluées
+      à partir du décompte produit par compter_votes().
     """
-    # Liste des types de vote valides
-    liste_type_vote = ['unanime', 'majorite']
-
     # Vérification des préconditions
     if not liste_vote:  # Vérifie si la liste est vide
         return (False, False)
 
-    if type_vote not in liste_type_vote:  # Vérifie si le type de vote est valide
-        raise AttributeError(f"Type de vote non supporté : '{type_vote}'. Types valides : {liste_type_vote}")
+    regle = resoudre_regle(type_vote)  # Vérifie si le type de vote est valide
+    return regle(compter_votes(liste_vote))
 
-    # Gestion des votes spéciaux "cafe" et "interro"
-    resultat_special = gerer_votes_speciaux(liste_vote, type_vote)
-    if resultat_special is not None:
-        return resultat_special
 
-    # Filtrer les votes spéciaux avant de continuer
-    votes_sans_speciaux = [v for v in liste_vote if v not in ["cafe", "interro"]]
+def compter_votes(liste_vote):
+    """
+    @brief Compte chaque carte jouée en un seul parcours de la liste des votes.
 
-    # Validation des votes restants
-    if type_vote == 'unanime':
-        return valider_unanimite(votes_sans_speciaux)
-    elif type_vote == 'majorite':
-        return valider_majorite(votes_sans_speciaux)
+    @param liste_vote La liste des votes exprimés.
+    @return Un Counter associant chaque carte à son nombre d'occurrences.
+    """
+    return Counter(liste_vote)
+
+
+def resoudre_regle(type_vote):
+    """
+    @brief Renvoie la règle de validation correspondant à un type de vote.
+
+    @param type_vote Le nom de la règle, ou une règle déjà résolue (renvoyée telle quelle).
+    @return La règle : une fonction (decompte, cafe, interro, tour) -> (resultat, valeur).
+    @exception AttributeError Si le type de vote n'est pas supporté.
+
+    @details
+    Une partie résout sa règle une seule fois : chaque tour appelle ensuite
+    directement la fonction, sans comparer de chaînes.
+    """
+    if callable(type_vote):
+        return type_vote
+    try:
+        return REGLES[type_vote]
+    except (KeyError, TypeError):
+        raise AttributeError(f"Type de vote non supporté : '{type_vote}'. Types valides : {LISTE_TYPE_VOTE}") from None
+
+
+def enregistrer_regle(nom, regle):
+    """
+    @brief Ajoute une règle de validation au registre.
+
+    @param nom Le nom de la règle, tel que choisi dans les paramètres de la partie.
+    @param regle Fonction (decompte, cafe, interro, tour) -> (resultat, valeur),
+        construite par exemple avec regle_sur_decompte().
+    @return La règle enregistrée.
+    """
+    REGLES[nom] = regle
+    if nom not in LISTE_TYPE_VOTE:
+        LISTE_TYPE_VOTE.append(nom)
+    return regle
+
+
+def regle_sur_decompte(valider, speciaux='majorite', valider_codes=None):
+    """
+    @brief Construit une règle à partir d'une validation du décompte des cartes chiffrées.
 
+    @param valider Fonction (decompte) -> (resultat, valeur) appliquée au décompte
+        des votes, une fois les cartes "cafe" et "interro" écartées.
+    @param speciaux Le traitement des cartes spéciales : 'unanime' (tous les joueurs)
+        ou 'majorite' (plus de la moitié des joueurs).
+    @param valider_codes La même validation sur un décompte par code de carte
+        (liste indexée par code, cartes chiffrées seules), optionnelle : elle
+        devient l'attribut 'sur_codes' de la règle (voir valider_codes()).
+    @return La règle (voir resoudre_regle()).
+    """
+    def regle(decompte, cafe="cafe", interro="interro", tour=1):
+        total = sum(decompte.values())
+        if not total:
+            return (False, False)
+
+        # Gestion des votes spéciaux "cafe" et "interro"
+        resultat_special = gerer_votes_speciaux_decompte(decompte, total, speciaux, cafe, interro)
+        if resultat_special is not None:
+            return resultat_special
+
+        # Les votes spéciaux sont écartés du décompte sans recopier la liste
+        votes_sans_speciaux = {v: n for v, n in decompte.items() if n and v != cafe and v != interro}
+        return valider(votes_sans_speciaux)
+
+    if valider_codes is not None:
+        def sur_codes(decompte, tour=1):
+            total = sum(decompte)
+            if not total:
+                return (False, False)
+            resultat_special = _votes_speciaux(decompte[_CODE_CAFE], decompte[_CODE_INTERRO], total, speciaux,
+                                               _CODE_CAFE, _CODE_INTERRO)
+            if resultat_special is not None:
+                return resultat_special
+            # Les cartes chiffrées ont les premiers codes
+            return valider_codes(decompte[:_CODE_CAFE])
+
+        regle.sur_codes = sur_codes
+    return regle
 
-def gerer_votes_speciaux(liste_vote, type_vote):
+
+def regle_selon_tour(premier_tour, tours_suivants):
+    """
+    @brief Construit une règle qui change après le premier tour de vote d'une fonctionnalité.
+
+    @param premier_tour La règle appliquée au premier tour.
+    @param tours_suivants La règle appliquée aux tours suivants (après un débat ou une discussion).
+    @return La règle (voir resoudre_regle()).
+    """
+    def regle(decompte, cafe="cafe", interro="interro", tour=1):
+        return (premier_tour if tour <= 1 else tours_suivants)(decompte, cafe, interro, tour)
+
+    if hasattr(premier_tour, 'sur_codes') and hasattr(tours_suivants, 'sur_codes'):
+        def sur_codes(decompte, tour=1):
+            return (premier_tour if tour <= 1 else tours_suivants).sur_codes(decompte, tour)
+
+        regle.sur_codes = sur_codes
+    return regle
+
+
+def valider_codes(codes, type_vote, tour=1):
+    """
+    @brief Valide un tour de vote encodé sous forme de codes de cartes.
+
+    @param codes Les codes des cartes jouées (array('b'), bytes ou liste d'entiers).
+    @param type_vote Le type de validation à effectuer (voir LISTE_TYPE_VOTE), ou une règle déjà résolue.
+    @param tour Le numéro du tour de vote de la fonctionnalité (1 pour le premier).
+    @return Un tuple contenant :
+        - Un booléen indiquant si la validation est réussie.
+        - La carte retenue (Carte), sinon False.
+
+    @details
+    La validation ne manipule que des entiers : les votes sont comptés dans
+    une liste indexée par code de carte, sur laquelle la règle est évaluée
+    (attribut 'sur_codes' des règles, voir regle_sur_decompte()). Seule la
+    carte retenue est convertie en Carte. Une règle sans 'sur_codes' est
+    évaluée sur un décompte {Carte: nombre}.
+    """
+    if not codes:
+        return (False, False)
+
+    regle = resoudre_regle(type_vote)
+    sur_codes = getattr(regle, 'sur_codes', None)
+    if sur_codes is None:
+        decompte = {Carte(code): n for code, n in Counter(codes).items()}
+        resultat, code = regle(decompte, Carte.CAFE, Carte.INTERRO, tour)
+    else:
+        if len(codes) > _SEUIL_COMPTAGE:
+            decompte = list(map((codes.tobytes() if isinstance(codes, array) else bytes(codes)).count, _CODES))
+        else:
+            decompte = [0] * len(_CARTES)
+            for code in codes:
+                decompte[code] += 1
+        resultat, code = sur_codes(decompte, tour)
+    if not resultat:
+        return (False, False)
+    return (True, _CARTES[code])
+
+
+def valider_decompte(decompte, type_vote, cafe="cafe", interro="interro", tour=1):
+    """
+    @brief Valide un vote à partir de son décompte.
+
+    @param decompte Le décompte des votes (carte -> nombre d'occurrences).
+    @param type_vote Le type de validation à effectuer (voir LISTE_TYPE_VOTE), ou une règle déjà résolue.
+    @param cafe La carte représentant le vote "cafe".
+    @param interro La carte représentant le vote "interro".
+    @param tour Le numéro du tour de vote de la fonctionnalité (1 pour le premier).
+    @return Le même tuple que valider_vote().
+    """
+    return resoudre_regle(type_vote)(decompte, cafe, interro, tour)
+
+
+def gerer_votes_speciaux(liste_vote, type_vote, cafe="cafe", interro="interro"):
     """
     @brief Gère les votes spéciaux ("cafe" et "interro") selon le type de vote.
 
     @param liste_vote La liste des votes exprimés.
-    @param type_vote Le type de validation à effectuer : 'unanime' ou 'majorite'.
+    @param type_vote Le traitement des cartes spéciales : 'unanime' ou 'majorite'.
+    @param cafe La carte représentant le vote "cafe".
+    @param interro La carte représentant le vote "interro".
+    @return Un tuple si un cas spécial est détecté, sinon None.
+    """
+    return gerer_votes_speciaux_decompte(compter_votes(liste_vote), len(liste_vote), type_vote, cafe, interro)
+
+
+def gerer_votes_speciaux_decompte(decompte, total, type_vote, cafe="cafe", interro="interro"):
+    """
+    @brief Gère les votes spéciaux à partir du décompte des votes (voir gerer_votes_speciaux()).
+
+    @param decompte Le décompte des votes exprimés.
+    @param total Le nombre total de votes exprimés.
+    @param type_vote Le traitement des cartes spéciales : 'unanime' ou 'majorite'.
+    @param cafe La carte représentant le vote "cafe".
+    @param interro La carte représentant le vote "interro".
     @return Un tuple si un cas spécial est détecté, sinon None.
     """
+    return _votes_speciaux(decompte.get(cafe, 0), decompte.get(interro, 0), total, type_vote, cafe, interro)
+
+
+def _votes_speciaux(nb_cafe, nb_interro, total, type_vote, cafe, interro):
     if type_vote == 'unanime':
-        if all(v == "cafe" for v in liste_vote):
-            return (True, "cafe")
-        if all(v == "interro" for v in liste_vote):
-            return (True, "interro")
+        if nb_cafe == total:
+            return (True, cafe)
+        if nb_interro == total:
+            return (True, interro)
 
     elif type_vote == 'majorite':
-        if liste_vote.count("cafe") > len(liste_vote) / 2:
-            return (True, "cafe")
-        if liste_vote.count("interro") > len(liste_vote) / 2:
-            return (True, "interro")
+        if nb_cafe > total / 2:
+            return (True, cafe)
+        if nb_interro > total / 2:
+            return (True, interro)
 
     return None
 
@@ -70,8 +256,18 @@ def valider_unanimite(votes):
         - Un booléen indiquant si la validation est réussie.
         - La valeur unanime, sinon False.
     """
-    if len(set(votes)) == 1 and votes:
-        return (True, votes[0])
+    return valider_unanimite_decompte(compter_votes(votes))
+
+
+def valider_unanimite_decompte(decompte):
+    """
+    @brief Valide un vote unanime à partir du décompte des votes.
+
+    @param decompte Le décompte des votes après retrait des votes spéciaux.
+    @return Le même tuple que valider_unanimite().
+    """
+    if len(decompte) == 1:
+        return (True, next(iter(decompte)))
     return (False, False)
 
 
@@ -84,7 +280,243 @@ def valider_majorite(votes):
         - Un booléen indiquant si la validation est réussie.
         - La valeur majoritaire, sinon False.
     """
-    for elem in set(votes):
-        if votes.count(elem) > len(votes) / 2:
+    return valider_majorite_decompte(compter_votes(votes))
+
+
+def valider_majorite_decompte(decompte):
+    """
+    @brief Valide un vote à la majorité absolue à partir du décompte des votes.
+
+    @param decompte Le décompte des votes après retrait des votes spéciaux.
+    @return Le même tuple que valider_majorite().
+    """
+    total = sum(decompte.values())
+    for elem, nb in decompte.items():
+        if nb > total / 2:
             return (True, elem)
-    return (False, False)
\ No newline at end of file
+    return (False, False)
+
+
+def valider_majorite_relative(decompte):
+    """
+    @brief Valide un vote à la majorité relative : la carte la plus jouée l'emporte.
+
+    @param decompte Le décompte des votes après retrait des votes spéciaux.
+    @return Un tuple contenant :
+        - Un booléen indiquant si la validation est réussie.
+        - La valeur la plus jouée, sinon False (aucun vote, ou égalité en tête).
+    """
+    premiers = sorted(decompte.items(), key=lambda vote: vote[1], reverse=True)[:2]
+    if not premiers or (len(premiers) == 2 and premiers[0][1] == premiers[1][1]):
+        return (False, False)
+    return (True, premiers[0][0])
+
+
+def valider_moyenne(decompte):
+    """
+    @brief Retient la carte la plus proche de la moyenne des votes.
+
+    @param decompte Le décompte des votes après retrait des votes spéciaux.
+    @return Un tuple contenant :
+        - Un booléen indiquant si la validation est réussie.
+        - La carte la plus proche de la moyenne (la plus haute en cas d'égalité),
+          sinon False si un vote n'est pas numérique.
+    """
+    valeurs = _valeurs_numeriques(decompte)
+    if not valeurs:
+        return (False, False)
+    total = sum(decompte.values())
+    moyenne = sum(valeur * decompte[carte] for carte, valeur in valeurs.items()) / total
+    return (True, _carte_proche(moyenne, numerique=not isinstance(next(iter(decompte)), Carte)))
+
+
+def valider_mediane(decompte):
+    """
+    @brief Retient la médiane des votes.
+
+    @param decompte Le décompte des votes après retrait des votes spéciaux.
+    @return Un tuple contenant :
+        - Un booléen indiquant si la validation est réussie.
+        - La médiane (la plus haute des deux valeurs centrales pour un nombre pair
+          de votes), sinon False si un vote n'est pas numérique.
+    """
+    valeurs = _valeurs_numeriques(decompte)
+    if not valeurs:
+        return (False, False)
+    rang = sum(decompte.values()) // 2
+    for carte in sorted(valeurs, key=valeurs.get):
+        rang -= decompte[carte]
+        if rang < 0:
+            return (True, carte)
+
+
+def _unanimite_codes(decompte):
+    # Décompte par code des cartes chiffrées (voir regle_sur_decompte())
+    jouees = [code for code, nb in enumerate(decompte) if nb]
+    return (True, jouees[0]) if len(jouees) == 1 else (False, False)
+
+
+def _majorite_codes(decompte):
+    maximum = max(decompte)
+    if maximum > sum(decompte) / 2:
+        return (True, decompte.index(maximum))
+    return (False, False)
+
+
+def _majorite_relative_codes(decompte):
+    maximum = max(decompte)
+    if not maximum or decompte.count(maximum) > 1:
+        return (False, False)
+    return (True, decompte.index(maximum))
+
+
+def _moyenne_codes(decompte):
+    total = sum(decompte)
+    if not total:
+        return (False, False)
+    moyenne = sum(VALEURS_CARTES[code] * nb for code, nb in enumerate(decompte)) / total
+    return (True, int(_carte_proche(moyenne)))
+
+
+def _mediane_codes(decompte):
+    # Les codes des cartes chiffrées suivent l'ordre de leurs valeurs
+    rang = sum(decompte) // 2
+    for code, nb in enumerate(decompte):
+        rang -= nb
+        if rang < 0:
+            return (True, code)
+    return (False, False)
+
+
+def _valeurs_numeriques(decompte):
+    # Valeur numérique de chaque carte jouée ; vide si une carte n'est pas numérique
+    valeurs = {}
+    for carte in decompte:
+        if isinstance(carte, Carte):
+            if not carte.est_numerique:
+                return {}
+            valeurs[carte] = carte.valeur
+        else:
+            try:
+                valeurs[carte] = float(carte)
+            except (TypeError, ValueError):
+                return {}
+    return valeurs
+
+
+def _carte_proche(nombre, numerique=False):
+    # Carte numérique du jeu la plus proche d'un nombre (la plus haute en cas d'égalité)
+    carte = min((c for c in Carte if c.est_numerique), key=lambda c: (abs(c.valeur - nombre), -c.valeur))
+    return carte.valeur if numerique else carte
+
+
+enregistrer_regle('unanime', regle_sur_decompte(valider_unanimite_decompte, 'unanime', _unanimite_codes))
+enregistrer_regle('majorite', regle_sur_decompte(valider_majorite_decompte, 'majorite', _majorite_codes))
+enregistrer_regle('majorite_relative', regle_sur_decompte(valider_majorite_relative, 'majorite',
+                                                          _majorite_relative_codes))
+enregistrer_regle('moyenne', regle_sur_decompte(valider_moyenne, 'majorite', _moyenne_codes))
+enregistrer_regle('mediane', regle_sur_decompte(valider_mediane, 'majorite', _mediane_codes))
+enregistrer_regle('unanime_puis_majorite', regle_selon_tour(REGLES['unanime'], REGLES['majorite']))
+
+
+def valider_votes_lot(manches, type_vote, cafe="cafe", interro="interro"):
+    """
+    @brief Valide un grand nombre de tours de vote en une seule fois.
+
+    @param manches Les tours à valider : un tableau NumPy 2-D (un tour par ligne)
+        ou un itérable de listes de votes, éventuellement de longueurs différentes.
+    @param type_vote Le type de validation à effectuer (voir LISTE_TYPE_VOTE).
+    @param cafe La carte représentant le vote "cafe".
+    @param interro La carte représentant le vote "interro".
+    @return Un tuple de deux tableaux NumPy de même longueur que manches :
+        - valides : booléens indiquant si chaque tour est validé ;
+        - valeurs : la valeur retenue pour chaque tour, sinon False.
+
+    @details
+    Les résultats sont identiques à ceux de valider_vote() appelée tour par tour,
+    mais les règles 'unanime' et 'majorite' sont évaluées sur une matrice de décomptes
+    (une ligne par tour, une colonne par carte) sans boucle Python par tour.
+    Pour un lot de codes de cartes (voir models.cartes), passer cafe=Carte.CAFE
+    et interro=Carte.INTERRO.
+    """
+    import numpy as np  # Importé à la demande : seule la validation par lots en a besoin
+
+    regle = resoudre_regle(type_vote)
+
+    decomptes, cartes = tabuler_votes_lot(manches)
+    nb_manches = decomptes.shape[0]
+    valides = np.zeros(nb_manches, dtype=bool)
+    valeurs = np.full(nb_manches, False, dtype=object)
+    if not cartes:
+        return valides, valeurs
+
+    if type_vote not in ('unanime', 'majorite'):
+        # Les autres règles sont appliquées tour par tour, sur chaque ligne de décomptes
+        for i, ligne in enumerate(decomptes.tolist()):
+            valides[i], valeurs[i] = regle({c: n for c, n in zip(cartes, ligne) if n}, cafe, interro)
+        return valides, valeurs
+
+    total = decomptes.sum(axis=1)
+    colonnes_speciales = [i for i, carte in enumerate(cartes) if carte == cafe or carte == interro]
+    nb_cafe = decomptes[:, cartes.index(cafe)] if cafe in cartes else np.zeros(nb_manches, dtype=total.dtype)
+    nb_interro = decomptes[:, cartes.index(interro)] if interro in cartes else np.zeros(nb_manches, dtype=total.dtype)
+
+    # Décompte des votes restants, une fois les cartes spéciales écartées
+    sans_speciaux = decomptes.copy()
+    sans_speciaux[:, colonnes_speciales] = 0
+    reste = total - nb_cafe - nb_interro
+    meilleure = sans_speciaux.argmax(axis=1)
+    nb_meilleure = sans_speciaux[np.arange(nb_manches), meilleure]
+
+    if type_vote == 'unanime':
+        tour_cafe = (nb_cafe == total) & (total > 0)
+        tour_interro = (nb_interro == total) & (total > 0) & ~tour_cafe
+        tour_valide = ((sans_speciaux > 0).sum(axis=1) == 1) & ~tour_cafe & ~tour_interro
+    else:
+        tour_cafe = 2 * nb_cafe > total
+        tour_interro = (2 * nb_interro > total) & ~tour_cafe
+        tour_valide = (2 * nb_meilleure > reste) & (reste > 0) & ~tour_cafe & ~tour_interro
+
+    cartes_objets = np.empty(len(cartes), dtype=object)
+    cartes_objets[:] = cartes
+    valeurs[tour_cafe] = cafe
+    valeurs[tour_interro] = interro
+    valeurs[tour_valide] = cartes_objets[meilleure[tour_valide]]
+    valides[:] = tour_cafe | tour_interro | tour_valide
+    return valides, valeurs
+
+
+def tabuler_votes_lot(manches):
+    """
+    @brief Construit la matrice des décomptes d'un lot de tours de vote.
+
+    @param manches Un tableau NumPy 2-D ou un itérable de listes de votes.
+    @return Un tuple (decomptes, cartes) où decomptes[i, j] est le nombre de
+        votes pour cartes[j] dans le tour i.
+    """
+    import numpy as np
+
+    if isinstance(manches, np.ndarray) and manches.ndim == 2 and manches.dtype != object:
+        # Tableau homogène : l'encodage des cartes est lui aussi vectorisé
+        valeurs, codes = np.unique(manches, return_inverse=True)
+        nb_manches, nb_joueurs = manches.shape
+        lignes = np.repeat(np.arange(nb_manches), nb_joueurs)
+        cartes = valeurs.tolist()
+        codes = codes.ravel()
+    else:
+        vocabulaire = {}
+        lignes = []
+        codes = []
+        nb_manches = 0
+        for manche in manches:
+            for vote in manche:
+                codes.append(vocabulaire.setdefault(vote, len(vocabulaire)))
+                lignes.append(nb_manches)
+            nb_manches += 1
+        cartes = list(vocabulaire)
+        lignes = np.asarray(lignes, dtype=np.intp)
+        codes = np.asarray(codes, dtype=np.intp)
+
+    nb_cartes = len(cartes)
+    decomptes = np.bincount(lignes * nb_cartes + codes, minlength=nb_manches * nb_cartes)
+    return decomptes.reshape(nb_manches, nb_cartes), cartes
@@ -0,0 +1,180 @@
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class FileSaturee(Exception):
+    """
+    @brief Un vote est refusé car la file de sa partie, ou l'ensemble du pipeline, est pleine.
+    """
+
+    def __init__(self, message, reessayer_apres, globale=False):
+        """
+        @param message Le message d'erreur.
+        @param reessayer_apres Délai conseillé avant un nouvel essai, en secondes.
+        @param globale True si c'est le pipeline entier qui est saturé (et non la seule partie).
+        """
+        super().__init__(message)
+        self.reessayer_apres = reessayer_apres
+        self.globale = globale
+
+
+class VoteIngestion:
+    """
+    @brief Pipeline d'ingestion des votes : files bornées par partie, traitées par lots.
+
+    @details
+    Une requête de vote ne fait qu'ajouter le vote à la file de sa partie et
+    rend la main. Des threads de fond vident les files : tous les votes en
+    attente d'une partie (au plus 'taille_lot') sont appliqués en une seule
+    prise du verrou de la partie, et le tour n'est évalué que lorsqu'il est
+    complet. Une partie n'est traitée que par un thread à la fois, ce qui
+    préserve l'ordre de ses votes ; les parties prêtes sont servies à tour
+    de rôle.
+
+    Lorsque la file d'une partie est pleine, ou que trop de votes attendent
+    au total, soumettre() lève FileSaturee : le client est invité à réessayer
+    plus tard plutôt que de faire grossir la file sans limite.
+    """
+
+    def __init__(self, traiter, taille_file=256, taille_lot=64, max_en_attente=10000,
+                 nb_threads=1, delai_reessai=1, automatique=True):
+        """
+        @param traiter Fonction appelée avec (clé, lot) : l'identifiant de la partie
+            et la liste de ses votes, dans l'ordre de soumission.
+        @param taille_file Nombre maximal de votes en attente par partie.
+        @param taille_lot Nombre maximal de votes appliqués en une fois.
+        @param max_en_attente Nombre maximal de votes en attente, toutes parties confondues.
+        @param nb_threads Nombre de threads de traitement.
+        @param delai_reessai Délai conseillé aux clients refusés, en secondes.
+        @param automatique Si True, des threads de fond traitent les votes ;
+            sinon ils sont traités par traiter_en_attente().
+        """
+        self.traiter = traiter
+        self.taille_file = taille_file
+        self.taille_lot = taille_lot
+        self.max_en_attente = max_en_attente
+        self.nb_threads = nb_threads
+        self.delai_reessai = delai_reessai
+        self.automatique = automatique
+        self._files = {}          # clé -> deque des votes en attente
+        self._pretes = deque()    # Clés ayant des votes en attente et non en cours de traitement
+        self._en_cours = set()
+        self._en_attente = 0
+        self._condition = threading.Condition()
+        self._threads = []
+        self._arret = False
+
+    def soumettre(self, cle, vote):
+        """
+        @brief Ajoute un vote à la file de sa partie.
+
+        @param cle L'identifiant de la partie.
+        @param vote Le vote, transmis tel quel à la fonction de traitement.
+        @return La position du vote dans la file de la partie.
+        @exception FileSaturee Si la file de la partie ou le pipeline est plein.
+        """
+        with self._condition:
+            if self._en_attente >= self.max_en_attente:
+                raise FileSaturee("Trop de votes en attente, réessayez plus tard.",
+                                  self.delai_reessai, globale=True)
+            file = self._files.setdefault(cle, deque())
+            if len(file) >= self.taille_file:
+                raise FileSaturee("Trop de votes en attente pour cette partie, réessayez plus tard.",
+                                  self.delai_reessai)
+            file.append(vote)
+            self._en_attente += 1
+            if len(file) == 1 and cle not in self._en_cours:
+                self._pretes.append(cle)
+                self._condition.notify_all()
+            if self.automatique and not self._threads:
+                self._demarrer()
+            return len(file)
+
+    def traiter_en_attente(self):
+        """
+        @brief Traite tous les votes en attente dans le thread appelant.
+
+        @return Le nombre de votes traités.
+        """
+        total = 0
+        while True:
+            with self._condition:
+                if not self._pretes:
+                    return total
+                cle, lot = self._prendre_lot()
+            self._traiter_lot(cle, lot)
+            total += len(lot)
+
+    def attendre(self, timeout=None):
+        """
+        @brief Attend que tous les votes soumis aient été traités.
+
+        @param timeout Délai maximal d'attente, en secondes.
+        @return True si le pipeline est vide, False si le délai a expiré.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._en_attente and not self._en_cours, timeout)
+
+    def en_attente(self, cle=None):
+        """
+        @brief Nombre de votes en attente, pour une partie ou au total.
+        """
+        with self._condition:
+            if cle is None:
+                return self._en_attente
+            return len(self._files.get(cle, ()))
+
+    def arreter(self):
+        """
+        @brief Arrête les threads de traitement après avoir vidé les files.
+        """
+        with self._condition:
+            self._arret = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _prendre_lot(self):
+        # Appelée avec la condition détenue
+        cle = self._pretes.popleft()
+        file = self._files[cle]
+        lot = [file.popleft() for _ in range(min(len(file), self.taille_lot))]
+        if not file:
+            del self._files[cle]
+        self._en_attente -= len(lot)
+        self._en_cours.add(cle)
+        return cle, lot
+
+    def _traiter_lot(self, cle, lot):
+        try:
+            self.traiter(cle, lot)
+        except Exception:
+            logger.exception("Erreur lors du traitement des votes de la partie %s", cle)
+        finally:
+            with self._condition:
+                self._en_cours.discard(cle)
+                # Votes arrivés pendant le traitement : la partie repasse en fin de tour de rôle
+                if cle in self._files:
+                    self._pretes.append(cle)
+                self._condition.notify_all()
+
+    def _demarrer(self):
+        self._arret = False
+        for numero in range(self.nb_threads):
+            thread = threading.Thread(target=self._boucle, name=f"vote-ingestion-{numero}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _boucle(self):
+        while True:
+            with self._condition:
+                while not self._pretes and not self._arret:
+                    self._condition.wait()
+                if not self._pretes:
+                    return
+                cle, lot = self._prendre_lot()
+            self._traiter_lot(cle, lot)
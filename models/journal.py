@@ -0,0 +1,308 @@
+import json
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+from models.room import GameRoom
+
+# Identifiant de partie accepté dans les chemins de fichiers
+FORMAT_GAME_ID = re.compile(r'^[0-9a-f]{16}$')
+
+# Types d'événements enregistrés dans le journal
+EVENEMENT_VOTE = 'vote'
+EVENEMENT_INTERRO = 'interro'
+EVENEMENT_FEATURE_AJOUTEE = 'feature_ajoutee'
+EVENEMENT_FEATURE_SUPPRIMEE = 'feature_supprimee'
+EVENEMENT_TOUR_VALIDE = 'tour_valide'
+
+
+class GameJournal:
+    """
+    @brief Journal en ajout seul des événements d'une partie.
+
+    @details
+    Chaque partie possède son propre répertoire contenant :
+    - snapshot.json : l'état complet de la partie à la séquence 'sequence' ;
+    - journal.ndjson : les événements postérieurs, un objet JSON par ligne.
+    Enregistrer un événement ne coûte qu'une ligne ajoutée en fin de fichier.
+    Tous les 'seuil_compactage' événements, l'état est réécrit dans un nouvel
+    instantané et le journal est vidé.
+
+    Plusieurs processus peuvent écrire dans le journal d'une même partie :
+    chaque opération prend un verrou sur le fichier 'verrou' du répertoire
+    (fcntl.flock) et relit la séquence si le journal a changé depuis sa
+    dernière écriture.
+    """
+
+    def __init__(self, repertoire, seuil_compactage=500):
+        """
+        @param repertoire Le répertoire de la partie.
+        @param seuil_compactage Nombre d'événements entre deux instantanés.
+        """
+        self.repertoire = repertoire
+        self.seuil_compactage = seuil_compactage
+        self.chemin_snapshot = os.path.join(repertoire, 'snapshot.json')
+        self.chemin_journal = os.path.join(repertoire, 'journal.ndjson')
+        self.chemin_verrou = os.path.join(repertoire, 'verrou')
+        self._lock = threading.Lock()
+        self._sequence = None
+        self._depuis_snapshot = 0
+        self._empreinte = None  # État du journal après la dernière écriture de ce processus
+
+    def initialiser(self, etat):
+        """
+        @brief Démarre le journal d'une partie à partir de son état initial.
+
+        @param etat L'état de la partie au format des sauvegardes JSON.
+        """
+        os.makedirs(self.repertoire, exist_ok=True)
+        with self._verrouiller():
+            self._sequence = 0
+            self._ecrire_snapshot(etat)
+
+    def ajouter(self, type_evenement, etat=None, **donnees):
+        """
+        @brief Ajoute un événement en fin de journal.
+
+        @param type_evenement Le type d'événement (EVENEMENT_*).
+        @param etat Fonction renvoyant l'état courant de la partie, appelée
+            uniquement lorsqu'un compactage est nécessaire.
+        @param donnees Le contenu de l'événement.
+        @return Le numéro de séquence de l'événement.
+        """
+        with self._verrouiller():
+            self._synchroniser()
+            self._sequence += 1
+            ligne = json.dumps(dict(donnees, seq=self._sequence, type=type_evenement)) + '\n'
+            with open(self.chemin_journal, 'ab+') as f:
+                if f.tell() and not self._termine_par_saut_de_ligne(f):
+                    # Ligne tronquée par un arrêt brutal : l'événement commence sur une nouvelle ligne
+                    ligne = '\n' + ligne
+                f.write(ligne.encode('utf-8'))
+            self._depuis_snapshot += 1
+            if etat is not None and self._depuis_snapshot >= self.seuil_compactage:
+                self._ecrire_snapshot(etat())
+            self._empreinte = self._empreinte_journal()
+            return self._sequence
+
+    def compacter(self, etat):
+        """
+        @brief Réécrit l'instantané de la partie et vide le journal.
+
+        @param etat L'état courant de la partie au format des sauvegardes JSON.
+        """
+        with self._verrouiller():
+            self._synchroniser()
+            self._ecrire_snapshot(etat)
+            self._empreinte = self._empreinte_journal()
+
+    def charger(self):
+        """
+        @brief Reconstruit la partie depuis l'instantané et la fin du journal.
+
+        @return La GameRoom reconstruite.
+        @exception FileNotFoundError Si la partie n'a pas de journal.
+        """
+        with self._verrouiller(exclusif=False):
+            with open(self.chemin_snapshot, encoding='utf-8') as f:
+                etat = json.load(f)
+            room = GameRoom.depuis_etat(etat)
+            for evenement in self._evenements_depuis(etat.get('sequence', 0)):
+                appliquer_evenement(room, evenement)
+            return room
+
+    @contextmanager
+    def _verrouiller(self, exclusif=True):
+        # Le verrou de thread protège le cache du processus, flock les fichiers partagés
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.repertoire, exist_ok=True)
+            with open(self.chemin_verrou, 'a') as verrou:
+                fcntl.flock(verrou, fcntl.LOCK_EX if exclusif else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(verrou, fcntl.LOCK_UN)
+
+    def _synchroniser(self):
+        # Un autre processus a pu écrire ou compacter le journal depuis notre dernière écriture
+        if self._sequence is None or self._empreinte_journal() != self._empreinte:
+            self._relire_sequence()
+
+    def _empreinte_journal(self):
+        try:
+            stat = os.stat(self.chemin_journal)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    @staticmethod
+    def _termine_par_saut_de_ligne(f):
+        f.seek(-1, os.SEEK_END)
+        termine = f.read(1) == b'\n'
+        f.seek(0, os.SEEK_END)
+        return termine
+
+    def _ecrire_snapshot(self, etat):
+        # Écriture atomique : un instantané à moitié écrit n'est jamais lu
+        etat = dict(etat, sequence=self._sequence)
+        temporaire = self.chemin_snapshot + '.tmp'
+        with open(temporaire, 'w', encoding='utf-8') as f:
+            json.dump(etat, f)
+        os.replace(temporaire, self.chemin_snapshot)
+        # Les événements antérieurs à l'instantané ne sont plus nécessaires
+        open(self.chemin_journal, 'w').close()
+        self._depuis_snapshot = 0
+
+    def _relire_sequence(self):
+        with open(self.chemin_snapshot, encoding='utf-8') as f:
+            self._sequence = json.load(f).get('sequence', 0)
+        self._depuis_snapshot = 0
+        for evenement in self._evenements_depuis(self._sequence):
+            self._sequence = evenement['seq']
+            self._depuis_snapshot += 1
+
+    def _evenements_depuis(self, sequence):
+        if not os.path.exists(self.chemin_journal):
+            return
+        with open(self.chemin_journal, encoding='utf-8') as f:
+            for ligne in f:
+                try:
+                    evenement = json.loads(ligne)
+                except json.JSONDecodeError:
+                    # Ligne tronquée par un arrêt brutal
+                    continue
+                if evenement['seq'] > sequence:
+                    yield evenement
+
+
+def appliquer_evenement(room, evenement):
+    """
+    @brief Rejoue un événement du journal sur une partie.
+
+    @param room La GameRoom à mettre à jour.
+    @param evenement L'événement lu dans le journal.
+    """
+    type_evenement = evenement['type']
+    if type_evenement == EVENEMENT_VOTE:
+        room.jouer(evenement['valeur'])
+    elif type_evenement == EVENEMENT_INTERRO:
+        room.relancer_interro()
+    elif type_evenement == EVENEMENT_FEATURE_AJOUTEE:
+        for feature_id, titre in evenement['features']:
+            room.features.inserer(feature_id, titre)
+    elif type_evenement == EVENEMENT_FEATURE_SUPPRIMEE:
+        room.features.supprimer(evenement['id'])
+    # EVENEMENT_TOUR_VALIDE est informatif : le vote qui le précède suffit à le rejouer
+
+
+class JournalStore:
+    """
+    @brief Répertoire des journaux de parties, un sous-répertoire par partie.
+    """
+
+    def __init__(self, racine, seuil_compactage=500, max_ouverts=1000):
+        """
+        @param racine Le répertoire contenant les parties.
+        @param seuil_compactage Nombre d'événements entre deux instantanés.
+        @param max_ouverts Nombre de journaux gardés en mémoire.
+        """
+        self.racine = racine
+        self.seuil_compactage = seuil_compactage
+        self.max_ouverts = max_ouverts
+        self._journaux = OrderedDict()
+        self._lock = threading.Lock()
+
+    def creer(self, etat):
+        """
+        @brief Crée le journal d'une nouvelle partie.
+
+        @param etat L'état initial de la partie au format des sauvegardes JSON.
+        @return L'identifiant de la partie.
+        """
+        game_id = secrets.token_hex(8)
+        self.journal(game_id).initialiser(etat)
+        return game_id
+
+    def journal(self, game_id):
+        """
+        @brief Renvoie le journal d'une partie.
+
+        @exception ValueError Si l'identifiant est mal formé.
+        """
+        if not FORMAT_GAME_ID.match(game_id or ''):
+            raise ValueError(f"Identifiant de partie invalide : {game_id!r}")
+        with self._lock:
+            journal = self._journaux.get(game_id)
+            if journal is None:
+                journal = GameJournal(os.path.join(self.racine, game_id), self.seuil_compactage)
+                self._journaux[game_id] = journal
+                if len(self._journaux) > self.max_ouverts:
+                    self._journaux.popitem(last=False)
+            self._journaux.move_to_end(game_id)
+            return journal
+
+    def existe(self, game_id):
+        """
+        @brief Indique si une partie possède un journal.
+        """
+        return bool(FORMAT_GAME_ID.match(game_id or '')) and os.path.exists(
+            os.path.join(self.racine, game_id, 'snapshot.json'))
+
+    def purger(self, anciennete):
+        """
+        @brief Supprime les journaux des parties sans activité depuis 'anciennete' secondes.
+
+        @details
+        L'activité d'une partie est la date de la dernière écriture de son
+        instantané ou de son journal. La suppression se fait sous le verrou
+        de la partie : une écriture concurrente reprend ensuite un nouveau
+        journal depuis l'état de la session (voir app.journaliser()).
+
+        @param anciennete Durée de conservation en secondes.
+        @return Les identifiants des parties supprimées.
+        """
+        try:
+            entrees = [e.name for e in os.scandir(self.racine) if FORMAT_GAME_ID.match(e.name) and e.is_dir()]
+        except FileNotFoundError:
+            return []
+        limite = time.time() - anciennete
+        supprimees = []
+        for game_id in entrees:
+            with self._lock:
+                journal = self._journaux.get(game_id)
+            # Une partie inactive n'est pas ajoutée aux journaux gardés en mémoire
+            journal = journal or GameJournal(os.path.join(self.racine, game_id), self.seuil_compactage)
+            if self._derniere_activite(journal) >= limite:
+                continue
+            with journal._verrouiller():
+                # Relu sous le verrou : la partie a pu reprendre entre-temps
+                if self._derniere_activite(journal) >= limite:
+                    continue
+                shutil.rmtree(journal.repertoire, ignore_errors=True)
+            with self._lock:
+                self._journaux.pop(game_id, None)
+            supprimees.append(game_id)
+        return supprimees
+
+    @staticmethod
+    def _derniere_activite(journal):
+        dates = [0.0]
+        for chemin in (journal.chemin_snapshot, journal.chemin_journal, journal.repertoire):
+            try:
+                dates.append(os.stat(chemin).st_mtime)
+            except FileNotFoundError:
+                pass
+        return max(dates)
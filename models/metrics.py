@@ -0,0 +1,262 @@
+import bisect
+import itertools
+import os
+import threading
+from abc import ABC, abstractmethod
+
+# Bornes par défaut des histogrammes de latence, en secondes
+BORNES_LATENCE = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# Nombre de partitions de chaque métrique
+NB_PARTITIONS = 16
+
+
+class _Metrique(ABC):
+    """
+    @brief Base des métriques réparties en partitions, chacune avec son verrou.
+
+    @details
+    Le nombre de partitions est fixe (NB_PARTITIONS). Chaque partition est un
+    dictionnaire indexé par les valeurs des étiquettes, protégé par son propre
+    verrou. Un thread est affecté à une partition à son premier incrément (à
+    tour de rôle, sans verrou) : les threads d'un serveur qui en crée un par
+    requête se répartissent sur les partitions, sans verrou global ni
+    structure qui grandit avec le nombre de threads. La lecture de la
+    métrique additionne les partitions.
+    """
+    type_metrique = None
+
+    def __init__(self, nom, aide, etiquettes=()):
+        """
+        @param nom Le nom de la métrique (format Prometheus).
+        @param aide La description affichée dans la ligne HELP.
+        @param etiquettes Les noms des étiquettes de la métrique.
+        """
+        self.nom = nom
+        self.aide = aide
+        self.etiquettes = tuple(etiquettes)
+        self._local = threading.local()
+        self._partitions = [({}, threading.Lock()) for _ in range(NB_PARTITIONS)]
+        self._suivante = itertools.count()  # next() est atomique : aucun verrou à l'affectation
+
+    def _partition(self):
+        # Couple (valeurs, verrou) de la partition du thread courant
+        try:
+            return self._local.partition
+        except AttributeError:
+            partition = self._local.partition = self._partitions[next(self._suivante) % NB_PARTITIONS]
+            return partition
+
+    @abstractmethod
+    def _cumuler(self, total, partition):
+        """
+        @brief Ajoute les valeurs d'une partition au total (lecture de la métrique).
+        """
+
+    def _cle(self, valeurs):
+        if len(valeurs) != len(self.etiquettes):
+            raise ValueError(f"Étiquettes attendues pour {self.nom} : {self.etiquettes}")
+        return tuple(str(valeurs[e]) for e in self.etiquettes)
+
+    def _total(self):
+        total = {}
+        for valeurs, verrou in self._partitions:
+            with verrou:
+                self._cumuler(total, valeurs)
+        return total
+
+    def _entete(self):
+        return [f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} {self.type_metrique}"]
+
+    def _etiquettes(self, cle, supplementaires=()):
+        paires = list(zip(self.etiquettes, cle)) + list(supplementaires)
+        if not paires:
+            return ''
+        return '{' + ','.join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in paires) + '}'
+
+
+class Compteur(_Metrique):
+    """
+    @brief Compteur Prometheus (valeur croissante).
+    """
+    type_metrique = 'counter'
+
+    def inc(self, valeur=1, **etiquettes):
+        """
+        @brief Incrémente le compteur pour les étiquettes données.
+        """
+        valeurs, verrou = self._partition()
+        cle = self._cle(etiquettes)
+        with verrou:
+            valeurs[cle] = valeurs.get(cle, 0) + valeur
+
+    def valeurs(self):
+        """
+        @brief Totaux de toutes les partitions, par valeurs d'étiquettes.
+        """
+        return self._total()
+
+    def _cumuler(self, total, partition):
+        for cle, valeur in partition.items():
+            total[cle] = total.get(cle, 0) + valeur
+
+    def exposer(self, communes=()):
+        """
+        @brief Lignes du format texte Prometheus.
+
+        @param communes Étiquettes (nom, valeur) ajoutées à chaque échantillon.
+        """
+        lignes = self._entete()
+        for cle, valeur in sorted(self.valeurs().items()):
+            lignes.append(f"{self.nom}{self._etiquettes(cle, communes)} {_nombre(valeur)}")
+        return lignes
+
+
+class Histogramme(_Metrique):
+    """
+    @brief Histogramme Prometheus (répartition des valeurs observées par tranches).
+    """
+    type_metrique = 'histogram'
+
+    def __init__(self, nom, aide, etiquettes=(), bornes=BORNES_LATENCE):
+        """
+        @param bornes Les bornes supérieures des tranches, croissantes.
+        """
+        super().__init__(nom, aide, etiquettes)
+        self.bornes = tuple(bornes)
+
+    def observer(self, valeur, **etiquettes):
+        """
+        @brief Enregistre une valeur observée pour les étiquettes données.
+        """
+        valeurs, verrou = self._partition()
+        cle = self._cle(etiquettes)
+        tranche = bisect.bisect_left(self.bornes, valeur)
+        with verrou:
+            tranches = valeurs.get(cle)
+            if tranches is None:
+                # Une case par tranche, une pour +Inf, puis la somme des valeurs
+                tranches = valeurs[cle] = [0] * (len(self.bornes) + 2)
+            tranches[tranche] += 1
+            tranches[-1] += valeur
+
+    def valeurs(self):
+        """
+        @brief Tranches (non cumulées) et somme, par valeurs d'étiquettes.
+        """
+        return self._total()
+
+    def _cumuler(self, total, partition):
+        for cle, tranches in partition.items():
+            cumul = total.setdefault(cle, [0] * (len(self.bornes) + 2))
+            for i, n in enumerate(tranches):
+                cumul[i] += n
+
+    def exposer(self, communes=()):
+        """
+        @brief Lignes du format texte Prometheus.
+
+        @param communes Étiquettes (nom, valeur) ajoutées à chaque échantillon.
+        """
+        lignes = self._entete()
+        communes = list(communes)
+        for cle, tranches in sorted(self.valeurs().items()):
+            cumul = 0
+            for borne, n in zip(self.bornes + ('+Inf',), tranches):
+                cumul += n
+                lignes.append(f"{self.nom}_bucket{self._etiquettes(cle, communes + [('le', _nombre(borne))])} {cumul}")
+            lignes.append(f"{self.nom}_sum{self._etiquettes(cle, communes)} {_nombre(tranches[-1])}")
+            lignes.append(f"{self.nom}_count{self._etiquettes(cle, communes)} {cumul}")
+        return lignes
+
+
+class Jauge:
+    """
+    @brief Jauge Prometheus dont la valeur est lue à l'exposition.
+    """
+    type_metrique = 'gauge'
+
+    def __init__(self, nom, aide, lecture):
+        """
+        @param lecture Fonction sans argument renvoyant la valeur courante.
+        """
+        self.nom = nom
+        self.aide = aide
+        self.lecture = lecture
+
+    def exposer(self, communes=()):
+        """
+        @brief Lignes du format texte Prometheus.
+
+        @param communes Étiquettes (nom, valeur) ajoutées à l'échantillon.
+        """
+        etiquettes = ','.join(f'{nom}="{_echapper(valeur)}"' for nom, valeur in communes)
+        return [f"# HELP {self.nom} {self.aide}", f"# TYPE {self.nom} gauge",
+                f"{self.nom}{'{' + etiquettes + '}' if etiquettes else ''} {_nombre(self.lecture())}"]
+
+
+class MetricsRegistry:
+    """
+    @brief Registre des métriques exposées par /metrics.
+
+    @details
+    Les métriques sont propres au processus. Lorsque plusieurs processus
+    servent l'application (voir serve.py), chacun a son registre et une
+    requête sur /metrics est servie par l'un d'eux : 'etiquette_processus'
+    ajoute alors à chaque échantillon l'identifiant du processus qui l'expose,
+    pour que les séries des différents processus ne se confondent pas
+    (elles s'additionnent ensuite côté Prometheus, ex. sum without (pid)).
+    """
+
+    def __init__(self, etiquette_processus=None):
+        """
+        @param etiquette_processus Nom de l'étiquette portant l'identifiant du processus
+            (ex. 'pid'), ou None pour ne pas l'ajouter.
+        """
+        self.etiquette_processus = etiquette_processus
+        self._metriques = []
+
+    def compteur(self, nom, aide, etiquettes=()):
+        """
+        @brief Crée et enregistre un Compteur.
+        """
+        return self._ajouter(Compteur(nom, aide, etiquettes))
+
+    def histogramme(self, nom, aide, etiquettes=(), bornes=BORNES_LATENCE):
+        """
+        @brief Crée et enregistre un Histogramme.
+        """
+        return self._ajouter(Histogramme(nom, aide, etiquettes, bornes))
+
+    def jauge(self, nom, aide, lecture):
+        """
+        @brief Crée et enregistre une Jauge.
+        """
+        return self._ajouter(Jauge(nom, aide, lecture))
+
+    def exposer(self):
+        """
+        @brief Toutes les métriques au format texte Prometheus (version 0.0.4).
+        """
+        # Lu à chaque exposition : le registre a pu être créé avant un fork
+        communes = [] if self.etiquette_processus is None else [(self.etiquette_processus, os.getpid())]
+        lignes = []
+        for metrique in self._metriques:
+            lignes.extend(metrique.exposer(communes))
+        return '\n'.join(lignes) + '\n'
+
+    def _ajouter(self, metrique):
+        self._metriques.append(metrique)
+        return metrique
+
+
+def _nombre(valeur):
+    if isinstance(valeur, str):
+        return valeur
+    if isinstance(valeur, float) and valeur.is_integer():
+        return repr(valeur)
+    return str(valeur)
+
+
+def _echapper(valeur):
+    return str(valeur).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,239 @@
+import cProfile
+import os
+import pstats
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows : pas de verrou entre processus
+    fcntl = None
+
+from werkzeug.exceptions import HTTPException
+
+# En-tête demandant le profilage d'une requête (si la configuration l'autorise)
+ENTETE_PROFILAGE = 'X-Profilage'
+_CLE_ENTETE = 'HTTP_' + ENTETE_PROFILAGE.upper().replace('-', '_')
+
+# Caractères acceptés dans les noms de fichiers de profil
+_NOM_FICHIER = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class RequestProfiler:
+    """
+    @brief Profilage d'une fraction des requêtes, cumulé par route dans des fichiers.
+
+    @details
+    Une requête tirée au sort (taux) ou marquée par l'en-tête X-Profilage est
+    exécutée sous cProfile, pendant qu'un thread échantillonne sa pile d'appels
+    toutes les millisecondes. Les profils sont cumulés par route, en mémoire,
+    puis ajoutés au plus toutes les 'intervalle' secondes à deux fichiers par route :
+    - <route>.pstats : statistiques cProfile (pstats.Stats, snakeviz...) ;
+    - <route>.collapsed : piles repliées ("a;b;c nombre"), pour flamegraph.pl ou speedscope.
+    Les fichiers cumulent tous les profils depuis leur création, y compris ceux
+    des autres processus de service (écriture sous verrou).
+
+    Une seule requête est profilée à la fois par processus : cProfile ne peut
+    pas suivre plusieurs threads sans mélanger leurs appels.
+    """
+
+    def __init__(self, repertoire, taux=0.01, entete=False, intervalle=10.0, periode_echantillon=0.001):
+        """
+        @param repertoire Le répertoire des fichiers de profil.
+        @param taux La fraction des requêtes profilées (entre 0 et 1).
+        @param entete Si True, une requête portant l'en-tête X-Profilage: 1 est toujours profilée.
+        @param intervalle Délai minimal entre deux écritures des fichiers, en secondes.
+        @param periode_echantillon Période d'échantillonnage des piles d'appels, en secondes.
+        """
+        self.repertoire = repertoire
+        self.taux = taux
+        self.entete = entete
+        self.intervalle = intervalle
+        self.periode_echantillon = periode_echantillon
+        self._en_cours = threading.Lock()
+        self._lock = threading.Lock()
+        self._profils = {}        # route -> pstats.Stats non encore écrites
+        self._piles = {}          # route -> Counter des piles repliées non encore écrites
+        self._derniere_ecriture = time.monotonic()
+
+    def doit_profiler(self, environ):
+        """
+        @brief Indique si une requête doit être profilée (tirage au sort ou en-tête).
+        """
+        if self.entete and environ.get(_CLE_ENTETE, '') not in ('', '0'):
+            return True
+        return self.taux > 0 and random.random() < self.taux
+
+    @contextmanager
+    def profiler(self, route):
+        """
+        @brief Profile le bloc with et cumule le résultat dans les profils de la route.
+
+        @details
+        Si une autre requête est déjà profilée, le bloc s'exécute sans profilage.
+        """
+        if not self._en_cours.acquire(blocking=False):
+            yield
+            return
+        try:
+            echantillonneur = _Echantillonneur(threading.get_ident(), self.periode_echantillon)
+            profil = cProfile.Profile()
+            echantillonneur.start()
+            profil.enable()
+            try:
+                yield
+            finally:
+                profil.disable()
+                echantillonneur.arreter()
+        finally:
+            self._en_cours.release()
+        self.cumuler(route, profil, echantillonneur.piles)
+
+    def cumuler(self, route, profil, piles):
+        """
+        @brief Ajoute un profil et des piles échantillonnées aux cumuls d'une route.
+        """
+        with self._lock:
+            if route in self._profils:
+                self._profils[route].add(profil)
+            else:
+                self._profils[route] = pstats.Stats(profil)
+            self._piles.setdefault(route, Counter()).update(piles)
+            ecrire = time.monotonic() - self._derniere_ecriture >= self.intervalle
+        if ecrire:
+            self.ecrire()
+
+    def ecrire(self):
+        """
+        @brief Ajoute les profils cumulés en mémoire aux fichiers de chaque route.
+
+        @return Les routes dont les fichiers ont été mis à jour.
+        """
+        with self._lock:
+            profils, self._profils = self._profils, {}
+            piles, self._piles = self._piles, {}
+            self._derniere_ecriture = time.monotonic()
+        if not profils:
+            return []
+        os.makedirs(self.repertoire, exist_ok=True)
+        for route, stats in profils.items():
+            base = os.path.join(self.repertoire, _NOM_FICHIER.sub('_', route))
+            with _verrou_fichier(base + '.verrou'):
+                _ajouter_pstats(base + '.pstats', stats)
+                _ajouter_piles(base + '.collapsed', piles.get(route, ()))
+        return sorted(profils)
+
+    def envelopper(self, wsgi_app, url_map):
+        """
+        @brief Enveloppe une application WSGI pour profiler les requêtes retenues.
+
+        @param wsgi_app L'application WSGI (Flask.wsgi_app).
+        @param url_map Les routes de l'application, pour nommer les profils par endpoint.
+        @return L'application WSGI enveloppée.
+
+        @details
+        Le profil couvre toute la requête : ouverture et enregistrement de la
+        session, vue, rendu des templates. Le corps d'une réponse en streaming
+        (flux SSE, export) est envoyé après la fin du profil.
+        """
+        def application(environ, start_response):
+            if not self.doit_profiler(environ):
+                return wsgi_app(environ, start_response)
+            with self.profiler(_route(url_map, environ)):
+                return wsgi_app(environ, start_response)
+        return application
+
+
+class _Echantillonneur(threading.Thread):
+    # Relève périodiquement la pile d'appels d'un thread (piles repliées, racine en premier)
+
+    def __init__(self, thread_id, periode):
+        super().__init__(name="profilage-echantillons", daemon=True)
+        self.thread_id = thread_id
+        self.periode = periode
+        self.piles = Counter()
+        self._arret = threading.Event()
+
+    def run(self):
+        while not self._arret.wait(self.periode):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            pile = []
+            while frame is not None:
+                code = frame.f_code
+                pile.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            self.piles[';'.join(reversed(pile))] += 1
+
+    def arreter(self):
+        self._arret.set()
+        self.join()
+
+
+def _route(url_map, environ):
+    # Endpoint Flask de la requête, qui nomme ses fichiers de profil
+    try:
+        endpoint, _ = url_map.bind_to_environ(environ).match()
+    except HTTPException:
+        return 'inconnu'
+    return endpoint
+
+
+@contextmanager
+def _verrou_fichier(chemin):
+    # Verrou exclusif entre processus (aucun verrou sous Windows)
+    with open(chemin, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _ajouter_pstats(chemin, stats):
+    if os.path.exists(chemin):
+        stats.add(chemin)
+    temporaire = chemin + '.tmp'
+    stats.dump_stats(temporaire)
+    os.replace(temporaire, chemin)
+
+
+def _ajouter_piles(chemin, piles):
+    total = Counter()
+    if os.path.exists(chemin):
+        with open(chemin, encoding='utf-8') as f:
+            for ligne in f:
+                pile, _, nombre = ligne.rstrip('\n').rpartition(' ')
+                if pile:
+                    total[pile] += int(nombre)
+    total.update(piles)
+    temporaire = chemin + '.tmp'
+    with open(temporaire, 'w', encoding='utf-8') as f:
+        for pile, nombre in sorted(total.items()):
+            f.write(f"{pile} {nombre}\n")
+    os.replace(temporaire, chemin)
+
+
+def creer_profileur(config, repertoire_instance):
+    """
+    @brief Construit le profileur décrit par la configuration, ou None s'il est désactivé.
+
+    @param config La configuration de l'application :
+        - PROFILAGE_TAUX : fraction des requêtes profilées (0 par défaut : désactivé) ;
+        - PROFILAGE_ENTETE : si vrai, l'en-tête X-Profilage: 1 force le profilage d'une requête ;
+        - PROFILAGE_DIR : répertoire des fichiers de profil ;
+        - PROFILAGE_INTERVALLE : délai minimal entre deux écritures, en secondes.
+    @param repertoire_instance Le répertoire d'instance de l'application (répertoire par défaut).
+    @return Le RequestProfiler, ou None.
+    """
+    taux = float(config.get('PROFILAGE_TAUX', 0))
+    entete = bool(config.get('PROFILAGE_ENTETE', False))
+    if taux <= 0 and not entete:
+        return None
+    return RequestProfiler(config.get('PROFILAGE_DIR', os.path.join(repertoire_instance, 'profils')),
+                           taux=taux, entete=entete,
+                           intervalle=float(config.get('PROFILAGE_INTERVALLE', 10)))
@@ -0,0 +1,678 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+
+from models.cartes import Carte, encoder_carte, lire_votes, distribuer_votes
+from models.features import FeatureCollection
+from models.game import LISTE_TYPE_VOTE, REGLES, valider_codes, resoudre_regle
+from models.statistiques import StatistiquesTour
+
+# Issues possibles d'un vote (voir GameRoom.jouer)
+ISSUE_SUIVANT = 'suivant'    # Au joueur suivant de voter
+ISSUE_VALIDE = 'valide'      # La fonctionnalité a été chiffrée
+ISSUE_PAUSE = 'pause'        # Tous ont voté "cafe"
+ISSUE_INTERRO = 'interro'    # Tous ont voté "interro"
+ISSUE_DEBAT = 'debat'        # Désaccord : débat puis nouveau vote
+ISSUE_TERMINE = 'termine'    # Toutes les fonctionnalités sont chiffrées
+
+# Code d'un joueur n'ayant pas encore voté (vote simultané)
+ABSENT = -1
+
+
+class GameRoom:
+    """
+    @brief État d'une partie de Planning Poker et machine à états du vote.
+
+    @details
+    Une GameRoom regroupe tout ce qui était auparavant stocké dans la session :
+    joueurs, règles, fonctionnalités, votes du tour en cours et résultats.
+    Elle peut être reconstruite depuis la session (mode un seul appareil)
+    ou conservée dans un RoomRegistry (plusieurs parties dans un même processus).
+    """
+    __slots__ = (
+        'room_id', 'players', '_rules', 'regle', 'time_limit', 'features',
+        'current_feature_index', 'index_player', 'liste_vote', 'revote',
+        'bulletins', 'simultane', 'echeance', '_stats'
+    )
+
+    def __init__(self, room_id=None, players=(), rules='majorite', time_limit=30, features=()):
+        """
+        @param room_id Identifiant de la partie (None pour une partie en session).
+        @param players Les noms des joueurs, dans l'ordre de passage.
+        @param rules Le type de validation (voir models.game.LISTE_TYPE_VOTE).
+        @param time_limit Le temps limite par vote en secondes (None : pas de limite).
+        @param features Les fonctionnalités à chiffrer (titres ou FeatureCollection).
+        """
+        self.room_id = room_id
+        self.players = list(players)
+        self.rules = rules
+        self.time_limit = time_limit
+        self.features = features if isinstance(features, FeatureCollection) else FeatureCollection(features)
+        self.current_feature_index = 0
+        self.index_player = 0
+        self.liste_vote = array('b')
+        self.revote = False
+        self.bulletins = array('b')
+        self.simultane = False
+        self.echeance = None  # Fin du tour chronométré (horodatage time.time())
+        self._stats = StatistiquesTour()
+
+    @classmethod
+    def depuis_etat(cls, etat, room_id=None):
+        """
+        @brief Reconstruit une partie depuis la session ou une sauvegarde.
+
+        @param etat Un dictionnaire avec les clés de la session ('players', 'features'...).
+        @param room_id Identifiant de la partie.
+        @return La GameRoom correspondante.
+        """
+        room = cls(
+            room_id=room_id,
+            players=etat.get('players', []),
+            rules=etat.get('rules', 'unanime'),
+            time_limit=etat.get('time_limit', None),
+            features=FeatureCollection.depuis(etat.get('features'), etat.get('results')),
+        )
+        room.current_feature_index = etat.get('current_feature_index', 0)
+        room.index_player = etat.get('index_player', 0)
+        room.liste_vote = lire_votes(etat.get('liste_vote'))
+        room.revote = etat.get('revote', False)
+        room.simultane = etat.get('simultaneous', False)
+        room.bulletins = lire_votes(etat.get('bulletins'))
+        room.echeance = etat.get('echeance')
+        if etat.get('modified') is not None:
+            room.features.modifiee = etat['modified']
+        # Statistiques tenues à jour vote par vote ; à défaut (sauvegarde, ancienne
+        # session), elles ne sont recalculées qu'à leur première utilisation
+        stats = etat.get('stats')
+        room._stats = None if stats is None else StatistiquesTour.depuis_etat(stats)
+        return room
+
+    def vers_etat(self):
+        """
+        @brief Exporte l'état de la partie avec les clés utilisées par la session.
+
+        @return Un dictionnaire sérialisable par la session (les votes sont des octets,
+            les estimations sont portées par la FeatureCollection, les statistiques
+            du tour sont celles de StatistiquesTour.vers_etat()).
+        """
+        return {
+            "players": self.players,
+            "features": self.features,
+            "current_feature_index": self.current_feature_index,
+            "index_player": self.index_player,
+            "rules": self.rules,
+            "liste_vote": self.liste_vote.tobytes(),
+            "time_limit": self.time_limit,
+            "revote": self.revote,
+            "stats": self.statistiques.vers_etat(),
+        }
+
+    def vers_sauvegarde(self):
+        """
+        @brief Exporte l'état de la partie au format des fichiers de sauvegarde JSON.
+
+        @return Un dictionnaire sérialisable en JSON (les votes sont en hexadécimal,
+            les résultats indexés par titre).
+        """
+        etat = self.vers_etat()
+        etat["features"] = []
+        for i, t in self.features.items():
+            feature = {"id": i, "title": t}
+            historique = self.features.historique(i)
+            if historique['rounds']:
+                feature["history"] = historique
+            etat["features"].append(feature)
+        etat["results"] = self.results
+        etat["liste_vote"] = self.liste_vote.tobytes().hex()
+        # Les statistiques du tour se déduisent des votes : elles ne sont pas sauvegardées
+        del etat["stats"]
+        return etat
+
+    def vers_registre(self):
+        """
+        @brief Exporte l'état complet d'une partie du registre, tour en cours compris.
+
+        @return Le dictionnaire de vers_sauvegarde() complété du mode de vote,
+            des bulletins du tour simultané, de l'échéance du tour, de la date
+            de dernière modification du backlog et des statistiques du tour.
+        """
+        etat = self.vers_sauvegarde()
+        etat["simultaneous"] = self.simultane
+        etat["bulletins"] = self.bulletins.tobytes().hex()
+        etat["echeance"] = self.echeance
+        etat["modified"] = self.features.modifiee
+        etat["stats"] = self.statistiques.vers_etat()
+        return etat
+
+    @property
+    def rules(self):
+        """
+        @brief Le nom de la règle de validation de la partie.
+        """
+        return self._rules
+
+    @rules.setter
+    def rules(self, rules):
+        # La règle est résolue une seule fois ; un nom inconnu n'est signalé qu'au premier tour évalué
+        self._rules = rules
+        self.regle = REGLES.get(rules)
+
+    @property
+    def terminee(self):
+        """
+        @brief Indique si toutes les fonctionnalités ont été chiffrées.
+        """
+        return self.current_feature_index >= len(self.features)
+
+    @property
+    def feature_courante_id(self):
+        """
+        @brief Identifiant de la fonctionnalité en cours de vote, ou None si la partie est terminée.
+        """
+        if self.terminee:
+            return None
+        return self.features.ids()[self.current_feature_index]
+
+    @property
+    def feature_courante(self):
+        """
+        @brief Titre de la fonctionnalité en cours de vote, ou None si la partie est terminée.
+        """
+        return self.features.titre(self.feature_courante_id)
+
+    @property
+    def results(self):
+        """
+        @brief Résultats des fonctionnalités déjà chiffrées (titre -> estimation).
+        """
+        return self.features.resultats()
+
+    @property
+    def statistiques(self):
+        """
+        @brief Les statistiques des votes du tour en cours (voir models.statistiques).
+        """
+        if self._stats is None:
+            votes = list(enumerate(self.liste_vote))
+            votes.extend((i, c) for i, c in enumerate(self.bulletins) if c != ABSENT)
+            self._stats = StatistiquesTour(votes)
+        return self._stats
+
+    @property
+    def joueur_courant(self):
+        """
+        @brief Le joueur dont c'est le tour de voter, ou None s'il n'y a aucun joueur.
+        """
+        if not self.players:
+            return None
+        return self.players[self.index_player % len(self.players)]
+
+    def jouer(self, valeur='interro'):
+        """
+        @brief Enregistre le vote du joueur courant et fait avancer la partie.
+
+        @param valeur La carte choisie ('interro' si le joueur n'a pas eu le temps de répondre).
+        @return Un tuple (issue, details) où issue est l'une des constantes ISSUE_* :
+            - ISSUE_VALIDE : details est la fonctionnalité chiffrée ;
+            - ISSUE_DEBAT : details contient 'feature', 'debate_players' et 'vote'
+              (joueurs appelés à débattre et leurs cartes), 'outliers' (joueurs
+              éloignés du mode), 'mode', 'spread' (écart) et 'convergence' ;
+            - sinon details vaut None.
+        @exception ValueError Si la carte est inconnue ou si la partie n'a aucun joueur.
+
+        @details
+        Lorsque tous les joueurs ont voté, le tour est évalué selon les règles :
+        café (pause), interro (discussion), résultat validé, ou débat entre les
+        joueurs aux votes extrêmes. Le premier vote reçu après un débat ou une
+        phase interro relance le tour au premier joueur sans être compté.
+        """
+        if self.terminee:
+            return (ISSUE_TERMINE, None)
+
+        # Si on revient de "interro" ou d'un débat, on repart du premier joueur
+        if self.revote:
+            self.revote = False
+            self.index_player = 0
+            return (ISSUE_SUIVANT, None)
+
+        if not self.players:
+            raise ValueError("La partie ne comporte aucun joueur.")
+        carte = encoder_carte(valeur)
+        self.index_player += 1
+        if self._stats is not None:
+            self._stats.ajouter(len(self.liste_vote), carte)
+        self.liste_vote.append(carte)
+
+        # Tant que tous les joueurs n'ont pas voté, on passe au suivant
+        if self.index_player % len(self.players) != 0:
+            return (ISSUE_SUIVANT, None)
+
+        return self.cloturer_tour()
+
+    def voter(self, joueur, valeur):
+        """
+        @brief Enregistre le vote d'un joueur en mode simultané.
+
+        @param joueur Le nom du joueur, ou son indice dans la liste des joueurs.
+        @param valeur La carte choisie.
+        @return Le même tuple (issue, details) que jouer() ; ISSUE_SUIVANT tant
+            que tous les joueurs n'ont pas voté.
+        @exception ValueError Si le joueur ou la carte est inconnu.
+
+        @details
+        Chaque joueur vote depuis son propre appareil, sans ordre de passage,
+        et peut changer de carte tant que le tour n'est pas clos. Le tour est
+        évalué dès que tous les joueurs ont voté.
+        """
+        if isinstance(joueur, int):
+            index = joueur
+        else:
+            index = self.players.index(joueur) if joueur in self.players else -1
+        if not 0 <= index < len(self.players):
+            raise ValueError(f"Joueur inconnu : {joueur!r}")
+        carte = encoder_carte(valeur)
+        if self.terminee:
+            return (ISSUE_TERMINE, None)
+
+        self.revote = False
+        self.simultane = True
+        if len(self.bulletins) != len(self.players):
+            self.bulletins = array('b', [ABSENT] * len(self.players))
+            self._stats = StatistiquesTour()
+        if self._stats is not None:
+            if self.bulletins[index] != ABSENT:
+                self._stats.retirer(index, self.bulletins[index])
+            self._stats.ajouter(index, carte)
+        self.bulletins[index] = carte
+        if ABSENT in self.bulletins:
+            return (ISSUE_SUIVANT, None)
+
+        self.liste_vote = self.bulletins
+        self.bulletins = array('b')
+        self.index_player = 0
+        return self.cloturer_tour()
+
+    def expirer_tour(self):
+        """
+        @brief Applique l'expiration du temps limite du tour en cours.
+
+        @return Le tuple (issue, details) décrit dans jouer().
+
+        @details
+        - En mode simultané, les joueurs n'ayant pas voté votent "interro"
+          et le tour est évalué.
+        - En mode tour par tour, le joueur courant vote "interro".
+        """
+        if self.terminee or not self.players:
+            return (ISSUE_TERMINE, None)
+        if not self.simultane:
+            return self.jouer(Carte.INTERRO)
+
+        self.revote = False
+        self.liste_vote = array('b', [Carte.INTERRO] * len(self.players))
+        for index, carte in enumerate(self.bulletins):
+            if carte != ABSENT:
+                self.liste_vote[index] = carte
+            elif self._stats is not None:
+                self._stats.ajouter(index, Carte.INTERRO)
+        if len(self.bulletins) != len(self.players):
+            self._stats = None
+        self.bulletins = array('b')
+        self.index_player = 0
+        return self.cloturer_tour()
+
+    @property
+    def nb_bulletins(self):
+        """
+        @brief Nombre de joueurs ayant déjà voté au tour simultané en cours.
+        """
+        return sum(1 for c in self.bulletins if c != ABSENT)
+
+    def cloturer_tour(self):
+        """
+        @brief Évalue le tour en cours à partir des votes de liste_vote.
+
+        @return Le tuple (issue, details) décrit dans jouer().
+        """
+        feature_id = self.feature_courante_id
+        # Seuls les tours évalués sur des cartes chiffrées sont comptés : une pause
+        # café ou une phase interro ne fait pas passer une règle au tour suivant
+        tour = self.features.historique(feature_id)['rounds'] + 1
+        resultat, chiffrage = valider_codes(self.liste_vote, self.regle or resoudre_regle(self.rules), tour)
+        if resultat:
+            votes = distribuer_votes(self.liste_vote)
+            self.liste_vote = array('b')
+            self._stats = StatistiquesTour()
+            self.index_player = 0
+            if chiffrage == Carte.CAFE:
+                return (ISSUE_PAUSE, None)
+            if chiffrage == Carte.INTERRO:
+                return (ISSUE_INTERRO, None)
+            self.features.compter_tour(feature_id)
+            feature = self.feature_courante
+            self.features.estimer(self.feature_courante_id, chiffrage.valeur, regle=self.rules, votes=votes)
+            self.current_feature_index += 1
+            return (ISSUE_VALIDE, feature)
+
+        # Aucun résultat majoritaire/unanime : débat entre les joueurs éloignés
+        # du mode et les votes extrêmes (voir StatistiquesTour.debat())
+        self.features.compter_tour(feature_id)
+        stats = self.statistiques
+        debat = stats.debat()
+        convergence = stats.convergence
+        details = {
+            'feature': self.feature_courante,
+            'debate_players': [self.players[joueur] for joueur, _ in debat],
+            'vote': [carte.valeur for _, carte in debat],
+            'outliers': [self.players[joueur] for joueur, _ in stats.ecartes()],
+            'mode': None if stats.mode is None else stats.mode.valeur,
+            'spread': stats.ecart,
+            'convergence': None if convergence is None else round(convergence, 2),
+        }
+        self.revote = True
+        self.liste_vote = array('b')
+        self._stats = StatistiquesTour()
+        return (ISSUE_DEBAT, details)
+
+    def relancer_interro(self):
+        """
+        @brief Prépare un nouveau tour après une phase de discussion "interro".
+        """
+        self.index_player = 0
+        self.revote = True
+
+    def resume(self):
+        """
+        @brief Résumé de la partie, sérialisable en JSON.
+        """
+        return {
+            "room_id": self.room_id,
+            "players": self.players,
+            "rules": self.rules,
+            "time_limit": self.time_limit,
+            "features": [{"id": i, "title": t} for i, t in self.features.items()],
+            "current_feature_id": self.feature_courante_id,
+            "current_feature": self.feature_courante,
+            "current_player": self.joueur_courant,
+            "nb_votes": len(self.liste_vote),
+            "nb_bulletins": self.nb_bulletins,
+            "simultaneous": self.simultane,
+            "results": self.results,
+        }
+
+
+class RoomRegistry:
+    """
+    @brief Registre des parties hébergées par le processus, indexées par identifiant.
+
+    @details
+    Chaque partie possède son propre verrou : des parties différentes progressent
+    en parallèle, seuls les votes d'une même partie sont sérialisés.
+    Les parties inactives sont retirées par purger().
+    """
+
+    # Les parties ne sont visibles que du processus courant
+    partage = False
+
+    def __init__(self, horloge=time.monotonic):
+        """
+        @param horloge Fonction renvoyant l'heure courante en secondes (remplaçable pour les tests).
+        """
+        self.horloge = horloge
+        self._rooms = {}
+        self._acces = {}   # room_id -> heure du dernier accès
+        self._lock = threading.Lock()
+
+    def creer(self, players, rules='majorite', time_limit=30, features=(), simultane=False):
+        """
+        @brief Crée une nouvelle partie.
+
+        @param simultane Si True, les joueurs votent en même temps (voir GameRoom.voter()).
+
+        @return La GameRoom créée, avec un identifiant aléatoire.
+        @exception ValueError Si les joueurs ou les règles sont invalides.
+        """
+        _verifier_parametres(players, rules)
+        with self._lock:
+            room_id = secrets.token_urlsafe(8)
+            while room_id in self._rooms:
+                room_id = secrets.token_urlsafe(8)
+            room = GameRoom(room_id, players, rules, time_limit, features)
+            room.simultane = simultane
+            self._rooms[room_id] = (room, threading.Lock())
+            self._acces[room_id] = self.horloge()
+        return room
+
+    @contextmanager
+    def ouvrir(self, room_id):
+        """
+        @brief Donne un accès exclusif à une partie le temps d'un bloc with.
+
+        @param room_id L'identifiant de la partie.
+        @exception KeyError Si la partie n'existe pas.
+        """
+        with self._lock:
+            room, verrou = self._rooms[room_id]
+        with verrou:
+            try:
+                yield room
+            finally:
+                self._acces[room_id] = self.horloge()
+
+    def supprimer(self, room_id):
+        """
+        @brief Supprime une partie du registre.
+        """
+        with self._lock:
+            self._rooms.pop(room_id, None)
+            self._acces.pop(room_id, None)
+
+    def purger(self, inactivite, inactivite_terminee):
+        """
+        @brief Retire les parties inactives du registre.
+
+        @param inactivite Délai (en secondes) sans accès après lequel une partie en cours est retirée.
+        @param inactivite_terminee Délai sans accès après lequel une partie terminée est retirée.
+        @return Les identifiants des parties retirées.
+
+        @details
+        Une partie dont le verrou est détenu (vote en cours) est conservée.
+        """
+        maintenant = self.horloge()
+        with self._lock:
+            candidates = list(self._rooms.items())
+        retirees = []
+        for room_id, (room, verrou) in candidates:
+            if not verrou.acquire(blocking=False):
+                continue
+            try:
+                limite = inactivite_terminee if room.terminee else inactivite
+                if maintenant - self._acces.get(room_id, maintenant) > limite:
+                    self.supprimer(room_id)
+                    retirees.append(room_id)
+            finally:
+                verrou.release()
+        return retirees
+
+    def nb_actives(self):
+        """
+        @brief Nombre de parties non terminées.
+        """
+        with self._lock:
+            rooms = [room for room, _ in self._rooms.values()]
+        return sum(1 for room in rooms if not room.terminee)
+
+    def __contains__(self, room_id):
+        return room_id in self._rooms
+
+    def __len__(self):
+        return len(self._rooms)
+
+
+
+class SQLiteRoomRegistry:
+    """
+    @brief Registre des parties stocké dans un fichier SQLite partagé entre processus.
+
+    @details
+    Même interface que RoomRegistry. Chaque accès à une partie ouvre une
+    transaction BEGIN IMMEDIATE : le verrou d'écriture de SQLite sérialise
+    les votes d'une même partie entre tous les threads et tous les processus
+    qui servent l'application. La partie est relue au début du bloc with et,
+    si elle a été modifiée, réécrite à la fin avec un numéro de version
+    incrémenté ; une exception dans le bloc annule ses modifications.
+    """
+
+    # Les parties sont visibles de tous les processus partageant le fichier
+    partage = True
+
+    def __init__(self, path):
+        """
+        @param path Chemin du fichier SQLite (son répertoire est créé au besoin).
+        """
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        connexion = self._connexion()
+        connexion.execute("PRAGMA journal_mode=WAL")
+        connexion.execute(
+            "CREATE TABLE IF NOT EXISTS rooms ("
+            "room_id TEXT PRIMARY KEY, etat TEXT NOT NULL, version INTEGER NOT NULL, "
+            "terminee INTEGER NOT NULL DEFAULT 0, modifiee REAL NOT NULL DEFAULT 0)"
+        )
+        colonnes = {ligne[1] for ligne in connexion.execute("PRAGMA table_info(rooms)")}
+        if 'modifiee' not in colonnes:
+            # Fichier créé par une version précédente : les parties existantes datent de maintenant
+            connexion.execute("ALTER TABLE rooms ADD COLUMN terminee INTEGER NOT NULL DEFAULT 0")
+            connexion.execute("ALTER TABLE rooms ADD COLUMN modifiee REAL NOT NULL DEFAULT 0")
+            connexion.execute("UPDATE rooms SET modifiee = ?", (time.time(),))
+
+    def _connexion(self):
+        # Une connexion par thread : une transaction ouverte n'est jamais partagée
+        connexion = getattr(self._local, 'connexion', None)
+        if connexion is None:
+            connexion = self._local.connexion = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        return connexion
+
+    def creer(self, players, rules='majorite', time_limit=30, features=(), simultane=False):
+        """
+        @brief Crée une nouvelle partie (voir RoomRegistry.creer()).
+        """
+        _verifier_parametres(players, rules)
+        connexion = self._connexion()
+        while True:
+            room = GameRoom(secrets.token_urlsafe(8), players, rules, time_limit, features)
+            room.simultane = simultane
+            try:
+                connexion.execute("INSERT INTO rooms (room_id, etat, version, terminee, modifiee) "
+                                  "VALUES (?, ?, 0, ?, ?)",
+                                  (room.room_id, json.dumps(room.vers_registre()), room.terminee, time.time()))
+                return room
+            except sqlite3.IntegrityError:
+                continue  # Identifiant déjà attribué
+
+    @contextmanager
+    def ouvrir(self, room_id):
+        """
+        @brief Donne un accès exclusif à une partie le temps d'un bloc with.
+
+        @param room_id L'identifiant de la partie.
+        @exception KeyError Si la partie n'existe pas.
+        """
+        connexion = self._connexion()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            ligne = connexion.execute("SELECT etat FROM rooms WHERE room_id = ?", (room_id,)).fetchone()
+            if ligne is None:
+                raise KeyError(room_id)
+            room = GameRoom.depuis_etat(json.loads(ligne[0]), room_id)
+            yield room
+            etat = json.dumps(room.vers_registre())
+            if etat != ligne[0]:
+                connexion.execute("UPDATE rooms SET etat = ?, version = version + 1, terminee = ?, modifiee = ? "
+                                  "WHERE room_id = ?", (etat, room.terminee, time.time(), room_id))
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        connexion.execute("COMMIT")
+
+    def version(self, room_id):
+        """
+        @brief Numéro de version d'une partie, incrémenté à chaque modification.
+
+        @return La version, ou None si la partie n'existe pas.
+        """
+        ligne = self._connexion().execute("SELECT version FROM rooms WHERE room_id = ?", (room_id,)).fetchone()
+        return None if ligne is None else ligne[0]
+
+    def supprimer(self, room_id):
+        """
+        @brief Supprime une partie du registre.
+        """
+        self._connexion().execute("DELETE FROM rooms WHERE room_id = ?", (room_id,))
+
+    def purger(self, inactivite, inactivite_terminee):
+        """
+        @brief Retire les parties inactives du registre (voir RoomRegistry.purger()).
+
+        @details
+        L'inactivité est mesurée depuis la dernière modification de la partie,
+        quel que soit le processus qui l'a faite.
+        """
+        maintenant = time.time()
+        connexion = self._connexion()
+        connexion.execute("BEGIN IMMEDIATE")
+        try:
+            condition = "WHERE modifiee < ? OR (terminee AND modifiee < ?)"
+            limites = (maintenant - inactivite, maintenant - inactivite_terminee)
+            retirees = [ligne[0] for ligne in connexion.execute("SELECT room_id FROM rooms " + condition, limites)]
+            connexion.execute("DELETE FROM rooms " + condition, limites)
+        except BaseException:
+            connexion.execute("ROLLBACK")
+            raise
+        connexion.execute("COMMIT")
+        return retirees
+
+    def nb_actives(self):
+        """
+        @brief Nombre de parties non terminées.
+        """
+        return self._connexion().execute("SELECT COUNT(*) FROM rooms WHERE NOT terminee").fetchone()[0]
+
+    def __contains__(self, room_id):
+        return self.version(room_id) is not None
+
+    def __len__(self):
+        return self._connexion().execute("SELECT COUNT(*) FROM rooms").fetchone()[0]
+
+
+def creer_registre(config, repertoire_instance):
+    """
+    @brief Construit le registre des parties décrit par la configuration.
+
+    @param config La configuration de l'application :
+        - ROOM_BACKEND : 'memory' (par défaut) ou 'sqlite' (plusieurs processus) ;
+        - ROOM_SQLITE_PATH : fichier utilisé par le registre 'sqlite'.
+    @param repertoire_instance Le répertoire d'instance de l'application (emplacement par défaut du fichier SQLite).
+    @return Un RoomRegistry ou un SQLiteRoomRegistry.
+    @exception ValueError Si le type de registre est inconnu.
+    """
+    backend = config.get('ROOM_BACKEND', 'memory')
+    if backend == 'memory':
+        return RoomRegistry()
+    if backend == 'sqlite':
+        return SQLiteRoomRegistry(config.get('ROOM_SQLITE_PATH', os.path.join(repertoire_instance, 'rooms.sqlite3')))
+    raise ValueError(f"Registre de parties inconnu : '{backend}'. Valeurs possibles : memory, sqlite")
+
+
+def _verifier_parametres(players, rules):
+    if not players:
+        raise ValueError("La partie doit comporter au moins un joueur.")
+    if rules not in REGLES:
+        raise ValueError(f"Type de vote non supporté : '{rules}'. Types valides : {LISTE_TYPE_VOTE}")
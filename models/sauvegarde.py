@@ -0,0 +1,390 @@
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from itertools import accumulate
+
+from models.cartes import VALEURS_CARTES
+from models.features import FeatureCollection
+
+# Signature des sauvegardes binaires et version du format
+# (version 1 : état complet en JSON suivi des votes, encore lisible)
+MAGIC = b'CAPI'
+VERSION = 2
+
+FORMAT_JSON = 'json'
+FORMAT_BINAIRE = 'binaire'
+
+# Extension et type MIME de chaque format
+EXTENSIONS = {FORMAT_JSON: '.json', FORMAT_BINAIRE: '.capi'}
+MIMETYPES = {FORMAT_JSON: 'application/json', FORMAT_BINAIRE: 'application/octet-stream'}
+
+# MAGIC (4 octets), version (1 octet), longueur de l'en-tête (4 octets, little-endian)
+_PREAMBULE = struct.Struct('<4sBI')
+# Longueur d'une section, devant son contenu
+_LONGUEUR = struct.Struct('<I')
+
+# Entiers de 4 octets des colonnes (identifiants, longueurs, tours, répartitions)
+_ENTIER = 'I' if array('I').itemsize == 4 else 'L'
+# Estimation absente, ou qui n'est pas une carte du jeu (conservée dans l'en-tête)
+SANS_ESTIMATION = 0xFF
+AUTRE_ESTIMATION = 0xFE
+# Fonctionnalité chiffrée sans répartition des votes
+SANS_REPARTITION = 0xFFFFFFFF
+
+# Code de chaque estimation possible, et de chaque carte d'une répartition des votes
+_CODES_ESTIMATION = {valeur: code for code, valeur in enumerate(VALEURS_CARTES)}
+_CODES_ESTIMATION[None] = SANS_ESTIMATION
+_CODES_REPARTITION = {str(valeur): code for code, valeur in enumerate(VALEURS_CARTES)}
+_NB_CARTES = len(VALEURS_CARTES)
+# Valeur de chaque code d'estimation, et carte de chaque compteur d'une répartition
+_VALEURS_ESTIMATION = list(VALEURS_CARTES) + [None] * (256 - _NB_CARTES)
+_CARTES_REPARTITION = [str(valeur) for valeur in VALEURS_CARTES]
+
+# Nombre de sections d'un enregistrement, et des premières lues par l'aperçu
+_NB_SECTIONS = 9
+_NB_SECTIONS_APERCU = 3
+# Clés de l'en-tête propres au format binaire, absentes de l'état décodé
+_CLES_FORMAT = ('nb_features', 'regles_historique', 'autres_estimations', 'autres_historiques')
+
+
+def encoder_binaire(etat):
+    """
+    @brief Encode une partie au format de sauvegarde binaire.
+
+    @param etat L'état de la partie au format des sauvegardes JSON (GameRoom.vers_sauvegarde()).
+    @return Les octets de la sauvegarde.
+
+    @details
+    Disposition d'un enregistrement :
+    - MAGIC, version et longueur de l'en-tête ;
+    - l'en-tête : les métadonnées de la partie en JSON compact (joueurs, règles,
+      fonctionnalité en cours, nombre de fonctionnalités, tables des règles
+      appliquées...), sans les fonctionnalités ni les votes ;
+    - les sections, chacune précédée de sa longueur (4 octets), dans l'ordre :
+      longueurs des titres (en caractères), titres en UTF-8 à la suite,
+      estimations (un code de carte par fonctionnalité), identifiants, nombres
+      de tours, règles appliquées (index dans l'en-tête), répartitions des
+      votes (index dans la table suivante), table des répartitions distinctes
+      (un compteur de 2 octets par carte), puis les votes du tour en cours,
+      un octet par carte (voir models.cartes).
+    Les entiers sont en little-endian. L'aperçu ne lit que les trois premières
+    sections ; une estimation ou un historique qui ne s'exprime pas en cartes
+    du jeu est conservé tel quel dans l'en-tête. Les enregistrements se
+    suffisent à eux-mêmes : une archive de plusieurs parties est la simple
+    concaténation de leurs sauvegardes.
+    """
+    entete = {cle: valeur for cle, valeur in etat.items() if cle not in ('features', 'results', 'liste_vote')}
+    features = etat.get('features') or []
+    resultats = etat.get('results') or {}
+    titres = [feature['title'] for feature in features]
+
+    estimations = array('B', [_CODES_ESTIMATION.get(resultats.get(titre), AUTRE_ESTIMATION) for titre in titres])
+    autres_estimations = {}
+    if AUTRE_ESTIMATION in estimations or not all(type(v) in (int, str) for v in resultats.values()):
+        for i, titre in enumerate(titres):
+            estimation = resultats.get(titre)
+            # 3.0 ou True valent une carte sans en être une : conservés tels quels
+            if estimations[i] == AUTRE_ESTIMATION or (estimation is not None
+                                                      and type(estimation) not in (int, str)):
+                estimations[i] = AUTRE_ESTIMATION
+                autres_estimations[i] = estimation
+
+    # Historiques : règles et répartitions distinctes, référencées par leur index
+    regles = {}
+    repartitions = {}
+    autres_historiques = {}
+    tours = []
+    index_regles = []
+    index_repartitions = []
+    for i, feature in enumerate(features):
+        historique = feature.get('history')
+        nb_tours, regle, repartition = 0, 0, SANS_REPARTITION
+        if historique:
+            try:
+                votes = historique['votes']
+                if votes is not None:
+                    cle = tuple(votes.items())
+                    repartition = repartitions.get(cle)
+                    if repartition is None:
+                        _verifier_repartition(votes)
+                        repartition = repartitions[cle] = len(repartitions)
+                regle = regles.setdefault(historique['rule'], len(regles))
+                nb_tours = historique['rounds']
+                if len(historique) != 3 or type(nb_tours) is not int or not 0 < nb_tours < SANS_REPARTITION \
+                        or regle > 0xFF:
+                    raise ValueError
+            except (AttributeError, KeyError, TypeError, ValueError):
+                # Historique qui ne s'exprime pas en cartes du jeu : conservé tel quel
+                nb_tours, regle, repartition = 0, 0, SANS_REPARTITION
+                autres_historiques[i] = historique
+        tours.append(nb_tours)
+        index_regles.append(regle)
+        index_repartitions.append(repartition)
+    table = array('H', bytes(2 * _NB_CARTES * len(repartitions)))
+    for index, votes in enumerate(repartitions):
+        for carte, nombre in votes:
+            table[index * _NB_CARTES + _CODES_REPARTITION[carte]] = nombre
+
+    entete['nb_features'] = len(titres)
+    entete['regles_historique'] = list(regles)
+    if autres_estimations:
+        entete['autres_estimations'] = autres_estimations
+    if autres_historiques:
+        entete['autres_historiques'] = autres_historiques
+    entete = json.dumps(entete, separators=(',', ':')).encode('utf-8')
+
+    sections = (
+        _en_octets(array(_ENTIER, map(len, titres))),
+        ''.join(titres).encode('utf-8', 'surrogatepass'),
+        estimations.tobytes(),
+        _en_octets(array(_ENTIER, [feature['id'] for feature in features])),
+        _en_octets(array(_ENTIER, tours)),
+        bytes(index_regles),
+        _en_octets(array(_ENTIER, index_repartitions)),
+        _en_octets(table),
+        bytes.fromhex(etat.get('liste_vote', '') or ''),
+    )
+    morceaux = [_PREAMBULE.pack(MAGIC, VERSION, len(entete)), entete]
+    for section in sections:
+        morceaux += (_LONGUEUR.pack(len(section)), section)
+    return b''.join(morceaux)
+
+
+def encoder_sauvegarde(etat, format_sauvegarde=FORMAT_JSON):
+    """
+    @brief Encode une partie au format demandé.
+
+    @param etat L'état de la partie au format des sauvegardes JSON.
+    @param format_sauvegarde FORMAT_JSON ou FORMAT_BINAIRE.
+    @return Les octets de la sauvegarde.
+    @exception ValueError Si le format est inconnu.
+    """
+    if format_sauvegarde == FORMAT_JSON:
+        return json.dumps(etat).encode('utf-8')
+    if format_sauvegarde == FORMAT_BINAIRE:
+        return encoder_binaire(etat)
+    raise ValueError(f"Format de sauvegarde inconnu : {format_sauvegarde!r}")
+
+
+def detecter_format(donnees):
+    """
+    @brief Détecte le format d'une sauvegarde d'après ses premiers octets.
+    """
+    return FORMAT_BINAIRE if donnees[:len(MAGIC)] == MAGIC else FORMAT_JSON
+
+
+def decoder_sauvegarde(donnees):
+    """
+    @brief Décode une sauvegarde JSON ou binaire (format détecté automatiquement).
+
+    @param donnees Les octets de la sauvegarde (bytes, memoryview ou mmap).
+    @return L'état de la partie, utilisable par GameRoom.depuis_etat().
+        Les fonctionnalités d'une sauvegarde binaire sont renvoyées sous forme
+        de FeatureCollection (estimations et historiques compris), ses votes
+        sous forme d'octets.
+    @exception ValueError Si la sauvegarde est mal formée.
+    """
+    if detecter_format(donnees) == FORMAT_JSON:
+        return json.loads(bytes(donnees).decode('utf-8-sig'))
+    etat, _ = _lire_enregistrement(donnees, 0, complet=True)
+    return etat
+
+
+def lire_apercu(source):
+    """
+    @brief Lit l'aperçu d'une sauvegarde : joueurs, règles, titres des fonctionnalités et résultats.
+
+    @param source Le chemin d'un fichier, ou un flux binaire.
+    @return L'en-tête de la première partie, avec 'features' (les titres) et
+        'results' (titre -> estimation), sans les votes.
+    @exception ValueError Si la sauvegarde est mal formée.
+
+    @details
+    Pour une sauvegarde binaire, seuls le préambule, l'en-tête et les sections
+    des titres et des estimations sont lus : les identifiants, les historiques
+    et les votes ne sont jamais chargés. Une sauvegarde JSON doit être lue en entier.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as f:
+            return lire_apercu(f)
+    debut = source.read(_PREAMBULE.size)
+    if detecter_format(debut) == FORMAT_JSON:
+        etat = decoder_sauvegarde(debut + source.read())
+        etat.pop('liste_vote', None)
+        return etat
+    if len(debut) < _PREAMBULE.size:
+        raise ValueError("Sauvegarde binaire tronquée.")
+    _, version, longueur = _PREAMBULE.unpack(debut)
+    _verifier_version(version)
+    entete = json.loads(_lire_exactement(source, longueur).decode('utf-8'))
+    if version == 1:
+        return entete
+    sections = [_lire_exactement(source, _LONGUEUR.unpack(_lire_exactement(source, _LONGUEUR.size))[0])
+                for _ in range(_NB_SECTIONS_APERCU)]
+    return _apercu(entete, *sections)
+
+
+def iterer_archive(chemin, avec_votes=False):
+    """
+    @brief Parcourt une archive de sauvegardes binaires concaténées.
+
+    @param chemin Le chemin de l'archive.
+    @param avec_votes Si False, seul l'aperçu de chaque partie est décodé (voir
+        lire_apercu()) : identifiants, historiques et votes sont sautés.
+    @return Un générateur des états des parties, dans l'ordre de l'archive.
+    @exception ValueError Si un enregistrement est mal formé.
+
+    @details
+    L'archive est projetée en mémoire (mmap) : seules les pages réellement
+    lues sont chargées depuis le disque.
+    """
+    with open(chemin, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as donnees:
+            position = 0
+            while position < len(donnees):
+                etat, position = _lire_enregistrement(donnees, position, avec_votes)
+                yield etat
+
+
+def _lire_enregistrement(donnees, position, complet):
+    if len(donnees) - position < _PREAMBULE.size:
+        raise ValueError("Sauvegarde binaire tronquée.")
+    magic, version, longueur = _PREAMBULE.unpack_from(donnees, position)
+    if magic != MAGIC:
+        raise ValueError("Signature de sauvegarde binaire invalide.")
+    _verifier_version(version)
+    position += _PREAMBULE.size
+    if position + longueur > len(donnees):
+        raise ValueError("Sauvegarde binaire tronquée.")
+    entete = json.loads(bytes(donnees[position:position + longueur]).decode('utf-8'))
+    position += longueur
+
+    # Position et longueur de chaque section ; seules celles utilisées sont copiées
+    sections = []
+    for _ in range(_NB_SECTIONS if version > 1 else 1):
+        if position + _LONGUEUR.size > len(donnees):
+            raise ValueError("Sauvegarde binaire tronquée.")
+        taille, = _LONGUEUR.unpack_from(donnees, position)
+        position += _LONGUEUR.size
+        if position + taille > len(donnees):
+            raise ValueError("Sauvegarde binaire tronquée.")
+        sections.append((position, taille))
+        position += taille
+
+    lire = [lambda debut=debut, taille=taille: bytes(donnees[debut:debut + taille]) for debut, taille in sections]
+    if version == 1:
+        if complet:
+            entete['liste_vote'] = lire[0]()
+        return entete, position
+    if not complet:
+        return _apercu(entete, *(section() for section in lire[:_NB_SECTIONS_APERCU])), position
+    return _etat_complet(entete, *(section() for section in lire)), position
+
+
+def _apercu(entete, longueurs, texte, estimations):
+    titres = _decoder_titres(entete, longueurs, texte)
+    estimations = _decoder_estimations(entete, estimations, len(titres))
+    for cle in _CLES_FORMAT:
+        entete.pop(cle, None)
+    entete['features'] = titres
+    entete['results'] = {titre: estimation for titre, estimation in zip(titres, estimations)
+                         if estimation is not None}
+    return entete
+
+
+def _etat_complet(entete, longueurs, texte, estimations, ids, tours, index_regles, index_repartitions, table,
+                  votes):
+    titres = _decoder_titres(entete, longueurs, texte)
+    nb_features = len(titres)
+    estimations = _decoder_estimations(entete, estimations, nb_features)
+    ids = _depuis_octets(_ENTIER, ids)
+    tours = _depuis_octets(_ENTIER, tours)
+    index_repartitions = _depuis_octets(_ENTIER, index_repartitions)
+    table = _depuis_octets('H', table)
+    if not len(ids) == len(tours) == len(index_regles) == len(index_repartitions) == nb_features:
+        raise ValueError("Sauvegarde binaire corrompue.")
+
+    repartitions = [{carte: nombre for carte, nombre in zip(_CARTES_REPARTITION, table[debut:debut + _NB_CARTES])
+                     if nombre}
+                    for debut in range(0, len(table), _NB_CARTES)]
+    regles = entete.pop('regles_historique', [])
+    historiques = {}
+    try:
+        for feature_id, nb_tours, regle, repartition in zip(ids, tours, index_regles, index_repartitions):
+            if nb_tours:
+                historiques[feature_id] = {
+                    'rounds': nb_tours, 'rule': regles[regle],
+                    'votes': None if repartition == SANS_REPARTITION else dict(repartitions[repartition]),
+                }
+        for i, historique in entete.pop('autres_historiques', {}).items():
+            historiques[ids[int(i)]] = historique
+    except IndexError:
+        raise ValueError("Sauvegarde binaire corrompue.") from None
+
+    for cle in _CLES_FORMAT:
+        entete.pop(cle, None)
+    entete['features'] = FeatureCollection.depuis_colonnes(ids, titres, estimations, historiques)
+    entete['liste_vote'] = votes
+    return entete
+
+
+def _decoder_titres(entete, longueurs, texte):
+    # Les longueurs sont en caractères : le texte n'est décodé qu'une fois, puis découpé
+    bornes = list(accumulate(_depuis_octets(_ENTIER, longueurs), initial=0))
+    texte = texte.decode('utf-8', 'surrogatepass')
+    if bornes[-1] != len(texte) or len(bornes) - 1 != entete.get('nb_features'):
+        raise ValueError("Sauvegarde binaire corrompue.")
+    return [texte[debut:fin] for debut, fin in zip(bornes, bornes[1:])]
+
+
+def _decoder_estimations(entete, codes, nb_features):
+    if len(codes) != nb_features:
+        raise ValueError("Sauvegarde binaire corrompue.")
+    estimations = [_VALEURS_ESTIMATION[code] for code in codes]
+    try:
+        for i, estimation in entete.get('autres_estimations', {}).items():
+            estimations[int(i)] = estimation
+    except IndexError:
+        raise ValueError("Sauvegarde binaire corrompue.") from None
+    return estimations
+
+
+def _verifier_repartition(votes):
+    # Une répartition s'encode si chaque carte est du jeu et chaque compteur tient sur 2 octets
+    for carte, nombre in votes.items():
+        if carte not in _CODES_REPARTITION or type(nombre) is not int or not 0 < nombre <= 0xFFFF:
+            raise ValueError(f"Répartition non encodable : {votes!r}")
+
+
+def _en_octets(tableau):
+    # Colonne d'entiers en little-endian, quel que soit le processeur
+    if sys.byteorder == 'big' and tableau.itemsize > 1:
+        tableau.byteswap()
+    return tableau.tobytes()
+
+
+def _depuis_octets(typecode, octets):
+    tableau = array(typecode)
+    if len(octets) % tableau.itemsize:
+        raise ValueError("Sauvegarde binaire corrompue.")
+    tableau.frombytes(octets)
+    if sys.byteorder == 'big' and tableau.itemsize > 1:
+        tableau.byteswap()
+    return tableau
+
+
+def _lire_exactement(source, taille):
+    donnees = source.read(taille)
+    if len(donnees) < taille:
+        raise ValueError("Sauvegarde binaire tronquée.")
+    return donnees
+
+
+def _verifier_version(version):
+    if version > VERSION:
+        raise ValueError(f"Version de sauvegarde non prise en charge : {version}")
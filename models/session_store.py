@@ -0,0 +1,312 @@
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+
+from flask.json.tag import JSONTag, TaggedJSONSerializer
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+from models.features import FeatureCollection
+
+
+class TagFeatureCollection(JSONTag):
+    """
+    @brief Sérialisation d'une FeatureCollection dans la session (cookie ou SQLite).
+
+    @details
+    Le backlog est accompagné de sa date de dernière modification ; les
+    sessions plus anciennes (liste seule) restent lisibles.
+    """
+    __slots__ = ()
+    key = ' fc'
+
+    def check(self, value):
+        return isinstance(value, FeatureCollection)
+
+    def to_json(self, value):
+        return {'features': value.vers_liste(), 'modified': value.modifiee}
+
+    def to_python(self, value):
+        if not isinstance(value, dict):
+            return FeatureCollection.depuis(value)
+        collection = FeatureCollection.depuis(value['features'])
+        collection.modifiee = value['modified']
+        return collection
+
+
+def creer_serialiseur():
+    """
+    @brief Construit le sérialiseur JSON étiqueté des sessions, qui gère les FeatureCollection.
+
+    @return Un TaggedJSONSerializer propre à l'appelant : le sérialiseur global
+        de Flask (session_json_serializer) n'est pas modifié.
+    """
+    serialiseur = TaggedJSONSerializer()
+    serialiseur.register(TagFeatureCollection, index=0)
+    return serialiseur
+
+
+def copier_donnees(donnees):
+    """
+    @brief Copie les données d'une session pour une requête.
+
+    @details
+    Le dictionnaire et ses valeurs modifiables en place (FeatureCollection,
+    votes encodés, listes et dictionnaires) sont copiés ; les valeurs
+    immuables (chaînes, nombres, octets) sont partagées.
+
+    @param donnees Les données de la session.
+    @return Un nouveau dictionnaire.
+    """
+    copie = {}
+    for cle, valeur in donnees.items():
+        if isinstance(valeur, FeatureCollection):
+            valeur = valeur.copie()
+        elif isinstance(valeur, array):
+            valeur = array(valeur.typecode, valeur)
+        elif isinstance(valeur, (list, dict)):
+            valeur = valeur.copy()
+        copie[cle] = valeur
+    return copie
+
+
+class MemorySessionStore:
+    """
+    @brief Stockage des sessions en mémoire, avec éviction LRU et durée de vie.
+
+    @details
+    Les données sont conservées sans sérialisation. Chaque lecture renvoie une
+    copie (voir copier_donnees()) : deux requêtes simultanées d'une même session
+    ne modifient jamais le même backlog ni les mêmes votes, la dernière
+    enregistrée l'emporte comme avec les autres stockages. Au-delà de
+    max_entries sessions, la moins récemment utilisée est supprimée.
+    """
+
+    def __init__(self, max_entries=10000, ttl=3600, horloge=time.monotonic):
+        """
+        @param max_entries Nombre maximal de sessions conservées.
+        @param ttl Durée de vie d'une session inactive, en secondes.
+        @param horloge Fonction renvoyant l'heure courante (remplaçable pour les tests).
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.horloge = horloge
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, sid):
+        """
+        @brief Renvoie une copie des données d'une session, ou None si elle est absente ou expirée.
+        Une session lue voit son expiration repoussée.
+        """
+        with self._lock:
+            entree = self._sessions.get(sid)
+            if entree is None:
+                return None
+            expiration, donnees = entree
+            maintenant = self.horloge()
+            if expiration < maintenant:
+                del self._sessions[sid]
+                return None
+            self._sessions[sid] = (maintenant + self.ttl, donnees)
+            self._sessions.move_to_end(sid)
+        return copier_donnees(donnees)
+
+    def set(self, sid, donnees):
+        """
+        @brief Enregistre les données d'une session et repousse son expiration.
+        """
+        with self._lock:
+            self._sessions[sid] = (self.horloge() + self.ttl, donnees)
+            self._sessions.move_to_end(sid)
+            while len(self._sessions) > self.max_entries:
+                self._sessions.popitem(last=False)
+
+    def delete(self, sid):
+        """
+        @brief Supprime une session.
+        """
+        with self._lock:
+            self._sessions.pop(sid, None)
+
+    def __len__(self):
+        return len(self._sessions)
+
+
+class SQLiteSessionStore:
+    """
+    @brief Stockage des sessions dans un fichier SQLite.
+
+    @details
+    Les données sont sérialisées avec un sérialiseur JSON étiqueté de Flask
+    (qui gère notamment les octets des votes encodés, voir creer_serialiseur()).
+    Le fichier peut être partagé entre plusieurs processus.
+    """
+
+    # Nombre d'écritures entre deux purges des sessions expirées
+    PURGE_PERIODE = 500
+
+    def __init__(self, path, ttl=3600, horloge=time.time, serialiseur=None):
+        """
+        @param path Chemin du fichier SQLite (son répertoire est créé au besoin).
+        @param ttl Durée de vie d'une session inactive, en secondes.
+        @param horloge Fonction renvoyant l'heure courante (remplaçable pour les tests).
+        @param serialiseur Le sérialiseur des données (par défaut : creer_serialiseur()).
+        """
+        self.path = path
+        self.ttl = ttl
+        self.horloge = horloge
+        self.serialiseur = serialiseur or creer_serialiseur()
+        self._lock = threading.Lock()
+        self._ecritures = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._connexion = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connexion.execute("PRAGMA journal_mode=WAL")
+        self._connexion.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            "sid TEXT PRIMARY KEY, donnees TEXT NOT NULL, expiration REAL NOT NULL)"
+        )
+
+    def get(self, sid):
+        """
+        @brief Renvoie les données d'une session, ou None si elle est absente ou expirée.
+        Comme en mémoire, une session lue voit son expiration repoussée ; pour ne pas
+        écrire dans le fichier à chaque lecture, elle ne l'est qu'une fois écoulé un
+        dixième de sa durée de vie depuis la dernière écriture.
+        """
+        maintenant = self.horloge()
+        with self._lock:
+            ligne = self._connexion.execute(
+                "SELECT donnees, expiration FROM sessions WHERE sid = ? AND expiration >= ?",
+                (sid, maintenant)
+            ).fetchone()
+            if ligne is not None and ligne[1] < maintenant + self.ttl * 0.9:
+                self._connexion.execute(
+                    "UPDATE sessions SET expiration = ? WHERE sid = ?", (maintenant + self.ttl, sid)
+                )
+        if ligne is None:
+            return None
+        return self.serialiseur.loads(ligne[0])
+
+    def set(self, sid, donnees):
+        """
+        @brief Enregistre les données d'une session et repousse son expiration.
+        """
+        texte = self.serialiseur.dumps(dict(donnees))
+        maintenant = self.horloge()
+        with self._lock:
+            self._connexion.execute(
+                "INSERT OR REPLACE INTO sessions (sid, donnees, expiration) VALUES (?, ?, ?)",
+                (sid, texte, maintenant + self.ttl)
+            )
+            self._ecritures += 1
+            if self._ecritures % self.PURGE_PERIODE == 0:
+                self._connexion.execute("DELETE FROM sessions WHERE expiration < ?", (maintenant,))
+
+    def delete(self, sid):
+        """
+        @brief Supprime une session.
+        """
+        with self._lock:
+            self._connexion.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def __len__(self):
+        with self._lock:
+            return self._connexion.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """
+    @brief Session Flask dont les données restent côté serveur.
+    """
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    @brief Interface de session Flask reposant sur un stockage côté serveur.
+
+    @details
+    Le cookie ne contient qu'un identifiant opaque et aléatoire : sa taille et
+    son coût de signature restent constants quelle que soit la taille de la partie.
+    """
+
+    def __init__(self, store):
+        """
+        @param store Le stockage des sessions (MemorySessionStore ou SQLiteSessionStore).
+        """
+        self.store = store
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            donnees = self.store.get(sid)
+            if donnees is not None:
+                return ServerSideSession(donnees, sid=sid)
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        nom = self.get_cookie_name(app)
+        domaine = self.get_cookie_domain(app)
+        chemin = self.get_cookie_path(app)
+
+        if not session:
+            if session.modified:
+                self.store.delete(session.sid)
+                response.delete_cookie(nom, domain=domaine, path=chemin)
+            return
+
+        if not session.modified and not self.should_set_cookie(app, session):
+            return
+
+        self.store.set(session.sid, dict(session))
+        response.set_cookie(
+            nom,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domaine,
+            path=chemin,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app),
+        )
+
+
+def creer_session_interface(config, repertoire_instance):
+    """
+    @brief Construit l'interface de session décrite par la configuration.
+
+    @param config La configuration de l'application :
+        - SESSION_BACKEND : 'memory' (par défaut), 'sqlite' ou 'cookie' ;
+        - SESSION_SQLITE_PATH : fichier utilisé par le stockage 'sqlite' ;
+        - SESSION_MAX_ENTRIES : nombre maximal de sessions en mémoire ;
+        - PERMANENT_SESSION_LIFETIME : durée de vie des sessions.
+    @param repertoire_instance Le répertoire d'instance de l'application (emplacement par défaut du fichier SQLite).
+    @return L'interface de session ('cookie' : le cookie signé de Flask, avec son propre sérialiseur).
+    """
+    backend = config.get('SESSION_BACKEND', 'memory')
+    ttl = config['PERMANENT_SESSION_LIFETIME'].total_seconds()
+    if backend == 'memory':
+        store = MemorySessionStore(max_entries=config.get('SESSION_MAX_ENTRIES', 10000), ttl=ttl)
+    elif backend == 'sqlite':
+        store = SQLiteSessionStore(config.get('SESSION_SQLITE_PATH',
+                                              os.path.join(repertoire_instance, 'sessions.sqlite3')), ttl=ttl)
+    elif backend == 'cookie':
+        interface = SecureCookieSessionInterface()
+        interface.serializer = creer_serialiseur()
+        return interface
+    else:
+        raise ValueError(f"Stockage de session inconnu : '{backend}'. Valeurs possibles : memory, sqlite, cookie")
+    return ServerSideSessionInterface(store)
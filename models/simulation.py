@@ -0,0 +1,322 @@
+"""
+@brief Simulation de Monte-Carlo du déroulement des votes, pour comparer les règles de validation.
+
+@details
+Des équipes virtuelles chiffrent un grand nombre de fonctionnalités en suivant
+le déroulement d'une partie (voir GameRoom.cloturer_tour()) : un tour est
+évalué par la règle, une pause café ou une discussion "interro" relance le
+tour, un désaccord provoque un débat puis un nouveau vote. Après chaque débat
+ou discussion, les joueurs se rapprochent de l'estimation juste.
+
+Les fonctionnalités sont réparties en lots entre plusieurs processus. Chaque lot
+a sa propre graine, qui ne dépend que de son numéro : le résultat ne dépend pas
+du nombre de processus, et toutes les règles sont simulées sur les mêmes
+fonctionnalités et les mêmes tirages, ce qui rend leur comparaison plus précise.
+
+Exemple : python -m models.simulation --features 200000 --joueurs realiste:4 optimiste:1
+"""
+import argparse
+import math
+import random
+import sys
+from bisect import bisect
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from models.cartes import Carte, VALEURS_CARTES
+from models.game import LISTE_TYPE_VOTE, valider_codes
+
+# Profils de vote d'un joueur : décalage moyen (biais) et écart type (dispersion) de son
+# estimation par rapport à la carte juste, en nombre de cartes ; probabilités de jouer café ou interro
+PROFILS = {
+    'precis': {'biais': 0.0, 'dispersion': 0.4, 'cafe': 0.0, 'interro': 0.01},
+    'realiste': {'biais': 0.0, 'dispersion': 1.0, 'cafe': 0.02, 'interro': 0.03},
+    'optimiste': {'biais': -1.0, 'dispersion': 1.0, 'cafe': 0.02, 'interro': 0.03},
+    'pessimiste': {'biais': 1.0, 'dispersion': 1.0, 'cafe': 0.02, 'interro': 0.03},
+    'disperse': {'biais': 0.0, 'dispersion': 2.0, 'cafe': 0.05, 'interro': 0.05},
+}
+
+# Nombre de cartes chiffrées ; les cartes justes sont tirées parmi elles
+NB_CHIFFREES = int(Carte.CAFE)
+DERNIERE_CARTE = int(Carte.INTERRO)
+
+# Compteurs cumulés par lot, puis par règle
+COMPTEURS = ('features', 'tours', 'tours_carres', 'consensus', 'debats', 'pauses', 'interros',
+             'ecart_cartes', 'ecart_absolu', 'ecart_relatif')
+
+
+def _normale(x):
+    # Fonction de répartition de la loi normale centrée réduite
+    return 0.5 * (1 + math.erf(x / math.sqrt(2)))
+
+
+def repartition(profil, carte_juste, discussions, convergence):
+    """
+    @brief Répartition cumulée des cartes jouées par un joueur.
+
+    @param profil Le profil du joueur (voir PROFILS).
+    @param carte_juste Le code de la carte juste de la fonctionnalité.
+    @param discussions Le nombre de débats et discussions déjà tenus sur la fonctionnalité.
+    @param convergence La part du biais et de la dispersion effacée par chaque débat (entre 0 et 1).
+    @return La liste des probabilités cumulées des codes de cartes 0 à Carte.INTERRO.
+
+    @details
+    L'estimation chiffrée suit une loi normale discrétisée autour de la carte
+    juste, décalée du biais du joueur ; les cartes hors du jeu sont ramenées
+    aux cartes extrêmes.
+    """
+    attenuation = (1 - convergence) ** discussions
+    centre = carte_juste + profil['biais'] * attenuation
+    dispersion = profil['dispersion'] * attenuation
+    chiffree = 1 - profil['cafe'] - profil['interro']
+    probabilites = []
+    for code in range(NB_CHIFFREES):
+        bas = -math.inf if code == 0 else code - 0.5
+        haut = math.inf if code == NB_CHIFFREES - 1 else code + 0.5
+        if dispersion > 0:
+            p = _normale((haut - centre) / dispersion) - _normale((bas - centre) / dispersion)
+        else:
+            p = 1.0 if bas <= centre < haut else 0.0
+        probabilites.append(p * chiffree)
+    probabilites += [profil['cafe'], profil['interro']]
+    cumul, total = [], 0.0
+    for p in probabilites:
+        total += p
+        cumul.append(total)
+    return cumul
+
+
+@lru_cache(maxsize=1 << 16)
+def evaluer(regle, votes, tour):
+    """
+    @brief Évalue un tour de vote avec la règle de la partie (voir models.game.valider_codes()).
+
+    @param regle Le nom de la règle.
+    @param votes Les codes des cartes jouées, triés.
+    @param tour Le numéro du tour de vote de la fonctionnalité.
+    @return Le tuple (resultat, carte) de valider_codes().
+
+    @details
+    Une équipe ne peut jouer qu'un nombre limité de combinaisons de cartes :
+    les évaluations sont mises en cache, par processus.
+    """
+    return valider_codes(votes, regle, tour)
+
+
+def simuler_lot(regle, joueurs, nb_features, graine, convergence=0.5, max_tours=10):
+    """
+    @brief Simule le chiffrage d'un lot de fonctionnalités par une équipe.
+
+    @param regle Le nom de la règle de validation (voir LISTE_TYPE_VOTE).
+    @param joueurs Les profils des joueurs (voir PROFILS).
+    @param nb_features Le nombre de fonctionnalités du lot.
+    @param graine La graine du générateur aléatoire du lot.
+    @param convergence Voir repartition().
+    @param max_tours Nombre de tours au-delà duquel une fonctionnalité est abandonnée.
+    @return Un dictionnaire des compteurs (voir COMPTEURS).
+    """
+    aleatoire = random.Random(graine)
+    tirer = aleatoire.random
+    # Répartitions des joueurs, calculées à la première utilisation : (carte juste, discussions) -> une par joueur
+    repartitions = {}
+    compteurs = dict.fromkeys(COMPTEURS, 0)
+    compteurs['features'] = nb_features
+
+    for _ in range(nb_features):
+        carte_juste = aleatoire.randrange(NB_CHIFFREES)
+        discussions = 0
+        for tour in range(1, max_tours + 1):
+            cumuls = repartitions.get((carte_juste, discussions))
+            if cumuls is None:
+                cumuls = repartitions[carte_juste, discussions] = [
+                    repartition(profil, carte_juste, discussions, convergence) for profil in joueurs]
+            votes = sorted([min(bisect(cumul, tirer() * cumul[-1]), DERNIERE_CARTE) for cumul in cumuls])
+            resultat, carte = evaluer(regle, tuple(votes), tour)
+            if not resultat:
+                compteurs['debats'] += 1
+                discussions += 1
+            elif carte == Carte.CAFE:
+                compteurs['pauses'] += 1
+            elif carte == Carte.INTERRO:
+                compteurs['interros'] += 1
+                discussions += 1
+            else:
+                compteurs['consensus'] += 1
+                compteurs['tours'] += tour
+                compteurs['tours_carres'] += tour * tour
+                compteurs['ecart_cartes'] += carte - carte_juste
+                compteurs['ecart_absolu'] += abs(carte - carte_juste)
+                compteurs['ecart_relatif'] += VALEURS_CARTES[carte] / VALEURS_CARTES[carte_juste] - 1
+                break
+    return compteurs
+
+
+def _simuler_lot(arguments):
+    # Point d'entrée des processus : les arguments sont regroupés pour ProcessPoolExecutor.map()
+    return arguments[0], simuler_lot(*arguments)
+
+
+def simuler(regles=None, joueurs=('realiste',) * 5, nb_features=100000, convergence=0.5, max_tours=10,
+            graine=0, processus=None, taille_lot=5000):
+    """
+    @brief Compare des règles de validation sur un grand nombre de fonctionnalités simulées.
+
+    @param regles Les noms des règles à comparer (toutes les règles enregistrées par défaut).
+    @param joueurs Les profils des joueurs : noms de PROFILS ou dictionnaires de même forme.
+    @param nb_features Le nombre de fonctionnalités chiffrées par règle.
+    @param convergence Voir repartition().
+    @param max_tours Voir simuler_lot().
+    @param graine La graine de la simulation.
+    @param processus Le nombre de processus (par défaut : un par cœur ; 1 : dans le processus courant).
+    @param taille_lot Le nombre de fonctionnalités simulées par tâche.
+    @return Un dictionnaire règle -> statistiques (voir statistiques()).
+    @exception ValueError Si une règle ou un profil est inconnu.
+    """
+    regles = list(regles or LISTE_TYPE_VOTE)
+    inconnues = [r for r in regles if r not in LISTE_TYPE_VOTE]
+    if inconnues:
+        raise ValueError(f"Règle inconnue : {', '.join(inconnues)}. Règles valides : {LISTE_TYPE_VOTE}")
+    joueurs = tuple(lire_profil(j) for j in joueurs)
+    if not joueurs:
+        raise ValueError("L'équipe doit compter au moins un joueur.")
+
+    taches = []
+    for numero, debut in enumerate(range(0, nb_features, taille_lot)):
+        taille = min(taille_lot, nb_features - debut)
+        # La graine d'un lot ne dépend que de son numéro : mêmes tirages pour toutes les règles
+        graine_lot = graine * 1_000_003 + numero
+        taches.extend((regle, joueurs, taille, graine_lot, convergence, max_tours) for regle in regles)
+
+    totaux = {regle: dict.fromkeys(COMPTEURS, 0) for regle in regles}
+    if processus == 1 or len(taches) == 1:
+        resultats = map(_simuler_lot, taches)
+        return _cumuler(totaux, resultats)
+    with ProcessPoolExecutor(max_workers=processus) as executeur:
+        return _cumuler(totaux, executeur.map(_simuler_lot, taches))
+
+
+def _cumuler(totaux, resultats):
+    for regle, compteurs in resultats:
+        for nom, valeur in compteurs.items():
+            totaux[regle][nom] += valeur
+    return {regle: statistiques(compteurs) for regle, compteurs in totaux.items()}
+
+
+def lire_profil(profil):
+    """
+    @brief Profil de vote désigné par son nom (voir PROFILS), ou donné tel quel.
+
+    @exception ValueError Si le profil est inconnu ou incomplet.
+    """
+    if isinstance(profil, dict):
+        manquantes = {'biais', 'dispersion', 'cafe', 'interro'} - set(profil)
+        if manquantes:
+            raise ValueError(f"Profil incomplet, clés manquantes : {', '.join(sorted(manquantes))}")
+        return profil
+    try:
+        return PROFILS[profil]
+    except KeyError:
+        raise ValueError(f"Profil inconnu : '{profil}'. Profils valides : {', '.join(PROFILS)}") from None
+
+
+def statistiques(compteurs):
+    """
+    @brief Statistiques d'une règle à partir des compteurs cumulés de ses lots.
+
+    @return Un dictionnaire :
+        - 'features' : nombre de fonctionnalités simulées ;
+        - 'tours_moyens' et 'tours_ecart_type' : tours nécessaires pour chiffrer une fonctionnalité ;
+        - 'abandons' : part des fonctionnalités non chiffrées en max_tours tours ;
+        - 'debats_par_feature' et 'taux_debat' : débats par fonctionnalité et par tour joué ;
+        - 'pauses_par_feature', 'interros_par_feature' ;
+        - 'biais_cartes' : écart moyen (en cartes) entre l'estimation retenue et la carte juste ;
+        - 'erreur_cartes' : écart absolu moyen (en cartes) ;
+        - 'biais_relatif' : écart relatif moyen entre la valeur retenue et la valeur juste.
+    """
+    features, consensus = compteurs['features'], compteurs['consensus']
+    tours_joues = compteurs['debats'] + compteurs['pauses'] + compteurs['interros'] + consensus
+    moyenne = compteurs['tours'] / consensus if consensus else None
+    return {
+        'features': features,
+        'tours_moyens': moyenne,
+        'tours_ecart_type': (math.sqrt(max(0.0, compteurs['tours_carres'] / consensus - moyenne ** 2))
+                             if consensus else None),
+        'abandons': (features - consensus) / features if features else 0.0,
+        'debats_par_feature': compteurs['debats'] / features if features else 0.0,
+        'taux_debat': compteurs['debats'] / tours_joues if tours_joues else 0.0,
+        'pauses_par_feature': compteurs['pauses'] / features if features else 0.0,
+        'interros_par_feature': compteurs['interros'] / features if features else 0.0,
+        'biais_cartes': compteurs['ecart_cartes'] / consensus if consensus else None,
+        'erreur_cartes': compteurs['ecart_absolu'] / consensus if consensus else None,
+        'biais_relatif': compteurs['ecart_relatif'] / consensus if consensus else None,
+    }
+
+
+def formater_rapport(resultats):
+    """
+    @brief Met en forme les statistiques de simuler(), de la règle la plus rapide à la plus lente.
+    """
+    def cle(regle):
+        stats = resultats[regle]
+        # Les abandons comptent comme des fonctionnalités jamais chiffrées
+        return (stats['abandons'], stats['tours_moyens'] or math.inf)
+
+    def nombre(valeur, format_):
+        return '-' if valeur is None else format(valeur, format_)
+
+    entete = (f"{'règle':<24}{'tours':>8}{'σ':>7}{'abandons':>10}{'débats/f':>10}{'%débat':>8}"
+              f"{'biais':>8}{'|écart|':>9}{'biais %':>9}")
+    lignes = [entete, '-' * len(entete)]
+    for regle in sorted(resultats, key=cle):
+        s = resultats[regle]
+        lignes.append(f"{regle:<24}{nombre(s['tours_moyens'], '.3f'):>8}{nombre(s['tours_ecart_type'], '.2f'):>7}"
+                      f"{s['abandons']:>10.2%}{s['debats_par_feature']:>10.3f}{s['taux_debat']:>8.1%}"
+                      f"{nombre(s['biais_cartes'], '+.3f'):>8}{nombre(s['erreur_cartes'], '.3f'):>9}"
+                      f"{nombre(s['biais_relatif'] and 100 * s['biais_relatif'], '+.1f'):>9}")
+    if resultats:
+        lignes.append(f"\nRègle la plus rapide : {min(resultats, key=cle)}")
+    return '\n'.join(lignes)
+
+
+def lire_equipe(specifications):
+    """
+    @brief Construit l'équipe décrite en ligne de commande ("realiste:4 optimiste:1" : profil:nombre).
+    """
+    joueurs = []
+    for specification in specifications:
+        nom, _, nombre = specification.partition(':')
+        joueurs.extend([lire_profil(nom)] * int(nombre or 1))
+    return joueurs
+
+
+def main(arguments=None):
+    """
+    @brief Lance la simulation décrite par la ligne de commande et affiche le rapport.
+
+    @return Le code de sortie du programme.
+    """
+    parser = argparse.ArgumentParser(prog='python -m models.simulation', description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--regles', nargs='*', default=None, metavar='regle',
+                        help=f"Règles comparées parmi {', '.join(LISTE_TYPE_VOTE)} (toutes par défaut).")
+    parser.add_argument('--joueurs', nargs='*', default=['realiste:5'], metavar='profil:nombre',
+                        help=f"Composition de l'équipe, profils parmi {', '.join(PROFILS)} (défaut : realiste:5).")
+    parser.add_argument('--features', type=int, default=100000, help="Fonctionnalités chiffrées par règle.")
+    parser.add_argument('--convergence', type=float, default=0.5,
+                        help="Part du biais et de la dispersion effacée par chaque débat (défaut : 0.5).")
+    parser.add_argument('--max-tours', type=int, default=10, help="Tours avant abandon d'une fonctionnalité.")
+    parser.add_argument('--processus', type=int, default=None, help="Nombre de processus (défaut : un par cœur).")
+    parser.add_argument('--lot', type=int, default=5000, help="Fonctionnalités simulées par tâche.")
+    parser.add_argument('--graine', type=int, default=0)
+    options = parser.parse_args(arguments)
+    try:
+        resultats = simuler(options.regles, lire_equipe(options.joueurs), options.features, options.convergence,
+                            options.max_tours, options.graine, options.processus, options.lot)
+    except ValueError as e:
+        parser.error(str(e))
+    print(formater_rapport(resultats))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,182 @@
+from models.cartes import Carte, VALEURS_CARTES
+
+# Nombre de cartes chiffrées (codes 0 à Carte.CAFE - 1)
+NB_CHIFFREES = int(Carte.CAFE)
+
+
+class StatistiquesTour:
+    """
+    @brief Statistiques des votes d'un tour, tenues à jour vote par vote.
+
+    @details
+    Le jeu de cartes étant fixe, chaque carte a son compteur et l'ensemble des
+    joueurs qui l'ont jouée. Les cartes extrêmes et la carte la plus jouée (le
+    mode) sont mises à jour à chaque vote ; un retrait (changement de carte en
+    vote simultané) ne demande au pire qu'un parcours des neuf cartes chiffrées.
+    À la clôture du tour, l'écart, la convergence et les joueurs à faire débattre
+    sont ainsi obtenus sans reparcourir les votes.
+
+    Seules les cartes chiffrées comptent pour le mode, l'écart et la convergence.
+
+    Une partie relue à chaque requête (session, registre SQLite) conserve ces
+    statistiques dans son état (vers_etat()) : elles sont rechargées telles
+    quelles, sans rejouer les votes. Le rechargement reste proportionnel au
+    nombre de votes, comme la lecture des votes eux-mêmes.
+    """
+    __slots__ = ('_comptes', '_joueurs', '_nb_chiffres', '_min', '_max', '_mode')
+
+    def __init__(self, votes=()):
+        """
+        @param votes Les votes déjà reçus : un itérable de couples (indice du joueur, code de la carte).
+        """
+        self._comptes = [0] * len(Carte)
+        # Joueurs de chaque carte (dictionnaire utilisé comme ensemble ordonné)
+        self._joueurs = [{} for _ in Carte]
+        self._nb_chiffres = 0
+        self._min = self._max = self._mode = None
+        for joueur, code in votes:
+            self.ajouter(joueur, code)
+
+    @classmethod
+    def depuis_etat(cls, joueurs):
+        """
+        @brief Recharge des statistiques exportées par vers_etat().
+
+        @param joueurs Pour chaque carte, les indices des joueurs l'ayant jouée, dans l'ordre de leur vote.
+        @return Les StatistiquesTour correspondantes.
+        """
+        stats = cls()
+        for code, detenteurs in enumerate(joueurs):
+            stats._joueurs[code] = dict.fromkeys(detenteurs)
+            stats._comptes[code] = len(stats._joueurs[code])
+        stats._nb_chiffres = sum(stats._comptes[:NB_CHIFFREES])
+        stats._rechercher_extremes()
+        return stats
+
+    def vers_etat(self):
+        """
+        @brief Exporte les statistiques sous une forme sérialisable en JSON.
+
+        @return Une liste donnant, pour chaque carte, les indices des joueurs l'ayant jouée.
+        """
+        return [list(detenteurs) for detenteurs in self._joueurs]
+
+    def __len__(self):
+        return sum(self._comptes)
+
+    def ajouter(self, joueur, code):
+        """
+        @brief Prend en compte le vote d'un joueur.
+
+        @param joueur L'indice du joueur.
+        @param code Le code de la carte jouée (voir models.cartes.Carte).
+        """
+        self._comptes[code] += 1
+        self._joueurs[code][joueur] = None
+        if code >= NB_CHIFFREES:
+            return
+        self._nb_chiffres += 1
+        if self._min is None or code < self._min:
+            self._min = code
+        if self._max is None or code > self._max:
+            self._max = code
+        if self._mode is None or (self._comptes[code], -code) > (self._comptes[self._mode], -self._mode):
+            self._mode = code
+
+    def retirer(self, joueur, code):
+        """
+        @brief Retire le vote d'un joueur (changement de carte).
+
+        @param joueur L'indice du joueur.
+        @param code Le code de la carte qu'il avait jouée.
+        """
+        self._comptes[code] -= 1
+        del self._joueurs[code][joueur]
+        if code >= NB_CHIFFREES:
+            return
+        self._nb_chiffres -= 1
+        if self._comptes[code] == 0 or code == self._mode:
+            self._rechercher_extremes()
+
+    def _rechercher_extremes(self):
+        jouees = [code for code in range(NB_CHIFFREES) if self._comptes[code]]
+        if not jouees:
+            self._min = self._max = self._mode = None
+            return
+        self._min, self._max = jouees[0], jouees[-1]
+        # À égalité, le mode est la plus petite carte
+        self._mode = max(jouees, key=lambda code: (self._comptes[code], -code))
+
+    @property
+    def mode(self):
+        """
+        @brief La carte chiffrée la plus jouée (la plus petite en cas d'égalité), ou None.
+        """
+        return None if self._mode is None else Carte(self._mode)
+
+    @property
+    def ecart(self):
+        """
+        @brief Écart entre les valeurs des cartes chiffrées extrêmes, ou None.
+        """
+        if self._min is None:
+            return None
+        return VALEURS_CARTES[self._max] - VALEURS_CARTES[self._min]
+
+    @property
+    def convergence(self):
+        """
+        @brief Part des votes chiffrés à au plus une carte du mode (entre 0 et 1), ou None.
+        """
+        if not self._nb_chiffres:
+            return None
+        voisines = range(max(0, self._mode - 1), min(NB_CHIFFREES, self._mode + 2))
+        proches = sum(self._comptes[code] for code in voisines)
+        return proches / self._nb_chiffres
+
+    def detenteurs(self, code):
+        """
+        @brief Les indices des joueurs ayant joué une carte, dans l'ordre de leur vote.
+        """
+        return list(self._joueurs[code])
+
+    def ecartes(self):
+        """
+        @brief Les votes chiffrés à plus d'une carte du mode.
+
+        @return Une liste de couples (indice du joueur, carte), par carte croissante.
+        """
+        if self._mode is None:
+            return []
+        return [(joueur, Carte(code))
+                for code in range(NB_CHIFFREES) if abs(code - self._mode) > 1
+                for joueur in self._joueurs[code]]
+
+    def debat(self):
+        """
+        @brief Les joueurs appelés à expliquer leur vote lors d'un débat.
+
+        @return Une liste de couples (indice du joueur, carte), par carte croissante.
+
+        @details
+        Débattent tous les joueurs éloignés du mode, ceux ayant joué les cartes
+        extrêmes, un joueur ayant voté le mode, qui défend l'avis majoritaire,
+        et ceux n'ayant pas chiffré ("cafe", "interro"). Sans vote chiffré, le
+        débat oppose le premier joueur de la plus petite et de la plus grande
+        carte jouée.
+        """
+        if self._mode is None:
+            jouees = [code for code in range(len(Carte)) if self._comptes[code]]
+            if not jouees:
+                return []
+            extremes = dict.fromkeys((jouees[0], jouees[-1]))
+            return [(next(iter(self._joueurs[code])), Carte(code)) for code in extremes]
+        debat = []
+        for code in range(self._min, self._max + 1):
+            if code == self._mode:
+                debat.append((next(iter(self._joueurs[code])), Carte(code)))
+            elif code in (self._min, self._max) or abs(code - self._mode) > 1:
+                debat.extend((joueur, Carte(code)) for joueur in self._joueurs[code])
+        for code in range(NB_CHIFFREES, len(Carte)):
+            debat.extend((joueur, Carte(code)) for joueur in self._joueurs[code])
+        return debat
@@ -0,0 +1,224 @@
+import heapq
+import itertools
+import math
+import re
+import secrets
+import threading
+import unicodedata
+from collections import Counter, OrderedDict
+
+# Taille des n-grammes de caractères indexés
+TAILLE_NGRAMME = 3
+
+# Nombre maximal d'entrées des listes inversées parcourues pour trouver les candidates
+BUDGET_RECHERCHE = 10000
+# Nombre de candidates dont le score est calculé sur tous les n-grammes de la requête
+NB_CANDIDATES = 200
+# Nombre d'estimations ajoutées par prise du verrou lors d'un chargement en masse
+TAILLE_LOT_CHARGEMENT = 1000
+
+_MOTS = re.compile(r'\w+')
+
+
+def normaliser(titre):
+    """
+    @brief Met un titre sous forme canonique : minuscules, sans accents ni ponctuation.
+    """
+    texte = titre.lower()
+    if not texte.isascii():
+        texte = unicodedata.normalize('NFKD', texte)
+        texte = ''.join(c for c in texte if not unicodedata.combining(c))
+    return ' '.join(_MOTS.findall(texte))
+
+
+def ngrammes(titre_normalise, taille=TAILLE_NGRAMME):
+    """
+    @brief Décompte des n-grammes de caractères des mots d'un titre normalisé.
+
+    @details
+    Chaque mot est encadré d'espaces avant découpage : " login " donne
+    " lo", "log", "ogi", "gin", "in ". Les n-grammes rendent la recherche
+    tolérante aux fautes de frappe et aux variations de forme (pluriel, accord).
+    """
+    decompte = Counter()
+    for mot in titre_normalise.split():
+        mot = f" {mot} "
+        for i in range(max(1, len(mot) - taille + 1)):
+            decompte[mot[i:i + taille]] += 1
+    return decompte
+
+
+class IndexSimilarite:
+    """
+    @brief Index inversé TF-IDF des fonctionnalités déjà chiffrées, pour suggérer des estimations.
+
+    @details
+    Chaque titre distinct (après normalisation) est un document, associé à la
+    répartition des estimations qu'il a reçues. L'index associe à chaque
+    n-gramme la liste des documents qui le contiennent, avec leur fréquence :
+    une recherche parcourt les listes des n-grammes de la requête en commençant
+    par les plus rares, dans la limite de BUDGET_RECHERCHE entrées, puis
+    calcule le score complet des NB_CANDIDATES meilleures candidates. Le
+    coût d'une recherche est ainsi borné quelle que soit la taille de
+    l'historique. Le score est la similarité cosinus des vecteurs TF-IDF ;
+    les normes des documents sont recalculées chaque fois que le nombre de
+    documents a doublé, l'IDF évoluant avec l'historique.
+
+    L'index est construit au fil des résultats (ajouter()). Les dernières
+    recherches sont gardées dans un cache LRU, invalidé par chaque ajout.
+    """
+
+    def __init__(self, taille_cache=1024, score_min=0.3):
+        """
+        @param taille_cache Nombre de recherches gardées en cache.
+        @param score_min Score minimal (entre 0 et 1) d'une suggestion.
+        """
+        self.taille_cache = taille_cache
+        self.score_min = score_min
+        self._documents = []       # [titre, estimations (Counter), norme]
+        self._par_titre = {}       # titre normalisé -> numéro du document
+        self._postings = {}        # n-gramme -> {numéro du document: fréquence}
+        self._cache = OrderedDict()
+        self._version = 0
+        self._jeton = secrets.token_hex(4)  # Distingue les versions d'index de processus différents
+        self._taille_normes = 0    # Nombre de documents au dernier calcul des normes
+        self._lock = threading.Lock()
+
+    def ajouter(self, titre, estimation):
+        """
+        @brief Ajoute une estimation validée à l'index.
+
+        @param titre Le titre de la fonctionnalité.
+        @param estimation L'estimation retenue.
+        """
+        with self._lock:
+            self._ajouter(titre, estimation)
+            if len(self._documents) >= 2 * self._taille_normes:
+                self._recalculer_normes()
+            self._version += 1
+
+    def suggerer(self, titre, nombre=3):
+        """
+        @brief Estimations passées des fonctionnalités les plus proches d'un titre.
+
+        @param titre Le titre de la fonctionnalité proposée.
+        @param nombre Nombre maximal de suggestions.
+        @return Une liste de dictionnaires {'feature', 'estimate', 'count', 'score'},
+            du plus proche au moins proche : 'estimate' est l'estimation la plus
+            fréquente de la fonctionnalité, 'count' le nombre d'estimations.
+        """
+        cle = normaliser(titre)
+        with self._lock:
+            entree = (cle, nombre, self._version)
+            resultat = self._cache.get(entree)
+            if resultat is not None:
+                self._cache.move_to_end(entree)
+                return resultat
+            resultat = self._rechercher(cle, nombre)
+            self._cache[entree] = resultat
+            if len(self._cache) > self.taille_cache:
+                self._cache.popitem(last=False)
+            return resultat
+
+    def charger(self, estimations):
+        """
+        @brief Ajoute en masse des estimations (historique des parties).
+
+        @param estimations Un itérable de couples (titre, estimation).
+        @return Le nombre d'estimations ajoutées.
+
+        @details
+        Les normes des documents ne sont calculées qu'une fois, à la fin du
+        chargement ; d'ici là, celle d'une candidate est calculée à la recherche.
+        """
+        total = 0
+        estimations = iter(estimations)
+        while True:
+            # Le verrou est relâché entre deux lots : les recherches restent possibles pendant le chargement
+            lot = list(itertools.islice(estimations, TAILLE_LOT_CHARGEMENT))
+            with self._lock:
+                for titre, estimation in lot:
+                    if estimation is not None and self._ajouter(titre, estimation, calculer_norme=False):
+                        total += 1
+                if not lot:
+                    self._recalculer_normes()
+                self._version += 1
+            if not lot:
+                return total
+
+    @property
+    def version(self):
+        """
+        @brief Version de l'index, qui change à chaque ajout (propre à cet index).
+        """
+        return f"{self._jeton}.{self._version}"
+
+    def __len__(self):
+        return len(self._documents)
+
+    def _ajouter(self, titre, estimation, calculer_norme=True):
+        # Appelée avec le verrou détenu ; renvoie False pour un titre vide
+        cle = normaliser(titre)
+        if not cle:
+            return False
+        numero = self._par_titre.get(cle)
+        if numero is None:
+            numero = len(self._documents)
+            grammes = ngrammes(cle)
+            for gramme, frequence in grammes.items():
+                self._postings.setdefault(gramme, {})[numero] = frequence
+            self._documents.append([titre, Counter(), self._norme(grammes) if calculer_norme else 0.0])
+            self._par_titre[cle] = numero
+        self._documents[numero][1][estimation] += 1
+        return True
+
+    def _idf(self, gramme):
+        return math.log((1 + len(self._documents)) / (1 + len(self._postings.get(gramme, ())))) + 1
+
+    def _norme(self, grammes):
+        return math.sqrt(sum((f * self._idf(g)) ** 2 for g, f in grammes.items()))
+
+    def _recalculer_normes(self):
+        carres = [0.0] * len(self._documents)
+        for gramme, postings in self._postings.items():
+            idf = self._idf(gramme)
+            for numero, frequence in postings.items():
+                carres[numero] += (frequence * idf) ** 2
+        for document, carre in zip(self._documents, carres):
+            document[2] = math.sqrt(carre)
+        self._taille_normes = len(self._documents)
+
+    def _rechercher(self, cle, nombre):
+        # Appelée avec le verrou détenu
+        grammes = ngrammes(cle)
+        poids = {g: f * self._idf(g) ** 2 for g, f in grammes.items() if g in self._postings}
+        if not poids:
+            return []
+        # Candidates : les n-grammes les plus rares d'abord, dans la limite du budget
+        scores = {}
+        lire = scores.get
+        parcourues = 0
+        for gramme in sorted(poids, key=lambda g: len(self._postings[g])):
+            postings = self._postings[gramme]
+            if parcourues and parcourues + len(postings) > BUDGET_RECHERCHE:
+                break
+            parcourues += len(postings)
+            p = poids[gramme]
+            for numero, frequence in postings.items():
+                scores[numero] = lire(numero, 0.0) + p * frequence
+        # Score complet des meilleures candidates, sur tous les n-grammes de la requête
+        norme_requete = self._norme(grammes)
+        complets = []
+        for _, numero in heapq.nlargest(NB_CANDIDATES, ((score, numero) for numero, score in scores.items())):
+            titre, _, norme = self._documents[numero]
+            produit = sum(p * self._postings[g].get(numero, 0) for g, p in poids.items())
+            norme = norme or self._norme(ngrammes(normaliser(titre)))
+            complets.append((produit / (norme * norme_requete), numero))
+        resultat = []
+        for score, numero in heapq.nlargest(nombre, complets):
+            if score < self.score_min:
+                break
+            titre, estimations, _ = self._documents[numero]
+            resultat.append({'feature': titre, 'estimate': estimations.most_common(1)[0][0],
+                             'count': sum(estimations.values()), 'score': round(min(score, 1.0), 3)})
+        return resultat
@@ -0,0 +1,125 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class RoundScheduler:
+    """
+    @brief Échéancier des tours de vote, côté serveur.
+
+    @details
+    Toutes les échéances sont rangées dans un tas (heapq) et surveillées par un
+    unique thread : des milliers de tours peuvent être chronométrés sans créer
+    un thread par tour. Replanifier ou annuler une échéance est en O(log n) :
+    l'ancienne entrée reste dans le tas et est ignorée lorsqu'elle en sort.
+    """
+
+    def __init__(self, callback, horloge=time.monotonic, automatique=True):
+        """
+        @param callback Fonction appelée avec la clé (identifiant de partie) d'une échéance dépassée.
+        @param horloge Fonction renvoyant l'heure courante (remplaçable pour les tests).
+        @param automatique Si True, un thread de fond déclenche les échéances ;
+            sinon elles sont déclenchées par executer_echeances().
+        """
+        self.callback = callback
+        self.horloge = horloge
+        self.automatique = automatique
+        self._tas = []
+        self._echeances = {}
+        self._compteur = itertools.count()
+        self._condition = threading.Condition()
+        self._thread = None
+        self._arret = False
+
+    def planifier(self, cle, delai, remplacer=True):
+        """
+        @brief Programme l'échéance d'une partie.
+
+        @param cle L'identifiant de la partie.
+        @param delai Le délai avant l'échéance, en secondes.
+        @param remplacer Si False, une échéance déjà programmée pour cette clé est conservée.
+        """
+        with self._condition:
+            if not remplacer and cle in self._echeances:
+                return
+            echeance = (self.horloge() + delai, next(self._compteur))
+            self._echeances[cle] = echeance
+            heapq.heappush(self._tas, (echeance, cle))
+            if self.automatique and self._thread is None:
+                self._demarrer()
+            # Réveille le thread si cette échéance devient la plus proche
+            if self._tas[0][0] == echeance:
+                self._condition.notify()
+
+    def annuler(self, cle):
+        """
+        @brief Annule l'échéance d'une partie, si elle existe.
+        """
+        with self._condition:
+            self._echeances.pop(cle, None)
+
+    def echeance(self, cle):
+        """
+        @brief Temps restant avant l'échéance d'une partie, ou None si aucune n'est programmée.
+        """
+        with self._condition:
+            echeance = self._echeances.get(cle)
+            if echeance is None:
+                return None
+            return max(0.0, echeance[0] - self.horloge())
+
+    def executer_echeances(self):
+        """
+        @brief Déclenche toutes les échéances dépassées.
+
+        @return Le nombre d'échéances déclenchées.
+        """
+        dues = []
+        with self._condition:
+            maintenant = self.horloge()
+            while self._tas and self._tas[0][0][0] <= maintenant:
+                echeance, cle = heapq.heappop(self._tas)
+                # Entrée périmée : l'échéance a été replanifiée ou annulée
+                if self._echeances.get(cle) == echeance:
+                    del self._echeances[cle]
+                    dues.append(cle)
+        for cle in dues:
+            try:
+                self.callback(cle)
+            except Exception:
+                logger.exception("Erreur lors de l'expiration du tour de la partie %s", cle)
+        return len(dues)
+
+    def arreter(self):
+        """
+        @brief Arrête le thread de fond.
+        """
+        with self._condition:
+            self._arret = True
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __len__(self):
+        return len(self._echeances)
+
+    def _demarrer(self):
+        self._arret = False
+        self._thread = threading.Thread(target=self._boucle, name="round-scheduler", daemon=True)
+        self._thread.start()
+
+    def _boucle(self):
+        while True:
+            with self._condition:
+                if self._arret:
+                    return
+                attente = self._tas[0][0][0] - self.horloge() if self._tas else None
+                if attente is None or attente > 0:
+                    self._condition.wait(attente)
+                    continue
+            self.executer_echeances()
@@ -0,0 +1,242 @@
+"""
+@brief Point d'entrée de production : plusieurs processus et threads, sans mode debug.
+
+@details
+Le processus principal ouvre la socket d'écoute puis crée 'workers' processus
+qui acceptent tous les connexions sur cette même socket. Chaque processus
+sert les requêtes avec un thread par requête.
+
+Avec plusieurs processus, les sessions et les parties /rooms/<room_id> sont
+partagées dans des fichiers SQLite (CAPI_SESSION_BACKEND=sqlite et
+CAPI_ROOM_BACKEND=sqlite, sauf configuration explicite), et les journaux des
+parties sont verrouillés par fichier : plusieurs processus peuvent servir la
+même partie.
+
+Les métriques de /metrics restent propres à chaque processus : une requête
+n'expose que celles du processus qui la sert. Elles portent alors une
+étiquette 'pid' (CAPI_METRICS_PID=true) ; pour une vue d'ensemble, chaque
+processus doit être interrogé et les séries additionnées (sum without (pid)).
+
+Exemple : CAPI_SECRET_KEY=... python serve.py --workers 4 --port 8000
+
+À la réception de SIGTERM ou SIGINT, les processus cessent d'accepter de
+nouvelles connexions, ferment les flux SSE ouverts, terminent les requêtes en
+cours puis s'arrêtent ; un processus dont les requêtes ne sont pas terminées
+après --delai-arret secondes s'arrête sans elles (avec plusieurs processus,
+le processus principal tue en outre ceux qui ne se sont pas arrêtés).
+Un processus qui s'arrête de façon inattendue est relancé.
+"""
+import argparse
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+
+from werkzeug.serving import make_server
+
+
+def configurer_environnement(workers):
+    """
+    @brief Choisit les stockages partagés, et l'étiquette 'pid' des métriques, lorsque plusieurs processus servent l'application.
+
+    @param workers Le nombre de processus.
+
+    @details
+    Doit être appelée avant l'import de l'application, qui lit sa
+    configuration dans les variables d'environnement CAPI_*. Une valeur
+    déjà définie n'est jamais remplacée.
+    """
+    if workers > 1:
+        os.environ.setdefault('CAPI_SESSION_BACKEND', 'sqlite')
+        os.environ.setdefault('CAPI_ROOM_BACKEND', 'sqlite')
+        os.environ.setdefault('CAPI_METRICS_PID', 'true')
+
+
+def ouvrir_socket(host, port, backlog=128):
+    """
+    @brief Ouvre la socket d'écoute partagée par tous les processus.
+
+    @return La socket, héritable par les processus fils.
+    """
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE)
+    famille, type_socket, proto, _, adresse = infos[0]
+    sock = socket.socket(famille, type_socket, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(adresse)
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def servir(sock, threads=True, delai_arret=10.0):
+    """
+    @brief Sert l'application sur une socket déjà ouverte, jusqu'à SIGTERM ou SIGINT.
+
+    @param sock La socket d'écoute.
+    @param threads Si True, chaque requête est traitée dans son propre thread.
+    @param delai_arret Délai (en secondes) accordé aux requêtes en cours à l'arrêt.
+
+    @details
+    À l'arrêt, les flux SSE sont fermés (voir EventBus.fermer()), puis les
+    requêtes en cours sont attendues au plus 'delai_arret' secondes : au-delà,
+    le processus se termine sans elles.
+    """
+    from app import app, ingestion
+
+    host, port = sock.getsockname()[:2]
+    serveur = make_server(host, port, app, threaded=threads, fd=sock.fileno())
+    # Les requêtes en cours sont attendues à la fermeture du serveur
+    serveur.daemon_threads = False
+    serveur.block_on_close = True
+    sous_systemes = app.extensions['capi']
+    requetes_terminees = threading.Event()
+
+    def terminer():
+        # Les votes déjà acceptés sont appliqués avant l'arrêt
+        ingestion.arreter()
+        if sous_systemes.profileur is not None:
+            sous_systemes.profileur.ecrire()
+
+    def arreter_serveur():
+        # Les flux SSE ne se terminent pas d'eux-mêmes : ils sont fermés avant d'attendre les requêtes
+        if '_bus' in vars(sous_systemes):
+            sous_systemes.bus.fermer()
+        serveur.shutdown()
+        if not requetes_terminees.wait(delai_arret):
+            # Les threads des requêtes bloquées retiendraient l'interpréteur
+            print(f"Requêtes encore en cours après {delai_arret} s : arrêt forcé.", file=sys.stderr)
+            terminer()
+            sys.stderr.flush()
+            os._exit(1)
+
+    def arreter(signum, frame):
+        # shutdown() attend la fin de serve_forever() : il est appelé depuis un autre thread
+        threading.Thread(target=arreter_serveur, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, arreter)
+    signal.signal(signal.SIGINT, arreter)
+    # serve_forever() se termine par server_close(), qui attend la fin des requêtes en cours
+    serveur.serve_forever()
+    requetes_terminees.set()
+    terminer()
+
+
+class Superviseur:
+    """
+    @brief Processus principal : crée, surveille et arrête les processus de service.
+    """
+
+    def __init__(self, sock, workers, threads=True, delai_arret=10.0):
+        """
+        @param sock La socket d'écoute partagée.
+        @param workers Le nombre de processus de service.
+        @param threads Si True, chaque processus traite ses requêtes dans des threads.
+        @param delai_arret Délai accordé aux processus pour terminer leurs requêtes à l'arrêt.
+        """
+        self.sock = sock
+        self.workers = workers
+        self.threads = threads
+        self.delai_arret = delai_arret
+        self.enfants = set()
+        self.arret = False
+
+    def demarrer_worker(self):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_DFL)
+                servir(self.sock, self.threads, self.delai_arret)
+            except BaseException:
+                import traceback
+                traceback.print_exc()
+                code = 1
+            finally:
+                os._exit(code)
+        self.enfants.add(pid)
+
+    def demander_arret(self, signum, frame):
+        self.arret = True
+
+    def executer(self):
+        """
+        @brief Démarre les processus et les relance jusqu'à la demande d'arrêt.
+
+        @return Le code de sortie du serveur.
+        """
+        signal.signal(signal.SIGTERM, self.demander_arret)
+        signal.signal(signal.SIGINT, self.demander_arret)
+        for _ in range(self.workers):
+            self.demarrer_worker()
+        while not self.arret:
+            pid, statut = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.2)
+                continue
+            self.enfants.discard(pid)
+            if not self.arret:
+                print(f"Processus {pid} arrêté (statut {statut}), relance.", file=sys.stderr)
+                time.sleep(1)  # Évite une boucle de relances si l'application ne démarre pas
+                self.demarrer_worker()
+        self.arreter_workers()
+        return 0
+
+    def arreter_workers(self):
+        for pid in self.enfants:
+            _signaler(pid, signal.SIGTERM)
+        limite = time.monotonic() + self.delai_arret
+        while self.enfants and time.monotonic() < limite:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                time.sleep(0.05)
+            else:
+                self.enfants.discard(pid)
+        for pid in self.enfants:
+            _signaler(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        self.enfants.clear()
+
+
+def _signaler(pid, signum):
+    try:
+        os.kill(pid, signum)
+    except ProcessLookupError:
+        pass
+
+
+def main(argv=None):
+    """
+    @brief Lance le serveur de production.
+    """
+    parser = argparse.ArgumentParser(description="Serveur de production de l'application Planning Poker.")
+    parser.add_argument('--host', default='127.0.0.1', help="Adresse d'écoute (défaut : 127.0.0.1).")
+    parser.add_argument('--port', type=int, default=8000, help="Port d'écoute (défaut : 8000).")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help="Nombre de processus (défaut : nombre de cœurs).")
+    parser.add_argument('--sans-threads', action='store_true',
+                        help="Traite les requêtes d'un processus une par une.")
+    parser.add_argument('--delai-arret', type=float, default=10.0,
+                        help="Délai (en secondes) accordé aux requêtes en cours à l'arrêt (défaut : 10).")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers doit être au moins 1.")
+
+    # Un seul processus là où fork() n'existe pas (Windows)
+    workers = args.workers if hasattr(os, 'fork') else 1
+    if not os.environ.get('CAPI_SECRET_KEY'):
+        # Vérifiée avant de lancer les processus : tous doivent signer les sessions avec la même clé
+        parser.error("la variable d'environnement CAPI_SECRET_KEY (clé secrète des sessions) doit être définie.")
+    configurer_environnement(workers)
+    sock = ouvrir_socket(args.host, args.port)
+    print(f"Écoute sur http://{args.host}:{sock.getsockname()[1]} ({workers} processus)", file=sys.stderr)
+    if workers == 1:
+        servir(sock, not args.sans_threads, args.delai_arret)
+        return 0
+    return Superviseur(sock, workers, not args.sans_threads, args.delai_arret).executer()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
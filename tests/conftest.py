@@ -0,0 +1,36 @@
+import pytest
+
+from app import create_app
+
+
+@pytest.fixture
+def app(tmp_path):
+    """
+    @brief Instance de l'application dont les fichiers (journaux des parties, historique) sont écrits dans tmp_path.
+
+    @details
+    Le contexte de l'instance est actif pendant le test : les sous-systèmes
+    du module app (rooms, ingestion, scheduler...) sont ceux de cette instance.
+    """
+    instance = create_app({
+        'TESTING': True,
+        'JOURNAL_DIR': str(tmp_path / 'parties'),
+        'ANALYTICS_PATH': str(tmp_path / 'analytics.sqlite3'),
+    })
+    with instance.app_context():
+        yield instance
+    sous_systemes = instance.extensions['capi']
+    # Arrêt des threads de fond démarrés pendant le test
+    if '_ingestion' in vars(sous_systemes):
+        sous_systemes.ingestion.arreter()
+    if '_scheduler' in vars(sous_systemes):
+        sous_systemes.scheduler.arreter()
+
+
+@pytest.fixture
+def client(app):
+    """
+    @brief Client de test de l'instance fournie par la fixture app.
+    """
+    with app.test_client() as client:
+        yield client
@@ -0,0 +1,103 @@
+import pytest
+
+from models.analytics import AnalyticsStore, equipe_de
+
+JOUR = 86400
+DEBUT = 1767225600  # Jeudi 1er janvier 2026
+
+
+def ligne(feature, estimation, tours, votes=None):
+    return {'id': 1, 'feature': feature, 'estimate': estimation, 'rounds': tours,
+            'rule': 'majorite', 'votes': votes or {str(estimation): 2}}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.sqlite3"))
+    store.enregistrer_partie("p1", ["Bob", "Alice"], [ligne("Login", 3, 1), ligne("Export", 8, 3, {"5": 1, "13": 1})],
+                             date=DEBUT)
+    store.enregistrer_partie("p2", ["Alice", "Bob"], [ligne("Login", 5, 2)], date=DEBUT + 8 * JOUR)
+    store.enregistrer_partie("p3", ["Eve"], [ligne("Login", 13, 4), ligne("Search", 2, 1)], date=DEBUT + 9 * JOUR)
+    return store
+
+
+def test_velocite(store):
+    """
+    @brief Vérifie les points par période d'une équipe et la pagination par curseur.
+    """
+    periodes, suivant = store.velocite(equipe_de(["Alice", "Bob"]), 'jour', limite=1)
+    assert periodes == [{'periode': '2026-01-09', 'points': 5, 'features': 1, 'parties': 1}]
+    periodes, suivant = store.velocite(equipe_de(["Alice", "Bob"]), 'jour', limite=1, avant=suivant)
+    assert periodes == [{'periode': '2026-01-01', 'points': 11, 'features': 2, 'parties': 1}]
+    assert suivant is None
+
+    periodes, _ = store.velocite(periode='mois')
+    assert periodes == [{'periode': '2026-01', 'points': 31, 'features': 5, 'parties': 3}]
+    with pytest.raises(ValueError):
+        store.velocite(periode='siecle')
+
+
+def test_dispersion_et_debats(store):
+    """
+    @brief Vérifie la dispersion des estimations par fonctionnalité et le classement des plus débattues.
+    """
+    features, suivant = store.dispersion(limite=2)
+    assert [f['feature'] for f in features] == ["Export", "Login"]
+    assert features[1] == {'feature': "Login", 'estimations': 3, 'min': 3, 'max': 13,
+                           'moyenne': 7.0, 'ecart_votes_moyen': 0.0}
+    assert features[0]['ecart_votes_moyen'] == 8.0
+    assert [f['feature'] for f in store.dispersion(apres=suivant)[0]] == ["Search"]
+
+    debattues, suivant = store.plus_debattues(limite=2)
+    assert [(f['feature'], f['rounds']) for f in debattues] == [("Login", 4), ("Export", 3)]
+    assert debattues[1]['votes'] == {"5": 1, "13": 1}
+    assert [f['rounds'] for f in store.plus_debattues(limite=2, apres=suivant)[0]] == [2, 1]
+    assert [f['feature'] for f in store.plus_debattues(equipe="Eve", estimation=2)[0]] == ["Search"]
+
+
+def test_partie_remplacee(store):
+    """
+    @brief Vérifie qu'une partie enregistrée à nouveau (reprise après la fin) remplace la précédente.
+    """
+    store.enregistrer_partie("p3", ["Eve"], [ligne("Login", 1, 1)], date=DEBUT + 9 * JOUR)
+    assert len(store) == 3
+    assert store.dispersion(feature="Search")[0] == []
+
+
+def test_requetes_indexees(store):
+    """
+    @brief Vérifie que les requêtes de l'historique sont servies par un index, sans parcours de la table.
+    """
+    plans = [
+        store.expliquer("SELECT estimation, partie_id, date FROM estimations WHERE equipe = ? AND date < ? "
+                        "ORDER BY date DESC", ("Eve", 0)),
+        store.expliquer("SELECT feature, MIN(estimation), AVG(ecart) FROM estimations WHERE feature > ? "
+                        "GROUP BY feature ORDER BY feature", ("",)),
+        store.expliquer("SELECT id FROM estimations WHERE equipe = ? AND (tours, id) < (?, ?) "
+                        "ORDER BY tours DESC, id DESC", ("Eve", 3, 10)),
+        store.expliquer("SELECT id FROM estimations WHERE estimation = ? ORDER BY tours DESC, id DESC", (13,)),
+    ]
+    for plan in plans:
+        assert len(plan) == 1 and "USING COVERING INDEX" in plan[0], plan
+
+
+def test_routes_analytics(app, client, tmp_path):
+    """
+    @brief Vérifie qu'une partie terminée est archivée dans l'historique de l'instance et interrogeable via /analytics/*.
+    """
+    room_id = client.post('/rooms', json={"players": ["Alice", "Bob"], "features": ["F1"],
+                                          "time_limit": None}).get_json()["room_id"]
+    client.post(f'/rooms/{room_id}/vote', json={"player": "Alice", "valeur": "5"})
+    client.post(f'/rooms/{room_id}/vote', json={"player": "Bob", "valeur": "8"})
+    client.post(f'/rooms/{room_id}/vote', json={"player": "Alice", "valeur": "8"})
+    client.post(f'/rooms/{room_id}/vote', json={"player": "Bob", "valeur": "8"})
+
+    debattues = client.get('/analytics/debated?team=Bob,Alice').get_json()
+    assert debattues["next"] is None
+    assert [(f['feature'], f['estimate'], f['rounds']) for f in debattues["items"]] == [("F1", 8, 2)]
+    assert client.get('/analytics/velocity?period=jour').get_json()["items"][0]["points"] == 8
+    assert client.get('/analytics/spread').get_json()["items"][0]["feature"] == "F1"
+    assert client.get('/analytics/velocity?period=siecle').status_code == 400
+    assert client.get('/analytics/debated?cursor=abc').status_code == 400
+    assert app.extensions['capi'].analytique.path == str(tmp_path / "analytics.sqlite3")
+    assert len(AnalyticsStore(str(tmp_path / "analytics.sqlite3"))) == 1
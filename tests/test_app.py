@@ -1,15 +1,16 @@
 import pytest
 from flask import url_for
-from app import app
+from models.cartes import decoder_votes
+import gzip
 import os
+import re
 import json
 
 @pytest.fixture
-def client():
+def client(app):
     """
-    Fixture pour configurer un client de test Flask.
+    Fixture pour configurer un client de test Flask (instance temporaire, voir conftest.py).
     """
-    app.config['TESTING'] = True
     app.config['WTF_CSRF_ENABLED'] = False  # Désactive CSRF pour les tests
     with app.test_client() as client:
         with client.session_transaction() as session:
@@ -126,7 +127,7 @@ def test_game_post(client):
     response = client.post('/game', data={'valeur_choisi': '3'}, follow_redirects=True)
     assert response.status_code == 200
     with client.session_transaction() as session:
-        assert session['liste_vote'] == [3]
+        assert decoder_votes(session['liste_vote']) == [3]
         assert session['index_player'] == 1
 
 
@@ -181,12 +182,12 @@ def test_load_game_page_post(client, tmp_path):
     # Vérifie que la session a été mise à jour
     with client.session_transaction() as session:
         assert session['players'] == save_data['players']
-        assert session['features'] == save_data['features']
+        assert list(session['features']) == save_data['features']
         assert session['current_feature_index'] == save_data['current_feature_index']
         assert session['index_player'] == save_data['index_player']
         assert session['rules'] == save_data['rules']
-        assert session['results'] == save_data['results']
-        assert session['liste_vote'] == save_data['liste_vote']
+        assert session['features'].resultats() == save_data['results']
+        assert decoder_votes(session['liste_vote']) == [1, 2, 3]
         assert session['time_limit'] == save_data['time_limit']
 
 def test_interro_redirection(client):
@@ -243,12 +244,12 @@ def test_load_game_page_post(client, tmp_path):
     # Vérifie que la session a été mise à jour
     with client.session_transaction() as session:
         assert session['players'] == save_data['players']
-        assert session['features'] == save_data['features']
+        assert list(session['features']) == save_data['features']
         assert session['current_feature_index'] == save_data['current_feature_index']
         assert session['index_player'] == save_data['index_player']
         assert session['rules'] == save_data['rules']
-        assert session['results'] == save_data['results']
-        assert session['liste_vote'] == save_data['liste_vote']
+        assert session['features'].resultats() == save_data['results']
+        assert decoder_votes(session['liste_vote']) == [1, 2, 3]
         assert session['time_limit'] == save_data['time_limit']
 
 def test_valider_vote_unanime():
@@ -304,4 +305,86 @@ def test_export_results(client):
 
     # Vérifier le contenu du fichier JSON
     json_data = json.loads(response.data)
-    assert json_data == {"backlog": {"Feature A": 3, "Feature B": 5}}
\ No newline at end of file
+    assert json_data["backlog"] == {"Feature A": 3, "Feature B": 5}
+    assert [f["feature"] for f in json_data["features"]] == ["Feature A", "Feature B"]
+
+
+def test_create_app_instances_independantes(app, tmp_path):
+    """
+    Test de la fabrique create_app.
+    Vérifie que chaque instance a sa configuration et ses sous-systèmes, créés à la première utilisation.
+    """
+    from app import create_app
+    instance = create_app({'ROOM_BACKEND': 'sqlite', 'ROOM_SQLITE_PATH': str(tmp_path / 'rooms.sqlite3'),
+                           'SECRET_KEY': 'cle-de-test'})
+    sous_systemes = instance.extensions['capi']
+    assert instance.secret_key == 'cle-de-test'
+    assert '_rooms' not in vars(sous_systemes) and '_analytique' not in vars(sous_systemes)
+
+    response = instance.test_client().post('/rooms', json={"players": ["Alice"], "features": ["F1"],
+                                                           "time_limit": None})
+    room_id = response.get_json()["room_id"]
+    assert sous_systemes.rooms.partage and room_id in sous_systemes.rooms
+    assert room_id not in app.extensions['capi'].rooms
+    assert '_analytique' not in vars(sous_systemes)
+
+
+def test_create_app_cle_secrete(monkeypatch):
+    """
+    Test de la fabrique create_app.
+    Vérifie qu'une instance de production sans clé secrète refuse de démarrer, et qu'en test une clé aléatoire est générée.
+    """
+    from app import create_app
+    monkeypatch.delenv('CAPI_SECRET_KEY', raising=False)
+    with pytest.raises(RuntimeError):
+        create_app()
+    cles = {create_app({'TESTING': True}).secret_key for _ in range(2)}
+    assert len(cles) == 2 and all(len(cle) >= 32 for cle in cles)
+    monkeypatch.setenv('CAPI_SECRET_KEY', 'cle-de-production')
+    assert create_app().secret_key == 'cle-de-production'
+
+
+def test_results_conditionnels(client):
+    """
+    Test des validateurs HTTP des résultats et de l'export.
+    Vérifie qu'un backlog inchangé donne une réponse 304 et qu'une modification la renouvelle.
+    """
+    with client.session_transaction() as session:
+        session['results'] = {'Feature A': 3}
+
+    for url in ('/results', '/export_results?format=csv', '/propose_features'):
+        response = client.get(url)
+        etag = response.headers['ETag']
+        assert response.status_code == 200 and response.last_modified is not None
+        assert 'no-cache' in response.headers['Cache-Control']
+        inchangee = client.get(url, headers={'If-None-Match': etag})
+        assert inchangee.status_code == 304 and inchangee.data == b""
+        assert client.get(url, headers={'If-Modified-Since': response.headers['Last-Modified']}).status_code == 304
+
+    etag = client.get('/results').headers['ETag']
+    assert client.get('/export_results?format=json', headers={'If-None-Match': etag}).status_code == 200
+    client.post('/propose_features', data={'feature': 'Feature C'})
+    response = client.get('/results', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.headers['ETag'] != etag
+
+
+def test_compression_et_statiques(client):
+    """
+    Test de la compression des pages et de la mise en cache des fichiers statiques.
+    """
+    with client.session_transaction() as session:
+        session['features'] = [f"Fonctionnalité {i}" for i in range(200)]
+    response = client.get('/propose_features', headers={'Accept-Encoding': 'gzip'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    page = gzip.decompress(response.data).decode()
+    assert "Fonctionnalité 199" in page
+    assert 'Content-Encoding' not in client.get('/propose_features').headers
+
+    url_css = re.search(r'href="(/static/css/style\.css\?v=\w+)"', page).group(1)
+    statique = client.get(url_css)
+    assert statique.status_code == 200
+    assert statique.cache_control.max_age == 365 * 24 * 3600 and statique.cache_control.immutable
+    statique.close()
+    ancienne = client.get('/static/css/style.css?v=ancienne')
+    assert ancienne.cache_control.max_age is None
+    ancienne.close()
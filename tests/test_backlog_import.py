@@ -0,0 +1,51 @@
+import io
+import json
+
+import pytest
+from models.backlog_import import importer_backlog
+
+
+def test_import_tableau_json_par_blocs():
+    """
+    @brief Vérifie la lecture d'un tableau JSON coupé en petits blocs, avec dédoublonnage et validation.
+    """
+    elements = ["A", {"title": "B"}, "A", 42, {"autre": 1}, "  C  ", 12345678, "D"]
+    flux = io.BytesIO(json.dumps(elements).encode('utf-8'))
+    nouvelles, stats = importer_backlog(flux, existantes=["D"], taille_bloc=3)
+    assert nouvelles == ["A", "B", "C"]
+    assert stats == {"imported": 3, "duplicates": 2, "invalid": 3}
+
+
+def test_import_ndjson():
+    """
+    @brief Vérifie la lecture d'un flux NDJSON, y compris des lignes invalides.
+    """
+    flux = io.BytesIO('"A"\n{"titre": "B"}\n\npas du json\n"B"'.encode('utf-8'))
+    nouvelles, stats = importer_backlog(flux, taille_bloc=4)
+    assert nouvelles == ["A", "B"]
+    assert stats == {"imported": 2, "duplicates": 1, "invalid": 1}
+
+
+@pytest.mark.parametrize("contenu", ['["A", "B"', '["A" "B"]', '["A",]'])
+def test_import_tableau_mal_forme(contenu):
+    """
+    @brief Vérifie qu'un tableau JSON mal formé est refusé.
+    """
+    with pytest.raises(ValueError):
+        importer_backlog(io.BytesIO(contenu.encode('utf-8')))
+
+
+def test_route_import_backlog(client):
+    """
+    @brief Vérifie l'import d'un gros backlog dans la session.
+    """
+    with client.session_transaction() as session:
+        session['features'] = ["F0"]
+    corps = "\n".join(json.dumps({"title": f"F{i}"}) for i in range(10000))
+    response = client.post('/import_backlog', data=corps, content_type='application/x-ndjson')
+    assert response.get_json() == {"imported": 9999, "duplicates": 1, "invalid": 0}
+    with client.session_transaction() as session:
+        assert len(session['features']) == 10000
+
+    response = client.post('/import_backlog', data={'backlog': (io.BytesIO(b'["X"]'), 'backlog.json')})
+    assert response.get_json()["imported"] == 1
@@ -0,0 +1,46 @@
+import pytest
+from benchmarks.mesure import mesurer, percentile, formater_rapport
+from benchmarks.bench_vote import generer_tours
+from benchmarks.__main__ import main
+
+
+def test_mesurer():
+    """
+    @brief Vérifie les statistiques rapportées par une mesure.
+    """
+    appels = []
+    resultat = mesurer("essai", lambda x: appels.append(x), repetitions=10, echauffement=2, preparer=lambda: 1)
+    # Échauffement, répétitions chronométrées et appel de mesure mémoire
+    assert len(appels) == 13
+    assert resultat['repetitions'] == 10
+    assert resultat['ops_par_s'] > 0
+    assert resultat['p50_us'] <= resultat['p95_us'] <= resultat['p99_us'] <= resultat['max_us']
+    assert "essai" in formater_rapport([resultat])
+
+
+def test_percentile():
+    """
+    @brief Vérifie le calcul des percentiles par rang le plus proche.
+    """
+    valeurs = list(range(1, 101))
+    assert percentile(valeurs, 50) == 50
+    assert percentile(valeurs, 99) == 99
+    assert percentile(valeurs, 100) == 100
+    assert percentile([7], 95) == 7
+
+
+def test_tours_reproductibles():
+    """
+    @brief Vérifie que les tours générés sont reproductibles et de la bonne taille.
+    """
+    assert generer_tours('disperse', 8) == generer_tours('disperse', 8)
+    assert all(len(tour) == 8 for tour in generer_tours('cafe', 8))
+
+
+def test_suite_inconnue():
+    """
+    @brief Vérifie qu'une suite inconnue est refusée par la ligne de commande.
+    """
+    with pytest.raises(SystemExit) as erreur:
+        main(['inconnue'])
+    assert erreur.value.code == 2
@@ -0,0 +1,56 @@
+import pytest
+from models.cartes import Carte, encoder_carte, encoder_votes, decoder_votes, lire_votes
+from models.game import valider_codes
+
+
+def test_encoder_carte():
+    """
+    @brief Vérifie la conversion des valeurs de formulaire en cartes.
+    """
+    assert encoder_carte("13") is Carte.TREIZE
+    assert encoder_carte(100) is Carte.CENT
+    assert encoder_carte("cafe") is Carte.CAFE
+    assert Carte.INTERRO.valeur == "interro"
+    with pytest.raises(ValueError):
+        encoder_carte("4")
+
+
+def test_votes_compacts():
+    """
+    @brief Vérifie qu'un tour de vote tient sur un octet par carte et se relit à l'identique.
+    """
+    votes = encoder_votes([1, "5", "cafe", 100])
+    assert len(votes.tobytes()) == 4
+    assert decoder_votes(lire_votes(votes.tobytes())) == [1, 5, "cafe", 100]
+    assert decoder_votes(lire_votes(votes.tobytes().hex())) == [1, 5, "cafe", 100]
+    assert decoder_votes(lire_votes(["1", "interro"])) == [1, "interro"]
+
+
+def test_valider_codes():
+    """
+    @brief Vérifie la validation d'un tour encodé.
+    """
+    assert valider_codes(encoder_votes([3, 3, "interro"]), "majorite") == (True, Carte.TROIS)
+    assert valider_codes(encoder_votes(["cafe", "cafe"]), "unanime") == (True, Carte.CAFE)
+    assert valider_codes(encoder_votes([3, 5]), "unanime") == (False, False)
+    assert valider_codes(b'', "unanime") == (False, False)
+
+
+def test_valider_codes_identique_au_decompte():
+    """
+    @brief Vérifie que le décompte par code donne, pour chaque règle, le même résultat que le décompte par carte.
+    """
+    import random
+    from collections import Counter
+    from models.game import LISTE_TYPE_VOTE, REGLES
+    rng = random.Random(0)
+    for _ in range(500):
+        # Petits tours (comptés vote par vote) et grands tours (comptés carte par carte)
+        codes = encoder_votes(rng.choice([1, 3, 5, 8, "cafe", "interro"]) for _ in range(rng.choice([3, 40])))
+        decompte = {Carte(code): n for code, n in Counter(codes).items()}
+        for regle in LISTE_TYPE_VOTE:
+            for tour in (1, 2):
+                resultat, carte = REGLES[regle](decompte, Carte.CAFE, Carte.INTERRO, tour)
+                attendu = (True, Carte(carte)) if resultat else (False, False)
+                assert valider_codes(codes, regle, tour) == attendu
+                assert valider_codes(list(codes), regle, tour) == attendu
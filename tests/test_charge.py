@@ -0,0 +1,42 @@
+import threading
+
+from werkzeug.serving import make_server
+
+from benchmarks.charge import Equipe, lancer, PROFILS
+
+
+def test_equipes_client_flask():
+    """
+    @brief Vérifie que des équipes simultanées terminent leurs parties sans erreur.
+    """
+    statistiques, duree = lancer(nb_equipes=4, nb_joueurs=3, nb_features=3, profil='disperse')
+    assert statistiques.parties == 4
+    assert statistiques.parties_en_echec == 0
+    assert not statistiques.erreurs
+    assert len(statistiques.latences['export_results']) == 4
+    assert "req/s" in statistiques.rapport(duree)
+
+
+def test_profil_votes():
+    """
+    @brief Vérifie que le profil 'consensus' ne produit que la carte de consensus.
+    """
+    equipe = Equipe(None, 0, 3, 2, 'consensus', graine=1)
+    assert {equipe.choisir_vote('8') for _ in range(50)} == {'8'}
+    assert set(PROFILS) >= {'consensus', 'realiste', 'disperse'}
+
+
+def test_equipes_http(app):
+    """
+    @brief Vérifie le transport HTTP contre une instance lancée sur un port local.
+    """
+    serveur = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=serveur.serve_forever, daemon=True)
+    thread.start()
+    try:
+        statistiques, _ = lancer(nb_equipes=2, nb_joueurs=2, nb_features=2, profil='realiste',
+                                 url=f'http://127.0.0.1:{serveur.server_port}')
+    finally:
+        serveur.shutdown()
+    assert statistiques.parties == 2
+    assert statistiques.parties_en_echec == 0
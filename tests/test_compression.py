@@ -0,0 +1,44 @@
+import gzip
+
+from flask import Response
+from werkzeug.datastructures import Headers
+from werkzeug.test import EnvironBuilder
+from werkzeug.wrappers import Request
+
+from models.compression import compresser_reponse, choisir_encodage
+
+
+def accept_encodings(valeur):
+    return Request(EnvironBuilder(headers=Headers({'Accept-Encoding': valeur})).get_environ()).accept_encodings
+
+
+def test_compression_au_dela_du_seuil():
+    """
+    @brief Vérifie que seules les réponses textuelles au-delà du seuil sont compressées, avec un ETag faible.
+    """
+    corps = "<p>Fonctionnalité</p>" * 200
+    reponse = Response(corps, mimetype='text/html')
+    reponse.set_etag('abc')
+    compresser_reponse(reponse, accept_encodings('gzip, deflate'), seuil=1024)
+    assert reponse.headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(reponse.get_data()).decode() == corps
+    assert reponse.get_etag() == ('abc', True)
+    assert 'Accept-Encoding' in reponse.vary
+
+    petite = compresser_reponse(Response("ok", mimetype='text/html'), accept_encodings('gzip'), seuil=1024)
+    assert 'Content-Encoding' not in petite.headers and 'Accept-Encoding' in petite.vary
+    image = compresser_reponse(Response(b"\0" * 4096, mimetype='image/png'), accept_encodings('gzip'), seuil=1)
+    assert 'Content-Encoding' not in image.headers
+
+
+def test_pas_de_compression_sans_accord():
+    """
+    @brief Vérifie que les réponses en streaming et les clients sans gzip reçoivent le corps tel quel.
+    """
+    corps = "x" * 4096
+    assert choisir_encodage(accept_encodings('identity')) is None
+    assert choisir_encodage(accept_encodings('gzip;q=0')) is None
+    reponse = compresser_reponse(Response(corps, mimetype='text/plain'), accept_encodings('identity'), seuil=1)
+    assert reponse.get_data(as_text=True) == corps
+    flux = compresser_reponse(Response(iter([corps]), mimetype='text/plain'), accept_encodings('gzip'), seuil=1)
+    assert 'Content-Encoding' not in flux.headers
@@ -0,0 +1,94 @@
+import json
+
+from models.events import EventBus, flux_sse, formater_sse
+
+
+def test_bus_publier():
+    """
+    @brief Vérifie qu'un événement publié est reçu par les abonnés de la partie uniquement.
+    """
+    bus = EventBus()
+    file_a = bus.abonner("a")
+    file_b = bus.abonner("b")
+    bus.publier("a", "vote", nb_bulletins=1)
+    assert file_a.get_nowait() == {"type": "vote", "nb_bulletins": 1}
+    assert file_b.empty()
+
+
+def test_bus_client_lent_desabonne():
+    """
+    @brief Vérifie qu'un client dont la file est pleine est désabonné.
+    """
+    bus = EventBus(taille_file=1)
+    bus.abonner("a")
+    bus.publier("a", "vote")
+    bus.publier("a", "vote")
+    assert bus.nb_abonnes("a") == 0
+
+
+def test_flux_sse_termine_si_desabonne():
+    """
+    @brief Vérifie que le flux d'un client désabonné (file pleine) se termine au lieu d'attendre indéfiniment.
+    """
+    bus = EventBus(taille_file=2)
+    flux = flux_sse(bus, "a", {"current_feature": "F1"}, keepalive=60)
+    assert next(flux).startswith("event: etat\n")
+    for _ in range(3):
+        bus.publier("a", "vote")
+    assert bus.nb_abonnes("a") == 0
+    assert list(flux) == []
+
+
+def test_flux_sse():
+    """
+    @brief Vérifie le format du flux Server-Sent Events.
+    """
+    bus = EventBus()
+    flux = flux_sse(bus, "a", {"current_feature": "F1"})
+    premier = next(flux)
+    assert premier.startswith("event: etat\n")
+    bus.publier("a", "tour", issue="valide")
+    deuxieme = next(flux)
+    assert json.loads(deuxieme.split("data: ")[1]) == {"issue": "valide", "type": "tour"}
+    flux.close()
+    assert bus.nb_abonnes("a") == 0
+
+
+def test_route_vote_simultane(client):
+    """
+    @brief Vérifie le vote simultané via l'API JSON.
+    """
+    room_id = client.post('/rooms', json={"players": ["Alice", "Bob"], "features": ["F1"]}).get_json()["room_id"]
+    assert client.post(f'/rooms/{room_id}/vote', json={"player": "Bob", "valeur": "5"}).get_json()["issue"] == "suivant"
+    delta = client.post(f'/rooms/{room_id}/vote', json={"player": "Alice", "valeur": "5"}).get_json()
+    assert delta["issue"] == "valide"
+    assert delta["estimation"] == 5
+    assert client.post(f'/rooms/{room_id}/vote', json={"player": "Eve", "valeur": "5"}).status_code == 400
+    assert b"EventSource" in client.get(f'/rooms/{room_id}/play?player=Alice').data
+
+
+def test_flux_sse_rafraichi():
+    """
+    @brief Vérifie que le flux renvoie l'état complet lorsqu'un autre processus a modifié la partie.
+    """
+    bus = EventBus()
+    etats = [None, {"current_feature": "F2"}]
+    flux = flux_sse(bus, "a", {"current_feature": "F1"}, keepalive=0.05,
+                    rafraichir=lambda: etats.pop(0) if etats else None, intervalle=0.01)
+    next(flux)
+    assert json.loads(next(flux).split("data: ")[1]) == {"current_feature": "F2", "type": "etat"}
+    assert next(flux) == ": keepalive\n\n"
+    flux.close()
+
+
+def test_bus_fermer_termine_les_flux():
+    """
+    @brief Vérifie que la fermeture du bus termine les flux ouverts et ceux ouverts ensuite.
+    """
+    bus = EventBus()
+    flux = flux_sse(bus, "r1", {"current_feature": "F1"}, keepalive=60)
+    next(flux)
+    bus.fermer()
+    assert list(flux) == []
+    assert list(flux_sse(bus, "r1", {"current_feature": "F1"}, keepalive=60)) == [
+        formater_sse({"current_feature": "F1", "type": "etat"})]
@@ -0,0 +1,77 @@
+import csv
+import gzip
+import io
+import json
+
+import pytest
+from models.export import exporter, lignes_export, FORMAT_CSV, FORMAT_NDJSON
+from models.room import GameRoom
+
+
+def partie_terminee():
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="majorite", features=["F1", "F2"])
+    # F1 : un débat puis un tour validé ; F2 : validé au premier tour.
+    # Le premier vote après le débat relance le tour sans être compté.
+    for valeur in ["1", "8", "13", "interro", "3", "3", "5", "2", "2", "2"]:
+        room.jouer(valeur)
+    return room
+
+
+def test_metadonnees_par_fonctionnalite():
+    """
+    @brief Vérifie le nombre de tours, la règle et la répartition des votes de chaque fonctionnalité.
+    """
+    lignes = lignes_export(partie_terminee().features)
+    assert lignes == [
+        {'id': 1, 'feature': 'F1', 'estimate': 3, 'rounds': 2, 'rule': 'majorite', 'votes': {'3': 2, '5': 1}},
+        {'id': 2, 'feature': 'F2', 'estimate': 2, 'rounds': 1, 'rule': 'majorite', 'votes': {'2': 3}},
+    ]
+
+
+def test_exports_ndjson_csv():
+    """
+    @brief Vérifie les exports NDJSON et CSV.
+    """
+    lignes = lignes_export(partie_terminee().features)
+    ndjson = b''.join(exporter(lignes, FORMAT_NDJSON)).decode()
+    assert [json.loads(l) for l in ndjson.splitlines()] == lignes
+
+    lecteur = csv.DictReader(io.StringIO(b''.join(exporter(lignes, FORMAT_CSV)).decode()))
+    rangees = list(lecteur)
+    assert [r['feature'] for r in rangees] == ['F1', 'F2']
+    assert json.loads(rangees[0]['votes']) == {'3': 2, '5': 1}
+
+    with pytest.raises(ValueError):
+        exporter(lignes, 'xml')
+
+
+def test_export_gzip_en_streaming():
+    """
+    @brief Vérifie l'export compressé d'un grand backlog, produit en plusieurs morceaux.
+    """
+    room = GameRoom(players=["Alice"], rules="unanime", features=[f"F{i}" for i in range(2000)])
+    for _ in range(2000):
+        room.jouer("5")
+    lignes = lignes_export(room.features)
+    morceaux = list(exporter(lignes, compresse=True))
+    assert len(morceaux) > 1
+    document = json.loads(gzip.decompress(b''.join(morceaux)))
+    assert len(document['backlog']) == 2000
+    assert document['features'][-1] == {'id': 2000, 'feature': 'F1999', 'estimate': 5,
+                                        'rounds': 1, 'rule': 'unanime', 'votes': {'5': 1}}
+
+
+def test_route_export_formats(client):
+    """
+    @brief Vérifie les paramètres 'format' et 'gzip' de la route /export_results.
+    """
+    with client.session_transaction() as session:
+        session.update(partie_terminee().vers_etat())
+
+    response = client.get('/export_results?format=csv&gzip=1')
+    assert response.status_code == 200
+    assert response.mimetype == 'application/gzip'
+    assert 'backlog_results.csv.gz' in response.headers['Content-Disposition']
+    assert gzip.decompress(response.data).decode().startswith('id,feature,estimate')
+
+    assert client.get('/export_results?format=xml').status_code == 400
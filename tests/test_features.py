@@ -0,0 +1,65 @@
+from models.features import FeatureCollection
+
+
+def test_identifiants_stables():
+    """
+    @brief Vérifie que les identifiants restent stables après une suppression et que les doublons sont refusés.
+    """
+    features = FeatureCollection(["A", "B", "C"])
+    assert features.ajouter("B") is None
+    assert features.supprimer(2)
+    assert not features.supprimer(2)
+    assert features.ajouter("D") == 4
+    assert features.ids() == [1, 3, 4]
+    assert list(features) == ["A", "C", "D"]
+    assert "C" in features and 3 in features and "B" not in features
+
+
+def test_estimations():
+    """
+    @brief Vérifie que les résultats sont portés par les fonctionnalités.
+    """
+    features = FeatureCollection(["A", "B"])
+    features.estimer(2, 8)
+    assert features.resultats() == {"B": 8}
+    assert features.resultats_par_id() == [(2, "B", 8)]
+    copie = FeatureCollection.depuis(features.vers_liste())
+    assert copie.vers_liste() == features.vers_liste()
+
+
+def test_depuis_ancien_format():
+    """
+    @brief Vérifie la conversion d'une liste de titres et d'un dictionnaire de résultats.
+    """
+    features = FeatureCollection.depuis(["A", "B"], {"A": 3, "Z": 5})
+    assert features.resultats() == {"A": 3, "Z": 5}
+    assert features.id_de("Z") == 3
+
+
+def test_delete_feature_par_identifiant(client):
+    """
+    @brief Vérifie la suppression d'une fonctionnalité par identifiant via la route /delete_feature.
+    """
+    with client.session_transaction() as session:
+        session['features'] = FeatureCollection(["A", "B"])
+    assert client.post('/delete_feature', json={'feature_id': 1}).get_json() == {"success": True}
+    assert client.post('/delete_feature', json={'feature_id': 1}).get_json() == {"success": False}
+    with client.session_transaction() as session:
+        assert list(session['features']) == ["B"]
+
+
+def test_empreinte_et_modification():
+    """
+    @brief Vérifie que l'empreinte suit le contenu du backlog et que chaque modification est datée.
+    """
+    features = FeatureCollection(["A", "B"])
+    empreinte = features.empreinte()
+    assert FeatureCollection.depuis(features.vers_liste()).empreinte() == empreinte
+    features.modifiee = 0
+    features.estimer(1, 5)
+    assert features.empreinte() != empreinte and features.modifiee > 0
+    features.modifiee = 0
+    features.compter_tour(2)
+    features.supprimer(1)
+    assert features.modifiee > 0
+    assert features.empreinte() == FeatureCollection.depuis(features.vers_liste()).empreinte()
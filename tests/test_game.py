@@ -140,3 +140,124 @@ def test_mix_cafe_et_interro():
     resultat, valeur = valider_vote(votes, "majorite")
     assert resultat is False
     assert valeur is False
+
+
+def test_valider_vote_decompte_unique():
+    """
+    @brief Vérifie que valider_decompte donne le même résultat que valider_vote à partir du décompte.
+    """
+    from models.game import compter_votes, valider_decompte
+    votes = [5, "interro", 5, 8, 5]
+    decompte = compter_votes(votes)
+    assert decompte[5] == 3
+    assert valider_decompte(decompte, "majorite") == valider_vote(votes, "majorite") == (True, 5)
+    assert valider_decompte(decompte, "unanime") == valider_vote(votes, "unanime") == (False, False)
+
+
+def test_valider_votes_lot_identique_au_scalaire():
+    """
+    @brief Vérifie que la validation par lot donne les mêmes résultats que valider_vote tour par tour.
+    """
+    import random
+    from models.game import valider_votes_lot
+    rng = random.Random(42)
+    cartes = [1, 2, 3, 5, 8, "cafe", "interro"]
+    manches = [[rng.choice(cartes[:rng.randint(1, 7)]) for _ in range(rng.randint(0, 6))] for _ in range(500)]
+    for type_vote in ("unanime", "majorite"):
+        valides, valeurs = valider_votes_lot(manches, type_vote)
+        assert list(zip(valides.tolist(), valeurs.tolist())) == [valider_vote(m, type_vote) for m in manches]
+
+
+def test_valider_votes_lot_tableau_numpy():
+    """
+    @brief Vérifie la validation par lot d'un tableau NumPy 2-D.
+    """
+    import numpy as np
+    from models.game import valider_votes_lot
+    manches = np.array([[3, 3, 2], [1, 2, 3], [5, 5, 5]])
+    valides, valeurs = valider_votes_lot(manches, "majorite")
+    assert valides.tolist() == [True, False, True]
+    assert valeurs.tolist() == [3, False, 5]
+    valides, _ = valider_votes_lot(manches, "unanime")
+    assert valides.tolist() == [False, False, True]
+
+
+def test_regle_moyenne():
+    """
+    @brief Vérifie que la règle 'moyenne' retient la carte la plus proche de la moyenne des votes.
+    """
+    assert valider_vote(["1", "2", "3"], "moyenne") == (True, 2)
+    assert valider_vote([3, 5, 13, "interro"], "moyenne") == (True, 8)
+    assert valider_vote(["cafe", "cafe", "1"], "moyenne") == (True, "cafe")
+
+
+def test_regle_mediane():
+    """
+    @brief Vérifie la règle 'mediane', y compris pour un nombre pair de votes.
+    """
+    assert valider_vote([1, 40, 2], "mediane") == (True, 2)
+    assert valider_vote([1, 2, 8, 40], "mediane") == (True, 8)
+
+
+def test_regle_majorite_relative():
+    """
+    @brief Vérifie que la carte la plus jouée l'emporte, sauf égalité en tête.
+    """
+    assert valider_vote([3, 3, 5, 8, 13], "majorite_relative") == (True, 3)
+    assert valider_vote([3, 3, 5, 5, 13], "majorite_relative") == (False, False)
+
+
+def test_regle_unanime_puis_majorite():
+    """
+    @brief Vérifie que l'unanimité n'est exigée qu'au premier tour.
+    """
+    from collections import Counter
+    from models.game import valider_decompte
+    decompte = Counter([3, 3, 5])
+    assert valider_decompte(decompte, "unanime_puis_majorite", tour=1) == (False, False)
+    assert valider_decompte(decompte, "unanime_puis_majorite", tour=2) == (True, 3)
+
+
+def test_regle_resolue_une_fois():
+    """
+    @brief Vérifie qu'une partie résout sa règle à la création et l'applique par tour.
+    """
+    from models.game import REGLES
+    from models.room import GameRoom, ISSUE_DEBAT, ISSUE_VALIDE
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="unanime_puis_majorite", features=["F1"])
+    assert room.regle is REGLES["unanime_puis_majorite"]
+    for valeur in ["3", "3"]:
+        room.jouer(valeur)
+    assert room.jouer("5")[0] == ISSUE_DEBAT
+    room.jouer("interro")  # Relance le tour après le débat
+    for valeur in ["3", "3"]:
+        room.jouer(valeur)
+    assert room.jouer("5") == (ISSUE_VALIDE, "F1")
+    assert room.features.historique(1) == {'rounds': 2, 'rule': 'unanime_puis_majorite', 'votes': {'3': 2, '5': 1}}
+
+
+def test_votes_lot_autres_regles():
+    """
+    @brief Vérifie le traitement par lot des règles non vectorisées.
+    """
+    from models.game import valider_votes_lot
+    valides, valeurs = valider_votes_lot([[1, 2, 3], [1, 40, 2]], "mediane")
+    assert valides.tolist() == [True, True]
+    assert valeurs.tolist() == [2, 2]
+
+
+def test_fonctions_sur_listes():
+    """
+    @brief Vérifie que les fonctions de validation acceptent toujours une liste de votes, comme avant le décompte.
+    """
+    from models.game import (valider_unanimite, valider_majorite, gerer_votes_speciaux,
+                             valider_unanimite_decompte, valider_majorite_decompte)
+    assert valider_unanimite(["5", "5"]) == (True, "5")
+    assert valider_unanimite(["5", "8"]) == (False, False)
+    assert valider_unanimite([]) == (False, False)
+    assert valider_majorite(["5", "5", "8"]) == (True, "5")
+    assert valider_majorite(["5", "8"]) == (False, False)
+    assert gerer_votes_speciaux(["cafe", "cafe", "5"], 'majorite') == (True, "cafe")
+    assert gerer_votes_speciaux(["cafe", "5"], 'unanime') is None
+    assert valider_unanimite_decompte({"5": 2}) == (True, "5")
+    assert valider_majorite_decompte({"5": 2, "8": 1}) == (True, "5")
@@ -0,0 +1,101 @@
+import threading
+
+import pytest
+
+import app as app_module
+from models.ingestion import VoteIngestion, FileSaturee
+
+
+def test_ingestion_par_lots():
+    """
+    @brief Vérifie que les votes d'une partie sont traités par lots, dans l'ordre de soumission.
+    """
+    lots = []
+    ingestion = VoteIngestion(lambda cle, lot: lots.append((cle, lot)), taille_lot=3, automatique=False)
+    for i in range(5):
+        ingestion.soumettre("a", i)
+    ingestion.soumettre("b", "x")
+    assert ingestion.en_attente() == 6 and ingestion.en_attente("a") == 5
+
+    assert ingestion.traiter_en_attente() == 6
+    # Les parties prêtes sont servies à tour de rôle
+    assert lots == [("a", [0, 1, 2]), ("b", ["x"]), ("a", [3, 4])]
+    assert ingestion.en_attente() == 0
+
+
+def test_ingestion_contre_pression():
+    """
+    @brief Vérifie que les files bornées refusent les votes au lieu de grossir sans limite.
+    """
+    ingestion = VoteIngestion(lambda cle, lot: None, taille_file=2, max_en_attente=3,
+                              delai_reessai=5, automatique=False)
+    ingestion.soumettre("a", 1)
+    ingestion.soumettre("a", 2)
+    with pytest.raises(FileSaturee) as erreur:
+        ingestion.soumettre("a", 3)
+    assert not erreur.value.globale and erreur.value.reessayer_apres == 5
+    ingestion.soumettre("b", 1)
+    with pytest.raises(FileSaturee) as erreur:
+        ingestion.soumettre("c", 1)
+    assert erreur.value.globale
+
+    ingestion.traiter_en_attente()
+    assert ingestion.soumettre("a", 3) == 1
+
+
+def test_ingestion_threads():
+    """
+    @brief Vérifie qu'une partie n'est traitée que par un thread à la fois, sans perte de vote.
+    """
+    recus = []
+    en_cours = set()
+    chevauchements = []
+
+    def traiter(cle, lot):
+        if cle in en_cours:
+            chevauchements.append(cle)
+        en_cours.add(cle)
+        recus.extend((cle, v) for v in lot)
+        en_cours.discard(cle)
+
+    ingestion = VoteIngestion(traiter, taille_file=10000, nb_threads=4)
+
+    def soumettre(cle):
+        for i in range(500):
+            ingestion.soumettre(cle, i)
+
+    threads = [threading.Thread(target=soumettre, args=(f"room{i}",)) for i in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert ingestion.attendre(timeout=10)
+    ingestion.arreter()
+    assert not chevauchements
+    for i in range(4):
+        assert [v for cle, v in recus if cle == f"room{i}"] == list(range(500))
+
+
+def test_route_votes_asynchrones(client):
+    """
+    @brief Vérifie la mise en file des votes simultanés et les réponses 429 avec Retry-After.
+    """
+    room_id = client.post('/rooms', json={"players": ["Alice", "Bob"], "features": ["F1"],
+                                          "time_limit": None}).get_json()["room_id"]
+    response = client.post(f'/rooms/{room_id}/votes', json={"player": "Alice", "valeur": "5"})
+    assert response.status_code == 202
+    client.post(f'/rooms/{room_id}/votes', json={"player": "Bob", "valeur": "5"})
+    assert app_module.ingestion.attendre(timeout=5)
+    assert client.get(f'/rooms/{room_id}').get_json()["results"] == {"F1": 5}
+
+    assert client.post(f'/rooms/{room_id}/votes', json={"player": "Bob", "valeur": "7"}).status_code == 400
+    assert client.post('/rooms/inconnue/votes', json={"player": "Bob", "valeur": "5"}).status_code == 404
+
+    taille_file = app_module.ingestion.taille_file
+    app_module.ingestion.taille_file = 0
+    try:
+        response = client.post(f'/rooms/{room_id}/votes', json={"player": "Bob", "valeur": "5"})
+    finally:
+        app_module.ingestion.taille_file = taille_file
+    assert response.status_code == 429
+    assert response.headers['Retry-After'] == '1'
@@ -0,0 +1,173 @@
+import json
+import os
+import time
+
+import pytest
+from models.journal import JournalStore, EVENEMENT_VOTE, EVENEMENT_FEATURE_AJOUTEE, EVENEMENT_FEATURE_SUPPRIMEE
+from models.room import GameRoom
+
+
+def nouvelle_partie():
+    return GameRoom(players=["Alice", "Bob"], rules="majorite", features=["F1", "F2"])
+
+
+def test_journal_rejoue_les_evenements(tmp_path):
+    """
+    @brief Vérifie qu'une partie est reconstruite depuis l'instantané initial et les événements.
+    """
+    store = JournalStore(str(tmp_path))
+    room = nouvelle_partie()
+    game_id = store.creer(room.vers_sauvegarde())
+    journal = store.journal(game_id)
+
+    room.jouer("3")
+    journal.ajouter(EVENEMENT_VOTE, valeur="3")
+    room.jouer("3")
+    journal.ajouter(EVENEMENT_VOTE, valeur="3")
+    journal.ajouter(EVENEMENT_FEATURE_AJOUTEE, features=[[3, "F3"]])
+    journal.ajouter(EVENEMENT_FEATURE_SUPPRIMEE, id=2)
+
+    rechargee = JournalStore(str(tmp_path)).journal(game_id).charger()
+    assert rechargee.results == {"F1": 3}
+    assert list(rechargee.features) == ["F1", "F3"]
+    assert rechargee.feature_courante == "F3"
+
+
+def test_journal_ajout_sans_reecriture(tmp_path):
+    """
+    @brief Vérifie qu'un événement est ajouté en fin de journal sans réécrire l'instantané.
+    """
+    store = JournalStore(str(tmp_path))
+    game_id = store.creer(nouvelle_partie().vers_sauvegarde())
+    journal = store.journal(game_id)
+    with open(journal.chemin_snapshot) as f:
+        snapshot = f.read()
+
+    journal.ajouter(EVENEMENT_VOTE, valeur="5")
+    journal.ajouter(EVENEMENT_VOTE, valeur="8")
+
+    with open(journal.chemin_snapshot) as f:
+        assert f.read() == snapshot
+    with open(journal.chemin_journal) as f:
+        lignes = [json.loads(ligne) for ligne in f]
+    assert [e['seq'] for e in lignes] == [1, 2]
+
+
+def test_journal_compactage(tmp_path):
+    """
+    @brief Vérifie que le journal est compacté en instantané tous les 'seuil_compactage' événements.
+    """
+    store = JournalStore(str(tmp_path), seuil_compactage=3)
+    room = GameRoom(players=["Alice", "Bob"], rules="majorite", features=["F1", "F2", "F3"])
+    game_id = store.creer(room.vers_sauvegarde())
+    journal = store.journal(game_id)
+
+    for valeur in ["1", "1", "2", "2", "3"]:
+        room.jouer(valeur)
+        journal.ajouter(EVENEMENT_VOTE, etat=room.vers_sauvegarde, valeur=valeur)
+
+    with open(journal.chemin_snapshot) as f:
+        assert json.load(f)['sequence'] == 3
+    with open(journal.chemin_journal) as f:
+        assert len(f.readlines()) == 2
+    # Un nouveau processus reprend la numérotation après l'instantané
+    assert JournalStore(str(tmp_path)).journal(game_id).ajouter(EVENEMENT_VOTE, valeur="3") == 6
+
+    rechargee = JournalStore(str(tmp_path)).journal(game_id).charger()
+    assert rechargee.results == {"F1": 1, "F2": 2, "F3": 3}
+
+
+def test_journal_ligne_tronquee(tmp_path):
+    """
+    @brief Vérifie qu'une dernière ligne incomplète (arrêt brutal) est ignorée au rechargement.
+    """
+    store = JournalStore(str(tmp_path))
+    game_id = store.creer(nouvelle_partie().vers_sauvegarde())
+    journal = store.journal(game_id)
+    journal.ajouter(EVENEMENT_VOTE, valeur="5")
+    with open(journal.chemin_journal, 'a') as f:
+        f.write('{"seq": 2, "type": "vo')
+
+    rechargee = JournalStore(str(tmp_path)).journal(game_id).charger()
+    assert list(rechargee.liste_vote) == [3]
+
+
+def test_journal_identifiant_invalide(tmp_path):
+    """
+    @brief Vérifie qu'un identifiant de partie ne peut pas désigner un autre répertoire.
+    """
+    store = JournalStore(str(tmp_path))
+    with pytest.raises(ValueError):
+        store.journal("../../etc")
+    assert not store.existe("../../etc")
+
+
+def test_reprise_partie_depuis_journal(client):
+    """
+    @brief Vérifie qu'une partie mise en pause est reprise avec son code depuis /load_game.
+    """
+    client.post('/settings', data={'num_players': 2, 'player_1': 'Alice', 'player_2': 'Bob',
+                                   'rules': 'majorite', 'time_limit': 30})
+    client.post('/propose_features', data={'feature': 'F1'})
+    client.post('/propose_features', data={'feature': 'F2'})
+    client.post('/game', data={'valeur_choisi': '5'})
+    client.post('/game', data={'valeur_choisi': '5'})
+    client.post('/game', data={'valeur_choisi': 'cafe'})
+    with client.session_transaction() as session:
+        game_id = session['game_id']
+
+    assert game_id.encode() in client.get('/pause').data
+
+    # Nouvelle session : la partie est reconstruite depuis le journal
+    with client.session_transaction() as session:
+        session.clear()
+    response = client.post('/load_game', data={'game_id': game_id})
+    assert response.headers['Location'].endswith('/game')
+    with client.session_transaction() as session:
+        assert session['players'] == ['Alice', 'Bob']
+        assert session['features'].resultats() == {'F1': 5}
+        assert session['index_player'] == 1
+        assert session['game_id'] == game_id
+
+    assert client.post('/load_game', data={'game_id': '0123456789abcdef'}).status_code == 404
+
+
+def test_journal_plusieurs_processus(tmp_path):
+    """
+    @brief Vérifie que deux journaux ouverts sur la même partie (deux processus) ne réutilisent aucune séquence.
+    """
+    game_id = JournalStore(str(tmp_path)).creer(nouvelle_partie().vers_sauvegarde())
+    journal_a = JournalStore(str(tmp_path)).journal(game_id)
+    journal_b = JournalStore(str(tmp_path)).journal(game_id)
+
+    sequences = [journal_a.ajouter(EVENEMENT_VOTE, valeur="3"),
+                 journal_b.ajouter(EVENEMENT_VOTE, valeur="3"),
+                 journal_a.ajouter(EVENEMENT_VOTE, valeur="5")]
+    assert sequences == [1, 2, 3]
+    # Compactage par l'un, ajout par l'autre
+    journal_b.compacter(journal_b.charger().vers_sauvegarde())
+    assert journal_a.ajouter(EVENEMENT_VOTE, valeur="5") == 4
+
+    rechargee = JournalStore(str(tmp_path)).journal(game_id).charger()
+    assert rechargee.results == {"F1": 3, "F2": 5}
+
+
+def test_journal_purge_parties_inactives(tmp_path):
+    """
+    @brief Vérifie que seuls les journaux sans activité depuis la durée de conservation sont supprimés.
+    """
+    store = JournalStore(str(tmp_path))
+    ancienne = store.creer(nouvelle_partie().vers_sauvegarde())
+    recente = store.creer(nouvelle_partie().vers_sauvegarde())
+    store.journal(recente).ajouter(EVENEMENT_VOTE, valeur="3")
+    journal = store.journal(ancienne)
+    il_y_a_deux_jours = time.time() - 2 * 86400
+    for chemin in (journal.chemin_snapshot, journal.chemin_journal, journal.repertoire):
+        if os.path.exists(chemin):
+            os.utime(chemin, (il_y_a_deux_jours, il_y_a_deux_jours))
+
+    assert store.purger(86400) == [ancienne]
+    assert not store.existe(ancienne)
+    assert not os.path.exists(journal.repertoire)
+    assert store.existe(recente)
+    assert store.purger(86400) == []
@@ -0,0 +1,85 @@
+import os
+import threading
+
+from models.metrics import MetricsRegistry, NB_PARTITIONS
+
+
+def test_compteur_multi_threads():
+    """
+    @brief Vérifie qu'aucun incrément n'est perdu lorsque plusieurs threads comptent en parallèle.
+    """
+    registre = MetricsRegistry()
+    compteur = registre.compteur('essai_total', "Essai.", ('route',))
+
+    def compter():
+        for _ in range(10000):
+            compteur.inc(route='game')
+
+    threads = [threading.Thread(target=compter) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # Un thread par requête, comme le serveur de production : le nombre de partitions ne change pas
+    for _ in range(100):
+        t = threading.Thread(target=compteur.inc, kwargs={'route': 'pause'})
+        t.start()
+        t.join()
+    assert len(compteur._partitions) == NB_PARTITIONS
+    assert compteur.valeurs() == {('game',): 80000, ('pause',): 100}
+    assert 'essai_total{route="game"} 80000' in registre.exposer()
+
+
+def test_histogramme_format_prometheus():
+    """
+    @brief Vérifie l'exposition d'un histogramme (tranches cumulées, somme et nombre).
+    """
+    registre = MetricsRegistry()
+    histogramme = registre.histogramme('duree_secondes', "Durée.", bornes=(0.1, 1.0))
+    for valeur in (0.05, 0.5, 0.5, 3.0):
+        histogramme.observer(valeur)
+    lignes = registre.exposer().splitlines()
+    assert '# TYPE duree_secondes histogram' in lignes
+    assert 'duree_secondes_bucket{le="0.1"} 1' in lignes
+    assert 'duree_secondes_bucket{le="1.0"} 3' in lignes
+    assert 'duree_secondes_bucket{le="+Inf"} 4' in lignes
+    assert 'duree_secondes_sum 4.05' in lignes
+    assert 'duree_secondes_count 4' in lignes
+
+
+def test_etiquette_processus():
+    """
+    @brief Vérifie que l'étiquette du processus est ajoutée à chaque échantillon exposé.
+    """
+    registre = MetricsRegistry(etiquette_processus='pid')
+    registre.compteur('votes_total', "Votes.", ('issue',)).inc(issue='valide')
+    registre.histogramme('duree_secondes', "Durée.", bornes=(1.0,)).observer(0.5)
+    registre.jauge('actives', "Parties.", lambda: 2)
+    pid = os.getpid()
+    lignes = registre.exposer().splitlines()
+    assert f'votes_total{{issue="valide",pid="{pid}"}} 1' in lignes
+    assert f'duree_secondes_bucket{{pid="{pid}",le="1.0"}} 1' in lignes
+    assert f'duree_secondes_count{{pid="{pid}"}} 1' in lignes
+    assert f'actives{{pid="{pid}"}} 2' in lignes
+
+
+def test_route_metrics(client):
+    """
+    @brief Vérifie que /metrics expose les latences des routes et les issues des tours.
+    """
+    client.post('/settings', data={'num_players': 2, 'player_1': 'Alice', 'player_2': 'Bob',
+                                   'rules': 'majorite', 'time_limit': 30})
+    client.post('/propose_features', data={'feature': 'F1'})
+    client.post('/game', data={'valeur_choisi': '5'})
+    client.post('/game', data={'valeur_choisi': '5'})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.content_type.startswith('text/plain; version=0.0.4')
+    texte = response.get_data(as_text=True)
+    assert 'capi_requete_duree_secondes_count{endpoint="game"}' in texte
+    assert 'capi_requetes_total{endpoint="settings",methode="POST",statut="302"}' in texte
+    assert 'capi_tours_total{issue="valide"}' in texte
+    assert 'capi_tours_par_feature_bucket{le="1"}' in texte
+    assert 'capi_session_cookie_octets_count' in texte
+    assert 'capi_rooms_actives' in texte
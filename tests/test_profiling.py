@@ -0,0 +1,49 @@
+import pstats
+import time
+
+from app import create_app
+from models.profiling import RequestProfiler
+
+
+def test_profil_cumule_par_route(tmp_path):
+    """
+    @brief Vérifie que les profils d'une route sont cumulés en mémoire puis ajoutés à ses fichiers.
+    """
+    profileur = RequestProfiler(str(tmp_path), taux=0, intervalle=3600)
+
+    def calcul_lent():
+        fin = time.perf_counter() + 0.02
+        while time.perf_counter() < fin:
+            pass
+
+    for _ in range(2):
+        with profileur.profiler('game'):
+            calcul_lent()
+    assert not (tmp_path / 'game.pstats').exists()
+    assert profileur.ecrire() == ['game']
+    with profileur.profiler('game'):
+        calcul_lent()
+    profileur.ecrire()
+
+    stats = pstats.Stats(str(tmp_path / 'game.pstats'))
+    appels = {fonction[2]: infos[1] for fonction, infos in stats.stats.items()}
+    assert appels['calcul_lent'] == 3
+    piles = (tmp_path / 'game.collapsed').read_text(encoding='utf-8').splitlines()
+    assert any('test_profiling.py:calcul_lent' in ligne for ligne in piles)
+    assert all(ligne.rsplit(' ', 1)[1].isdigit() for ligne in piles)
+
+
+def test_profilage_par_entete(app, tmp_path):
+    """
+    @brief Vérifie que l'en-tête X-Profilage déclenche le profilage d'une requête, si la configuration l'autorise.
+    """
+    assert app.extensions['capi'].profileur is None
+
+    instance = create_app({'TESTING': True, 'PROFILAGE_ENTETE': True, 'PROFILAGE_DIR': str(tmp_path), 'PROFILAGE_INTERVALLE': 0})
+    client = instance.test_client()
+    assert client.get('/').status_code == 200
+    assert not list(tmp_path.iterdir())
+    assert client.get('/settings', headers={'X-Profilage': '1'}).status_code == 200
+
+    stats = pstats.Stats(str(tmp_path / 'settings.pstats'))
+    assert any(fonction[2] == 'render_template' for fonction in stats.stats)
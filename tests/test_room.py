@@ -0,0 +1,216 @@
+import threading
+
+import pytest
+from models.room import GameRoom, RoomRegistry, SQLiteRoomRegistry, ISSUE_SUIVANT, ISSUE_VALIDE, ISSUE_PAUSE, ISSUE_DEBAT
+
+
+def test_game_room_validation():
+    """
+    @brief Vérifie qu'un tour majoritaire chiffre la fonctionnalité et passe à la suivante.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="majorite", features=["F1", "F2"])
+    assert room.jouer("3") == (ISSUE_SUIVANT, None)
+    assert room.jouer("3") == (ISSUE_SUIVANT, None)
+    assert room.jouer("8") == (ISSUE_VALIDE, "F1")
+    assert room.results == {"F1": 3}
+    assert room.feature_courante == "F2"
+    assert room.joueur_courant == "Alice"
+
+
+def test_game_room_pause_et_debat():
+    """
+    @brief Vérifie les issues café et débat d'un tour.
+    """
+    room = GameRoom(players=["Alice", "Bob"], rules="unanime", features=["F1"])
+    room.jouer("cafe")
+    assert room.jouer("cafe") == (ISSUE_PAUSE, None)
+
+    room.jouer("2")
+    issue, details = room.jouer("13")
+    assert issue == ISSUE_DEBAT
+    assert details["debate_players"] == ["Alice", "Bob"]
+    assert details["vote"] == [2, 13]
+    assert room.revote is True
+
+
+def test_game_room_pause_non_comptee():
+    """
+    @brief Vérifie qu'une pause café ne compte pas comme premier tour de la règle.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="unanime_puis_majorite", features=["F1"])
+    feature_id = room.feature_courante_id
+    for _ in range(3):
+        room.jouer("cafe")
+    assert room.features.historique(feature_id)['rounds'] == 0
+
+    # Premier tour chiffré : l'unanimité s'applique encore
+    for carte in ("3", "3"):
+        room.jouer(carte)
+    issue, _ = room.jouer("8")
+    assert issue == ISSUE_DEBAT
+    assert room.features.historique(feature_id)['rounds'] == 1
+
+    room.jouer("3")
+    for carte in ("3", "3"):
+        room.jouer(carte)
+    assert room.jouer("8") == (ISSUE_VALIDE, "F1")
+    assert room.features.historique(feature_id)['rounds'] == 2
+
+
+def test_game_room_vote_invalide():
+    """
+    @brief Vérifie qu'une carte inconnue ne modifie pas l'état de la partie.
+    """
+    room = GameRoom(players=["Alice", "Bob"], features=["F1"])
+    with pytest.raises(ValueError):
+        room.jouer("7")
+    assert room.index_player == 0
+    assert len(room.liste_vote) == 0
+
+
+def test_registry_verrou_par_partie():
+    """
+    @brief Vérifie que les votes concurrents sur une même partie sont tous comptés.
+    """
+    registry = RoomRegistry()
+    room = registry.creer(["J%d" % i for i in range(4)], "majorite", None, ["F%d" % i for i in range(100)])
+
+    def voter():
+        for _ in range(50):
+            with registry.ouvrir(room.room_id) as r:
+                r.jouer("5")
+
+    threads = [threading.Thread(target=voter) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(room.results) == 50
+
+
+def test_registry_purge_parties_inactives():
+    """
+    @brief Vérifie que les parties inactives sont retirées, les parties terminées plus tôt que les autres.
+    """
+    maintenant = [0.0]
+    registry = RoomRegistry(horloge=lambda: maintenant[0])
+    en_cours = registry.creer(["Alice"], "majorite", None, ["F1"])
+    terminee = registry.creer(["Alice"], "majorite", None, ["F1"])
+    with registry.ouvrir(terminee.room_id) as room:
+        room.jouer("5")
+    assert registry.nb_actives() == 1 and len(registry) == 2
+
+    maintenant[0] = 100
+    assert registry.purger(inactivite=1000, inactivite_terminee=50) == [terminee.room_id]
+    with registry.ouvrir(en_cours.room_id):
+        # Une partie en cours d'utilisation n'est jamais retirée
+        assert registry.purger(inactivite=0, inactivite_terminee=0) == []
+    maintenant[0] = 2000
+    assert registry.purger(inactivite=1000, inactivite_terminee=50) == [en_cours.room_id]
+    assert len(registry) == 0 and registry.nb_actives() == 0
+
+
+def test_routes_room(client):
+    """
+    @brief Vérifie le déroulement d'une partie adressée par son identifiant, indépendamment de la session.
+    """
+    response = client.post('/rooms', json={"players": ["Alice", "Bob"], "rules": "unanime", "features": ["F1"]})
+    assert response.status_code == 201
+    room_id = response.get_json()["room_id"]
+
+    response = client.get(f'/rooms/{room_id}/game')
+    assert b"Alice" in response.data
+    client.post(f'/rooms/{room_id}/game', data={'valeur_choisi': '5'})
+    response = client.post(f'/rooms/{room_id}/game', data={'valeur_choisi': '5'})
+    assert response.headers['Location'].endswith(f'/rooms/{room_id}/game')
+    assert client.get(f'/rooms/{room_id}').get_json()["results"] == {"F1": 5}
+    assert client.get('/rooms/inconnue').status_code == 404
+
+
+def test_game_room_vote_simultane():
+    """
+    @brief Vérifie que le tour simultané n'est évalué qu'une fois que tous les joueurs ont voté, dans n'importe quel ordre.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="majorite", features=["F1"])
+    assert room.voter("Charlie", "8") == (ISSUE_SUIVANT, None)
+    assert room.voter("Alice", "5") == (ISSUE_SUIVANT, None)
+    assert room.voter("Alice", "8") == (ISSUE_SUIVANT, None)  # Changement d'avis
+    assert room.nb_bulletins == 2
+    assert room.voter("Bob", "3") == (ISSUE_VALIDE, "F1")
+    assert room.results == {"F1": 8}
+    with pytest.raises(ValueError):
+        room.voter("Inconnu", "3")
+
+
+def test_registre_sqlite_partage(tmp_path):
+    """
+    @brief Vérifie que deux registres SQLite sur le même fichier (deux processus) voient les mêmes parties.
+    """
+    chemin = str(tmp_path / "rooms.sqlite3")
+    registre_a, registre_b = SQLiteRoomRegistry(chemin), SQLiteRoomRegistry(chemin)
+    room = registre_a.creer(["Alice", "Bob"], "majorite", 30, ["F1", "F2"], simultane=True)
+    assert room.room_id in registre_b and len(registre_b) == 1
+    version = registre_b.version(room.room_id)
+
+    with registre_a.ouvrir(room.room_id) as r:
+        assert r.voter("Alice", "5") == (ISSUE_SUIVANT, None)
+    with registre_b.ouvrir(room.room_id) as r:
+        assert r.nb_bulletins == 1
+        assert r.voter("Bob", "5") == (ISSUE_VALIDE, "F1")
+    assert registre_a.version(room.room_id) == version + 2
+
+    # Une lecture ne modifie pas la version ; une exception annule les modifications
+    with registre_a.ouvrir(room.room_id) as r:
+        assert r.results == {"F1": 5} and r.simultane
+    with pytest.raises(RuntimeError):
+        with registre_b.ouvrir(room.room_id) as r:
+            r.voter("Alice", "8")
+            raise RuntimeError
+    assert registre_a.version(room.room_id) == version + 2
+    with registre_a.ouvrir(room.room_id) as r:
+        assert r.nb_bulletins == 0
+
+    with pytest.raises(KeyError):
+        with registre_a.ouvrir("inconnue"):
+            pass
+    registre_b.supprimer(room.room_id)
+    assert room.room_id not in registre_a
+
+
+def test_registre_sqlite_purge(tmp_path):
+    """
+    @brief Vérifie la purge des parties inactives du registre SQLite, mesurée depuis leur dernière modification.
+    """
+    registre = SQLiteRoomRegistry(str(tmp_path / "rooms.sqlite3"))
+    en_cours = registre.creer(["Alice"], "majorite", None, ["F1"])
+    terminee = registre.creer(["Alice"], "majorite", None, ["F1"])
+    with registre.ouvrir(terminee.room_id) as room:
+        room.jouer("5")
+    assert registre.nb_actives() == 1
+    assert registre.purger(inactivite=3600, inactivite_terminee=3600) == []
+    assert registre.purger(inactivite=3600, inactivite_terminee=-1) == [terminee.room_id]
+    assert registre.purger(inactivite=-1, inactivite_terminee=3600) == [en_cours.room_id]
+    assert len(registre) == 0
+
+
+def test_registre_sqlite_votes_concurrents(tmp_path):
+    """
+    @brief Vérifie que les votes concurrents de plusieurs connexions sont tous comptés.
+    """
+    chemin = str(tmp_path / "rooms.sqlite3")
+    room = SQLiteRoomRegistry(chemin).creer(["J%d" % i for i in range(4)], "majorite", None,
+                                            ["F%d" % i for i in range(40)])
+
+    def voter():
+        registre = SQLiteRoomRegistry(chemin)
+        for _ in range(20):
+            with registre.ouvrir(room.room_id) as r:
+                r.jouer("5")
+
+    threads = [threading.Thread(target=voter) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    with SQLiteRoomRegistry(chemin).ouvrir(room.room_id) as r:
+        assert len(r.results) == 20
@@ -0,0 +1,139 @@
+import io
+import json
+import struct
+
+import pytest
+from models.room import GameRoom
+from models.sauvegarde import (encoder_binaire, encoder_sauvegarde, decoder_sauvegarde, lire_apercu,
+                               iterer_archive, detecter_format, FORMAT_JSON, FORMAT_BINAIRE, MAGIC)
+
+
+def partie_en_cours():
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="majorite", features=["F1", "F2"])
+    for valeur in ["3", "3", "8", "5"]:
+        room.jouer(valeur)
+    return room
+
+
+def test_binaire_aller_retour():
+    """
+    @brief Vérifie qu'une partie est restaurée à l'identique depuis sa sauvegarde binaire.
+    """
+    room = partie_en_cours()
+    donnees = encoder_binaire(room.vers_sauvegarde())
+    assert donnees.startswith(MAGIC)
+
+    rechargee = GameRoom.depuis_etat(decoder_sauvegarde(donnees))
+    assert rechargee.vers_sauvegarde() == room.vers_sauvegarde()
+    assert list(rechargee.liste_vote) == list(room.liste_vote)
+
+
+def test_detection_format():
+    """
+    @brief Vérifie la détection automatique du format au chargement.
+    """
+    etat = partie_en_cours().vers_sauvegarde()
+    json_ = encoder_sauvegarde(etat, FORMAT_JSON)
+    binaire = encoder_sauvegarde(etat, FORMAT_BINAIRE)
+    assert detecter_format(json_) == FORMAT_JSON
+    assert detecter_format(binaire) == FORMAT_BINAIRE
+    assert decoder_sauvegarde(json_) == etat
+    assert len(binaire) < len(json_)
+    with pytest.raises(ValueError):
+        encoder_sauvegarde(etat, 'xml')
+
+
+def test_apercu_sans_votes():
+    """
+    @brief Vérifie que l'aperçu ne lit que l'en-tête d'une sauvegarde binaire.
+    """
+    donnees = encoder_binaire(partie_en_cours().vers_sauvegarde())
+    flux = io.BytesIO(donnees)
+    entete = lire_apercu(flux)
+    assert entete['results'] == {"F1": 3}
+    assert entete['features'] == ["F1", "F2"] and entete['players'] == ["Alice", "Bob", "Charlie"]
+    assert 'liste_vote' not in entete and 'nb_features' not in entete
+    # Les identifiants, les historiques et les votes, après les titres et les estimations, n'ont pas été lus
+    assert flux.tell() < len(donnees) - len(partie_en_cours().liste_vote) - 4 * 6
+
+
+def test_binaire_valeurs_hors_cartes():
+    """
+    @brief Vérifie qu'une estimation ou un historique qui n'est pas exprimé en cartes du jeu est restauré à l'identique.
+    """
+    etat = partie_en_cours().vers_sauvegarde()
+    etat['features'].append({"id": 7, "title": "F3 ✓", "history": {"rounds": 2, "rule": "majorite",
+                                                                    "votes": {"XL": 2}}})
+    etat['features'].append({"id": 8, "title": "F4", "history": {"rounds": 1}})
+    etat['results'].update({"F3 ✓": "XL", "F4": 3.0})
+
+    decode = decoder_sauvegarde(encoder_binaire(etat))
+    rechargee = GameRoom.depuis_etat(decode)
+    assert rechargee.vers_sauvegarde() == GameRoom.depuis_etat(json.loads(json.dumps(etat))).vers_sauvegarde()
+    assert isinstance(rechargee.results["F4"], float)
+    assert lire_apercu(io.BytesIO(encoder_binaire(etat)))['results'] == etat['results']
+
+
+def test_binaire_version_1():
+    """
+    @brief Vérifie qu'une sauvegarde binaire de la version 1 (état JSON suivi des votes) reste lisible.
+    """
+    room = partie_en_cours()
+    etat = room.vers_sauvegarde()
+    votes = bytes.fromhex(etat.pop('liste_vote'))
+    entete = json.dumps(etat).encode('utf-8')
+    donnees = struct.pack('<4sBI', MAGIC, 1, len(entete)) + entete + struct.pack('<I', len(votes)) + votes
+
+    assert GameRoom.depuis_etat(decoder_sauvegarde(donnees)).vers_sauvegarde() == room.vers_sauvegarde()
+    assert lire_apercu(io.BytesIO(donnees))['results'] == {"F1": 3}
+
+
+def test_sauvegarde_tronquee():
+    """
+    @brief Vérifie qu'une sauvegarde binaire incomplète est refusée.
+    """
+    donnees = encoder_binaire(partie_en_cours().vers_sauvegarde())
+    with pytest.raises(ValueError):
+        decoder_sauvegarde(donnees[:-1])
+    with pytest.raises(ValueError):
+        lire_apercu(io.BytesIO(donnees[:6]))
+
+
+def test_archive(tmp_path):
+    """
+    @brief Vérifie le parcours d'une archive de plusieurs sauvegardes binaires.
+    """
+    room = partie_en_cours()
+    autre = GameRoom(players=["Dan"], rules="unanime", features=["G1"])
+    chemin = tmp_path / "archive.capi"
+    chemin.write_bytes(encoder_binaire(room.vers_sauvegarde()) + encoder_binaire(autre.vers_sauvegarde()))
+
+    apercus = list(iterer_archive(chemin))
+    assert [a['players'] for a in apercus] == [room.players, autre.players]
+    assert all('liste_vote' not in a for a in apercus)
+    completes = list(iterer_archive(chemin, avec_votes=True))
+    assert completes[0]['liste_vote'] == room.liste_vote.tobytes()
+
+
+def test_pause_et_chargement_binaire(client):
+    """
+    @brief Vérifie le téléchargement d'une sauvegarde binaire depuis /pause et son rechargement.
+    """
+    with client.session_transaction() as session:
+        session.update(partie_en_cours().vers_etat())
+
+    response = client.post('/pause', data={'format': 'binaire'})
+    assert response.status_code == 200
+    assert response.data.startswith(MAGIC)
+    assert 'sauvegarde.capi' in response.headers['Content-Disposition']
+
+    apercu = client.post('/load_game/preview', data={'savefile': (io.BytesIO(response.data), 'sauvegarde.capi')})
+    assert apercu.get_json()['results'] == {"F1": 3}
+
+    with client.session_transaction() as session:
+        session.clear()
+    chargement = client.post('/load_game', data={'savefile': (io.BytesIO(response.data), 'sauvegarde.capi')})
+    assert chargement.headers['Location'].endswith('/game')
+    with client.session_transaction() as session:
+        assert session['features'].resultats() == {"F1": 3}
+        assert session['liste_vote'] == partie_en_cours().liste_vote.tobytes()
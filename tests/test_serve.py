@@ -0,0 +1,119 @@
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+
+import pytest
+
+from benchmarks.charge import ClientHTTP
+
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason="fork() indisponible")
+
+
+def port_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+@pytest.fixture
+def serveur(request, tmp_path):
+    """
+    Fixture lançant serve.py (deux processus, sauf paramètre indirect), les fichiers partagés étant écrits dans tmp_path.
+    """
+    workers = getattr(request, 'param', 2)
+    port = port_libre()
+    env = dict(os.environ,
+               CAPI_SECRET_KEY='cle-de-test',
+               CAPI_SESSION_SQLITE_PATH=str(tmp_path / 'sessions.sqlite3'),
+               CAPI_ROOM_SQLITE_PATH=str(tmp_path / 'rooms.sqlite3'),
+               CAPI_JOURNAL_DIR=str(tmp_path / 'parties'),
+               CAPI_ANALYTICS_PATH=str(tmp_path / 'analytics.sqlite3'))
+    processus = subprocess.Popen([sys.executable, 'serve.py', '--workers', str(workers), '--port', str(port)],
+                                 cwd=RACINE, env=env, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}'
+    limite = time.monotonic() + 20
+    while True:
+        try:
+            urllib.request.urlopen(url + '/metrics', timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > limite or processus.poll() is not None:
+                processus.kill()
+                pytest.fail("Le serveur n'a pas démarré.")
+            time.sleep(0.1)
+    yield url, processus
+    if processus.poll() is None:
+        processus.kill()
+        processus.wait()
+
+
+def poster_json(url, donnees):
+    requete = urllib.request.Request(url, data=json.dumps(donnees).encode(),
+                                     headers={'Content-Type': 'application/json'}, method='POST')
+    with urllib.request.urlopen(requete, timeout=10) as response:
+        return json.load(response)
+
+
+def test_serveur_plusieurs_processus(serveur):
+    """
+    @brief Vérifie qu'une partie servie par plusieurs processus reste cohérente, puis l'arrêt propre sur SIGTERM.
+    """
+    url, processus = serveur
+
+    # Partie locale : la session est partagée entre les processus
+    client = ClientHTTP(url)
+    client.requete('POST', '/settings', {'num_players': 2, 'player_1': 'Alice', 'player_2': 'Bob',
+                                         'rules': 'unanime', 'time_limit': 30})
+    for feature in ('F1', 'F2'):
+        client.requete('POST', '/propose_features', {'feature': feature})
+    for _ in range(10):
+        client.requete('POST', '/game', {'valeur_choisi': '5'})
+    assert client.requete('GET', '/game')[1].endswith('/results')
+
+    # Partie partagée : chaque vote ouvre une nouvelle connexion, servie par l'un ou l'autre processus
+    room_id = poster_json(url + '/rooms', {"players": ["Alice", "Bob"], "rules": "unanime",
+                                           "features": ["F1", "F2", "F3"], "time_limit": None})["room_id"]
+    for _ in range(3):
+        poster_json(f'{url}/rooms/{room_id}/vote', {"player": "Alice", "valeur": "8"})
+        poster_json(f'{url}/rooms/{room_id}/vote', {"player": "Bob", "valeur": "8"})
+    with urllib.request.urlopen(f'{url}/rooms/{room_id}', timeout=10) as response:
+        assert json.load(response)["results"] == {"F1": 8, "F2": 8, "F3": 8}
+
+    # Chaque processus expose ses propres métriques, étiquetées par son pid
+    with urllib.request.urlopen(url + '/metrics', timeout=10) as response:
+        assert 'capi_rooms_actives{pid="' in response.read().decode()
+
+    processus.send_signal(signal.SIGTERM)
+    assert processus.wait(timeout=15) == 0
+
+
+@pytest.mark.parametrize('serveur', [1], indirect=True)
+def test_arret_processus_unique_flux_ouvert(serveur):
+    """
+    @brief Vérifie qu'un serveur à un seul processus s'arrête sur SIGTERM malgré un flux SSE ouvert.
+    """
+    url, processus = serveur
+    room_id = poster_json(url + '/rooms', {"players": ["Alice"], "features": ["F1"], "time_limit": None})["room_id"]
+    with urllib.request.urlopen(f'{url}/rooms/{room_id}/events', timeout=10) as flux:
+        assert flux.readline() == b'event: etat\n'
+        processus.send_signal(signal.SIGTERM)
+        # Le flux est fermé par le serveur, sans attendre --delai-arret
+        assert processus.wait(timeout=5) == 0
+
+
+def test_cle_secrete_obligatoire(monkeypatch):
+    """
+    Vérifie que le serveur de production refuse de démarrer sans CAPI_SECRET_KEY, avant d'ouvrir la socket.
+    """
+    import serve
+    monkeypatch.delenv('CAPI_SECRET_KEY', raising=False)
+    monkeypatch.setattr(serve, 'ouvrir_socket', lambda *arguments: pytest.fail("socket ouverte"))
+    with pytest.raises(SystemExit):
+        serve.main(['--workers', '1', '--port', str(port_libre())])
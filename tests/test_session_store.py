@@ -0,0 +1,130 @@
+import json
+from array import array
+
+from flask.sessions import session_json_serializer
+
+from models.features import FeatureCollection
+from models.room import creer_registre
+from models.session_store import (MemorySessionStore, SQLiteSessionStore, TagFeatureCollection, creer_serialiseur,
+                                  creer_session_interface)
+
+
+def test_memory_store_lru():
+    """
+    @brief Vérifie que la session la moins récemment utilisée est évincée.
+    """
+    store = MemorySessionStore(max_entries=2)
+    store.set("a", {"x": 1})
+    store.set("b", {"x": 2})
+    store.get("a")
+    store.set("c", {"x": 3})
+    assert store.get("b") is None
+    assert store.get("a") == {"x": 1}
+    assert len(store) == 2
+
+
+def test_memory_store_ttl():
+    """
+    @brief Vérifie qu'une session inactive expire.
+    """
+    maintenant = [0.0]
+    store = MemorySessionStore(ttl=10, horloge=lambda: maintenant[0])
+    store.set("a", {"x": 1})
+    maintenant[0] = 11.0
+    assert store.get("a") is None
+
+
+def test_memory_store_copie_par_requete():
+    """
+    @brief Vérifie que deux lectures d'une même session ne partagent ni le backlog ni les votes.
+    """
+    store = MemorySessionStore()
+    store.set("a", {"features": FeatureCollection(["F1"]), "liste_vote": array('b', [1]), "players": ["Alice"]})
+    premiere, seconde = store.get("a"), store.get("a")
+    premiere["features"].ajouter("F2")
+    premiere["features"].compter_tour(1)
+    premiere["liste_vote"].append(2)
+    premiere["players"].append("Bob")
+    assert list(seconde["features"]) == ["F1"]
+    assert seconde["features"].historique(1)['rounds'] == 0
+    assert seconde["liste_vote"] == array('b', [1])
+    assert seconde["players"] == ["Alice"]
+    assert list(store.get("a")["features"]) == ["F1"]
+
+
+def test_sqlite_store_expiration_repoussee(tmp_path):
+    """
+    @brief Vérifie qu'une session SQLite lue voit son expiration repoussée, comme en mémoire.
+    """
+    maintenant = [0.0]
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), ttl=10, horloge=lambda: maintenant[0])
+    store.set("a", {"x": 1})
+    maintenant[0] = 8.0
+    assert store.get("a") == {"x": 1}
+    maintenant[0] = 16.0
+    assert store.get("a") == {"x": 1}
+    maintenant[0] = 27.0
+    assert store.get("a") is None
+
+
+def test_sqlite_store(tmp_path):
+    """
+    @brief Vérifie l'aller-retour des données de session (y compris les votes encodés) dans SQLite.
+    """
+    store = SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"))
+    store.set("a", {"liste_vote": b"\x00\x09", "features": ["F1"]})
+    assert store.get("a") == {"liste_vote": b"\x00\x09", "features": ["F1"]}
+    store.delete("a")
+    assert store.get("a") is None
+
+
+def test_cookie_taille_constante(app, client):
+    """
+    @brief Vérifie que le cookie ne contient qu'un identifiant, quelle que soit la taille du backlog.
+    """
+    with client.session_transaction() as session:
+        session['features'] = [f"Fonctionnalité {i}" for i in range(1000)]
+    cookie = client.get_cookie(app.config['SESSION_COOKIE_NAME'])
+    assert len(cookie.value) < 64
+    response = client.get('/propose_features')
+    assert "Fonctionnalité 999".encode('utf-8') in response.data
+
+
+def test_serialisation_date_modification():
+    """
+    @brief Vérifie que la date de dernière modification du backlog survit à la sérialisation de la session.
+    """
+    features = FeatureCollection(["A", "B"])
+    features.modifiee = 1700000000.5
+    serialiseur = creer_serialiseur()
+    copie = serialiseur.loads(serialiseur.dumps({'features': features}))['features']
+    assert copie.modifiee == 1700000000.5 and copie.vers_liste() == features.vers_liste()
+    # Ancien format : liste seule
+    ancienne = serialiseur.loads(json.dumps({'features': {' fc': features.vers_liste()}}))
+    assert list(ancienne['features']) == ["A", "B"]
+    # Le sérialiseur global de Flask n'est pas modifié
+    assert not any(isinstance(tag, TagFeatureCollection) for tag in session_json_serializer.order)
+
+
+def test_sqlite_chemin_par_defaut_instance(app, tmp_path):
+    """
+    @brief Vérifie que les fichiers SQLite des sessions et des parties sont placés par défaut dans le répertoire d'instance.
+    """
+    config = dict(app.config, SESSION_BACKEND='sqlite', ROOM_BACKEND='sqlite')
+    repertoire = tmp_path / 'instance'
+    interface = creer_session_interface(config, str(repertoire))
+    assert interface.store.path == str(repertoire / 'sessions.sqlite3')
+    registre = creer_registre(config, str(repertoire))
+    assert registre.path == str(repertoire / 'rooms.sqlite3')
+    assert (repertoire / 'sessions.sqlite3').exists() and (repertoire / 'rooms.sqlite3').exists()
+
+
+def test_cookie_serialiseur_propre(app):
+    """
+    @brief Vérifie que le stockage 'cookie' utilise un sérialiseur propre à l'application, qui gère les FeatureCollection.
+    """
+    interface = creer_session_interface(dict(app.config, SESSION_BACKEND='cookie'), app.instance_path)
+    assert interface.serializer is not session_json_serializer
+    features = FeatureCollection(["A"])
+    copie = interface.serializer.loads(interface.serializer.dumps({'features': features}))
+    assert copie['features'].vers_liste() == features.vers_liste()
@@ -0,0 +1,43 @@
+import pytest
+
+from models.simulation import simuler, simuler_lot, lire_equipe, formater_rapport
+
+# Joueurs qui votent toujours la carte juste
+EXACT = {'biais': 0.0, 'dispersion': 0.0, 'cafe': 0.0, 'interro': 0.0}
+
+
+def test_equipe_exacte():
+    """
+    @brief Vérifie qu'une équipe qui vote toujours juste chiffre chaque fonctionnalité au premier tour, sans biais.
+    """
+    compteurs = simuler_lot('unanime', (EXACT,) * 4, 500, graine=1)
+    assert compteurs['consensus'] == 500 and compteurs['tours'] == 500
+    assert compteurs['debats'] == compteurs['pauses'] == compteurs['interros'] == 0
+    assert compteurs['ecart_absolu'] == 0
+
+
+def test_comparaison_des_regles():
+    """
+    @brief Vérifie les statistiques par règle : débats, tours nécessaires et biais d'une équipe biaisée.
+    """
+    joueurs = lire_equipe(['realiste:3', 'pessimiste:2'])
+    resultats = simuler(['unanime', 'majorite', 'moyenne'], joueurs, nb_features=3000, processus=1, taille_lot=1000)
+    assert resultats['moyenne']['tours_moyens'] < resultats['majorite']['tours_moyens'] \
+        < resultats['unanime']['tours_moyens']
+    assert resultats['unanime']['debats_par_feature'] > resultats['majorite']['debats_par_feature']
+    # Les joueurs pessimistes tirent la moyenne vers le haut ; l'unanimité, obtenue après débat, corrige ce biais
+    assert resultats['moyenne']['biais_cartes'] > resultats['unanime']['biais_cartes']
+    assert "Règle la plus rapide : moyenne" in formater_rapport(resultats)
+
+
+def test_simulation_reproductible_en_parallele():
+    """
+    @brief Vérifie que le résultat ne dépend pas du nombre de processus.
+    """
+    parametres = dict(regles=['majorite'], joueurs=['disperse'] * 5, nb_features=2000, graine=3, taille_lot=500)
+    assert simuler(processus=1, **parametres) == simuler(processus=2, **parametres)
+
+    with pytest.raises(ValueError):
+        simuler(['inconnue'])
+    with pytest.raises(ValueError):
+        simuler(joueurs=['inconnu'])
@@ -0,0 +1,80 @@
+from models.cartes import Carte, encoder_carte
+from models.room import GameRoom, ISSUE_DEBAT, ISSUE_SUIVANT
+from models.statistiques import StatistiquesTour
+
+
+def votes(*valeurs):
+    return [(i, encoder_carte(v)) for i, v in enumerate(valeurs)]
+
+
+def test_statistiques_incrementales():
+    """
+    @brief Vérifie le mode, l'écart, la convergence et les joueurs éloignés du mode.
+    """
+    stats = StatistiquesTour(votes(5, 5, 8, 1, 40, "cafe"))
+    assert stats.mode == Carte.CINQ
+    assert stats.ecart == 39
+    assert stats.convergence == 0.6
+    assert stats.ecartes() == [(3, Carte.UN), (4, Carte.QUARANTE)]
+    assert stats.detenteurs(Carte.CINQ) == [0, 1]
+    # Un joueur de chaque carte éloignée, les extrêmes, un représentant du mode et le vote "cafe"
+    assert stats.debat() == [(3, Carte.UN), (0, Carte.CINQ), (4, Carte.QUARANTE), (5, Carte.CAFE)]
+
+
+def test_statistiques_retrait():
+    """
+    @brief Vérifie la mise à jour des extrêmes et du mode lorsqu'un joueur change de carte.
+    """
+    stats = StatistiquesTour(votes(1, 13, 13))
+    stats.retirer(1, Carte.TREIZE)
+    stats.ajouter(1, Carte.UN)
+    assert stats.mode == Carte.UN
+    stats.retirer(2, Carte.TREIZE)
+    stats.ajouter(2, Carte.DEUX)
+    assert stats.ecart == 1 and stats.convergence == 1.0
+    assert stats.debat() == [(0, Carte.UN), (2, Carte.DEUX)]
+
+    sans_chiffre = StatistiquesTour(votes("interro", "cafe"))
+    assert sans_chiffre.mode is None and sans_chiffre.convergence is None
+    assert sans_chiffre.debat() == [(1, Carte.CAFE), (0, Carte.INTERRO)]
+
+
+def test_debat_tous_les_joueurs_eloignes():
+    """
+    @brief Vérifie que le débat d'une partie réunit tous les joueurs éloignés, pas seulement les premiers extrêmes.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie", "Dave"], rules="unanime", features=["F1"])
+    for joueur, valeur in [("Alice", "100"), ("Bob", "3"), ("Alice", "1"), ("Charlie", "3"), ("Dave", "100")]:
+        issue, details = room.voter(joueur, valeur)
+    assert issue == ISSUE_DEBAT
+    assert details["debate_players"] == ["Alice", "Bob", "Dave"]
+    assert details["vote"] == [1, 3, 100]
+    assert details["outliers"] == ["Alice", "Dave"]
+    assert (details["mode"], details["spread"], details["convergence"]) == (3, 99, 0.5)
+
+    # Une partie rechargée reprend les statistiques du tour en cours sans rejouer les votes
+    room.voter("Alice", "5")
+    room = GameRoom.depuis_etat(room.vers_registre())
+    assert room._stats is not None
+    assert room.voter("Bob", "5") == (ISSUE_SUIVANT, None)
+    assert room.statistiques.mode == Carte.CINQ
+    # Sans statistiques (sauvegarde, ancien état), elles sont recalculées à la demande
+    assert "stats" not in room.vers_sauvegarde()
+    etat = room.vers_registre()
+    del etat["stats"]
+    assert GameRoom.depuis_etat(etat).statistiques.vers_etat() == room.statistiques.vers_etat()
+
+
+def test_statistiques_session():
+    """
+    @brief Vérifie que les statistiques d'une partie en session sont tenues à jour d'une requête à l'autre.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="unanime", features=["F1"])
+    for valeur in ("1", "8"):
+        room = GameRoom.depuis_etat(room.vers_etat())
+        room.jouer(valeur)
+    room = GameRoom.depuis_etat(room.vers_etat())
+    copie = StatistiquesTour.depuis_etat(room.vers_etat()["stats"])
+    assert (copie.mode, copie.ecart, copie.detenteurs(Carte.HUIT)) == (Carte.UN, 7, [1])
+    issue, details = room.jouer("8")
+    assert issue == ISSUE_DEBAT and details["mode"] == 8
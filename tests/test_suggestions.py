@@ -0,0 +1,63 @@
+import app as app_module
+from models.suggestions import IndexSimilarite, normaliser, ngrammes
+
+
+def test_normalisation_et_ngrammes():
+    """
+    @brief Vérifie la normalisation des titres (casse, accents, ponctuation) et leur découpage.
+    """
+    assert normaliser("Créer l'écran  d'Accueil !") == "creer l ecran d accueil"
+    assert ngrammes("log in") == {" lo": 1, "log": 1, "og ": 1, " in": 1, "in ": 1}
+
+
+def test_suggestions_similaires():
+    """
+    @brief Vérifie que les fonctionnalités proches sont suggérées malgré les fautes et variations.
+    """
+    index = IndexSimilarite()
+    index.charger([("Export CSV des résultats", 5), ("Export CSV des résultats", 5),
+                   ("Export CSV des résultats", 8), ("Page de connexion", 3), ("Sans estimation", None)])
+    index.ajouter("Connexion par OAuth", 8)
+    assert len(index) == 3
+
+    suggestions = index.suggerer("exporter les resultat en csv")
+    assert suggestions[0]['feature'] == "Export CSV des résultats"
+    assert suggestions[0]['estimate'] == 5 and suggestions[0]['count'] == 3
+    assert [s['feature'] for s in index.suggerer("page connexoin")][0] == "Page de connexion"
+    assert index.suggerer("Paiement par carte bancaire") == []
+
+
+def test_cache_invalide_par_ajout():
+    """
+    @brief Vérifie que le cache LRU sert les recherches répétées et qu'un ajout l'invalide.
+    """
+    index = IndexSimilarite(taille_cache=2)
+    index.ajouter("Page de connexion", 3)
+    premiere = index.suggerer("connexion")
+    assert index.suggerer("connexion") is premiere
+    index.ajouter("Page de connexion", 5)
+    index.ajouter("Page de connexion", 5)
+    assert index.suggerer("connexion")[0]['estimate'] == 5
+    index.suggerer("page")
+    index.suggerer("connex")
+    assert len(index._cache) == 2
+
+
+def test_routes_suggestions(client, monkeypatch):
+    """
+    @brief Vérifie l'affichage des estimations similaires lors de la proposition d'une fonctionnalité.
+    """
+    index = IndexSimilarite()
+    monkeypatch.setattr(app_module, 'suggestions', index)
+    index.ajouter("Export CSV des résultats", 13)
+    client.post('/settings', data={'num_players': 1, 'player_1': 'Alice', 'rules': 'majorite', 'time_limit': 30})
+    client.post('/propose_features', data={'feature': 'Exporter les résultats en CSV'})
+
+    page = client.get('/propose_features').get_data(as_text=True)
+    assert "« Export CSV des résultats » : 13" in page
+    reponse = client.get('/suggestions?feature=export csv').get_json()
+    assert reponse["suggestions"][0]["estimate"] == 13
+
+    # Une estimation validée en partie alimente l'index
+    client.post('/game', data={'valeur_choisi': '8'})
+    assert index.suggerer("Exporter les résultats en CSV")[0]['feature'] == "Exporter les résultats en CSV"
@@ -0,0 +1,133 @@
+import threading
+import time
+
+import app as app_module
+from models.room import GameRoom, ISSUE_VALIDE, ISSUE_SUIVANT
+from models.timer import RoundScheduler
+
+
+class Horloge:
+    """
+    Horloge manuelle pour les tests.
+    """
+    def __init__(self):
+        self.maintenant = 0.0
+
+    def __call__(self):
+        return self.maintenant
+
+
+def test_scheduler_ordre_et_replanification():
+    """
+    @brief Vérifie que seules les échéances dépassées et toujours valides sont déclenchées.
+    """
+    horloge = Horloge()
+    expirees = []
+    scheduler = RoundScheduler(expirees.append, horloge=horloge, automatique=False)
+    for i in range(1000):
+        scheduler.planifier(f"room{i}", 10 + i)
+    scheduler.planifier("room0", 100)   # Replanifiée
+    scheduler.annuler("room1")          # Annulée
+    scheduler.planifier("room2", 50, remplacer=False)  # Conservée
+    horloge.maintenant = 12.5
+    assert scheduler.executer_echeances() == 1
+    assert expirees == ["room2"]
+    assert scheduler.echeance("room0") == 87.5
+    assert len(scheduler) == 998
+
+
+def test_scheduler_thread():
+    """
+    @brief Vérifie qu'une échéance est déclenchée par le thread de fond.
+    """
+    evenement = threading.Event()
+    scheduler = RoundScheduler(lambda cle: evenement.set())
+    scheduler.planifier("room", 0.01)
+    assert evenement.wait(2)
+    scheduler.arreter()
+
+
+def test_expirer_tour_simultane():
+    """
+    @brief Vérifie que les joueurs n'ayant pas voté votent 'interro' à l'expiration du tour.
+    """
+    room = GameRoom(players=["Alice", "Bob", "Charlie"], rules="majorite", features=["F1"])
+    room.voter("Alice", "5")
+    room.voter("Bob", "5")
+    assert room.expirer_tour() == (ISSUE_VALIDE, "F1")
+    assert room.results == {"F1": 5}
+
+
+def test_expirer_tour_par_tour():
+    """
+    @brief Vérifie qu'en tour par tour seul le joueur courant vote 'interro'.
+    """
+    room = GameRoom(players=["Alice", "Bob"], rules="majorite", features=["F1"])
+    assert room.expirer_tour() == (ISSUE_SUIVANT, None)
+    assert room.joueur_courant == "Bob"
+
+
+def test_expiration_perimee_ignoree(app):
+    """
+    @brief Vérifie qu'un chronomètre dont l'échéance a été repoussée (par un autre processus) ne clôt pas le tour.
+    """
+    room = app_module.rooms.creer(["Alice", "Bob"], "majorite", 30, ["F1"])
+    app_module.scheduler.annuler(room.room_id)
+    with app_module.rooms.ouvrir(room.room_id) as r:
+        r.echeance = time.time() + 30
+    app_module.expirer_tour(room.room_id)
+    with app_module.rooms.ouvrir(room.room_id) as r:
+        assert r.joueur_courant == "Alice"
+        r.echeance = time.time()
+    app_module.expirer_tour(room.room_id)
+    with app_module.rooms.ouvrir(room.room_id) as r:
+        assert r.joueur_courant == "Bob"
+        assert r.echeance > time.time() + 20
+    app_module.scheduler.annuler(room.room_id)
+    app_module.rooms.supprimer(room.room_id)
+
+
+def test_premier_tour_expire_registre_sqlite(tmp_path):
+    """
+    @brief Vérifie que l'échéance du premier tour est enregistrée dans le registre partagé et clôt le tour.
+    """
+    instance = app_module.create_app({'TESTING': True, 'ROOM_BACKEND': 'sqlite', 'ROOM_SQLITE_PATH': str(tmp_path / 'rooms.sqlite3'),
+                                      'JOURNAL_DIR': str(tmp_path / 'parties'),
+                                      'ANALYTICS_PATH': str(tmp_path / 'analytics.sqlite3')})
+    client = instance.test_client()
+    room_id = client.post('/rooms', json={"players": ["Alice", "Bob"], "features": ["F1"],
+                                          "time_limit": 1}).get_json()["room_id"]
+    sous_systemes = instance.extensions['capi']
+    with sous_systemes.rooms.ouvrir(room_id) as room:
+        assert room.echeance is not None
+    limite = time.time() + 5
+    while client.get(f'/rooms/{room_id}').get_json()["current_player"] != "Bob" and time.time() < limite:
+        time.sleep(0.05)
+    assert client.get(f'/rooms/{room_id}').get_json()["current_player"] == "Bob"
+    sous_systemes.scheduler.annuler(room_id)
+
+
+def test_purge_planifiee_par_l_echeancier(tmp_path):
+    """
+    @brief Vérifie que la création d'une partie planifie la purge du registre et des journaux, et que la purge se replanifie.
+    """
+    instance = app_module.create_app({'TESTING': True, 'ROOM_INACTIVITE': 0, 'ROOM_INACTIVITE_TERMINEE': 0,
+                                      'ROOM_PURGE_INTERVALLE': 3600, 'JOURNAL_RETENTION': 0, 'JOURNAL_DIR': str(tmp_path / 'parties'),
+                                      'ANALYTICS_PATH': str(tmp_path / 'analytics.sqlite3')})
+    client = instance.test_client()
+    room_id = client.post('/rooms', json={"players": ["Alice"], "features": ["F1"],
+                                          "time_limit": None}).get_json()["room_id"]
+    client.post('/settings', data={'num_players': 1, 'player_1': 'Alice', 'rules': 'majorite', 'time_limit': 30})
+    with client.session_transaction() as session:
+        game_id = session['game_id']
+    sous_systemes = instance.extensions['capi']
+    assert sous_systemes.journaux.existe(game_id)
+    assert sous_systemes.scheduler.echeance(app_module.CLE_PURGE) > 3000
+    assert 'capi_rooms_actives 1' in client.get('/metrics').get_data(as_text=True)
+    time.sleep(0.01)
+    with instance.app_context():
+        app_module.traiter_echeance(app_module.CLE_PURGE)
+    assert room_id not in sous_systemes.rooms
+    assert not sous_systemes.journaux.existe(game_id)
+    assert sous_systemes.scheduler.echeance(app_module.CLE_PURGE) > 3000
+    sous_systemes.scheduler.arreter()